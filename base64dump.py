@@ -2,8 +2,8 @@
 
 __description__ = 'Extract base64 strings from file'
 __author__ = 'Didier Stevens'
-__version__ = '0.0.10'
-__date__ = '2018/05/23'
+__version__ = '0.0.12'
+__date__ = '2026/10/17'
 
 """
 
@@ -29,6 +29,7 @@ History:
   2018/05/07: 0.0.9: added bx and ah encoding; added YARA support; added decoders
   2018/05/23: 0.0.10: added zxle and zxbe encoding; added option --ignore
   2018/07/23: 0.0.11: added option -I
+  2026/10/17: 0.0.12: YARA rules are compiled with module yaracache when available (cache of compiled rules)
 
 Todo:
 """
@@ -50,6 +51,11 @@ try:
     import yara
 except:
     pass
+
+try:
+    import yaracache
+except:
+    yaracache = None
 if sys.version_info[0] >= 3:
     from io import StringIO
 else:
@@ -671,6 +677,13 @@ def DecodeDataZXBigEndian(data):
     for zx in re.findall(r'(?:0x[ABCDEFabcdef0123456789]{1,8})+', data):
         yield (zx, DecodeZXBigEndian(zx))
 
+# with module yaracache, compiled rules are cached and reused as long as the rule files don't change
+def YARACompileRules(**kwargs):
+    if yaracache == None:
+        return yara.compile(**kwargs)
+    else:
+        return yaracache.Compile(**kwargs)
+
 def YARACompile(ruledata):
     if ruledata.startswith('#'):
         if ruledata.startswith('#h#'):
@@ -683,7 +696,7 @@ def YARACompile(ruledata):
             rule = ruledata[3:].replace("'", '"')
         else:
             rule = ruledata[1:]
-        return yara.compile(source=rule, externals={'streamname': '', 'VBA': False})
+        return YARACompileRules(source=rule, externals={'streamname': '', 'VBA': False})
     else:
         dFilepaths = {}
         if os.path.isdir(ruledata):
@@ -694,7 +707,7 @@ def YARACompile(ruledata):
         else:
             for filename in ProcessAt(ruledata):
                 dFilepaths[filename] = filename
-        return yara.compile(filepaths=dFilepaths, externals={'streamname': '', 'VBA': False})
+        return YARACompileRules(filepaths=dFilepaths, externals={'streamname': '', 'VBA': False})
 
 def AddDecoder(cClass):
     global decoders
@@ -2,8 +2,8 @@
 
 __description__ = 'EML dump utility'
 __author__ = 'Didier Stevens'
-__version__ = '0.0.10'
-__date__ = '2017/07/21'
+__version__ = '0.0.11'
+__date__ = '2026/10/17'
 
 """
 
@@ -29,6 +29,8 @@ History:
   2016/03/02: 0.0.8 extra deobfuscation code for option -f
   2016/04/13: 0.0.9 changed handling of obfuscating lines
   2017/07/21: 0.0.10 added filename to parts
+  2026/10/17: 0.0.11 added cByteStatistics: one byte histogram for %ENTROPY%, %HISTOGRAM% and %BYTESTATS%
+  2026/10/17: YARA rules are compiled with module yaracache when available (cache of compiled rules)
 
 Todo:
 """
@@ -50,6 +52,11 @@ try:
 except:
     pass
 
+try:
+    import yaracache
+except:
+    yaracache = None
+
 MALWARE_PASSWORD = 'infected'
 
 def PrintManual():
@@ -274,6 +281,13 @@ def IFF(expression, valueTrue, valueFalse):
 def IsNumeric(str):
     return re.match('^[0-9]+', str)
 
+# with module yaracache, compiled rules are cached and reused as long as the rule files don't change
+def YARACompileRules(**kwargs):
+    if yaracache == None:
+        return yara.compile(**kwargs)
+    else:
+        return yaracache.Compile(**kwargs)
+
 def YARACompile(fileordirname):
     dFilepaths = {}
     if os.path.isdir(fileordirname):
@@ -284,7 +298,7 @@ def YARACompile(fileordirname):
     else:
         for filename in ProcessAt(fileordirname):
             dFilepaths[filename] = filename
-    return yara.compile(filepaths=dFilepaths)
+    return YARACompileRules(filepaths=dFilepaths)
 
 def AddDecoder(cClass):
     global decoders
@@ -564,13 +578,34 @@ def CalculateByteStatistics(dPrevalence):
             entropy += - prevalence * math.log(prevalence, 2)
     return sumValues, entropy, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes
 
-def ExtraInfoENTROPY(data):
+# byte histogram of data, calculated once for %ENTROPY%, %HISTOGRAM% and %BYTESTATS%: each byte value present in data is counted with method count
+class cByteStatistics():
+    def __init__(self, data):
+        self.data = data
+        self.histogram = None
+        self.statistics = None
+
+    def Histogram(self):
+        if self.histogram == None:
+            self.histogram = [0] * 0x100
+            for value in set(self.data):
+                if isinstance(value, int):
+                    self.histogram[value] = self.data.count(value)
+                else:
+                    self.histogram[ord(value)] = self.data.count(value)
+        return self.histogram
+
+    def Statistics(self):
+        if self.statistics == None:
+            self.statistics = CalculateByteStatistics(dict(enumerate(self.Histogram())))
+        return self.statistics
+
+def ExtraInfoENTROPY(data, oByteStatistics=None):
     if data == None:
         return ''
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
-    sumValues, entropy, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = CalculateByteStatistics(dPrevalence)
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    sumValues, entropy, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = oByteStatistics.Statistics()
     return '%f' % entropy
 
 def ExtraInfoHEADHEX(data):
@@ -593,19 +628,19 @@ def ExtraInfoTAILASCII(data):
         return ''
     return ''.join([IFF(ord(b) >= 32, b, '.') for b in data[-16:]])
 
-def ExtraInfoHISTOGRAM(data):
+def ExtraInfoHISTOGRAM(data, oByteStatistics=None):
     if data == None:
         return ''
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    histogram = oByteStatistics.Histogram()
     result = []
     count = 0
     minimum = None
     maximum = None
     for iter in range(0x100):
-        if dPrevalence[iter] > 0:
-            result.append('0x%02x:%d' % (iter, dPrevalence[iter]))
+        if histogram[iter] > 0:
+            result.append('0x%02x:%d' % (iter, histogram[iter]))
             count += 1
             if minimum == None:
                 minimum = iter
@@ -620,13 +655,12 @@ def ExtraInfoHISTOGRAM(data):
     result.insert(2, IFF(maximum == None, '', '0x%02x' % maximum))
     return ','.join(result)
 
-def ExtraInfoBYTESTATS(data):
+def ExtraInfoBYTESTATS(data, oByteStatistics=None):
     if data == None:
         return ''
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
-    sumValues, entropy, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = CalculateByteStatistics(dPrevalence)
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    sumValues, entropy, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = oByteStatistics.Statistics()
     return '%d,%d,%d,%d,%d' % (countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes)
 
 def GenerateExtraInfo(extra, index, indicator, type, stream):
@@ -637,6 +671,7 @@ def GenerateExtraInfo(extra, index, indicator, type, stream):
         prefix = ''
     else:
         prefix = ' '
+    oByteStatistics = cByteStatistics(stream)
     dExtras = {'%INDEX%': lambda x: '%d' % index,
                '%INDICATOR%': lambda x: indicator,
                '%LENGTH%': lambda x: IFF(stream == None, '', lambda: '%d' % len(stream)),
@@ -644,13 +679,13 @@ def GenerateExtraInfo(extra, index, indicator, type, stream):
                '%MD5%': ExtraInfoMD5,
                '%SHA1%': ExtraInfoSHA1,
                '%SHA256%': ExtraInfoSHA256,
-               '%ENTROPY%': ExtraInfoENTROPY,
+               '%ENTROPY%': lambda x: ExtraInfoENTROPY(x, oByteStatistics),
                '%HEADHEX%': ExtraInfoHEADHEX,
                '%HEADASCII%': ExtraInfoHEADASCII,
                '%TAILHEX%': ExtraInfoTAILHEX,
                '%TAILASCII%': ExtraInfoTAILASCII,
-               '%HISTOGRAM%': ExtraInfoHISTOGRAM,
-               '%BYTESTATS%': ExtraInfoBYTESTATS,
+               '%HISTOGRAM%': lambda x: ExtraInfoHISTOGRAM(x, oByteStatistics),
+               '%BYTESTATS%': lambda x: ExtraInfoBYTESTATS(x, oByteStatistics),
               }
     for variable in dExtras:
         if variable in extra:
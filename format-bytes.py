@@ -2,8 +2,8 @@
 
 __description__ = 'This is essentialy a wrapper for the struct module'
 __author__ = 'Didier Stevens'
-__version__ = '0.0.10'
-__date__ = '2019/11/08'
+__version__ = '0.0.11'
+__date__ = '2026/10/17'
 
 """
 Source code put in public domain by Didier Stevens, no Copyright
@@ -43,6 +43,7 @@ History:
   2019/07/15: 0.0.9 added tlv format parsing
   2019/11/03: 0.0.10 added bitstream support
   2019/11/08: added multibits for bitstream
+  2026/10/17: 0.0.11 added cByteStatistics: one byte histogram for %ENTROPY%, %HISTOGRAM% and %BYTESTATS%
 
 Todo:
 """
@@ -1199,6 +1200,28 @@ def CalculateByteStatistics(dPrevalence):
             countUniqueBytes += 1
     return sumValues, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes
 
+# byte histogram of data, calculated once for %ENTROPY%, %HISTOGRAM% and %BYTESTATS%: each byte value present in data is counted with method count
+class cByteStatistics():
+    def __init__(self, data):
+        self.data = data
+        self.histogram = None
+        self.statistics = None
+
+    def Histogram(self):
+        if self.histogram == None:
+            self.histogram = [0] * 0x100
+            for value in set(self.data):
+                if isinstance(value, int):
+                    self.histogram[value] = self.data.count(value)
+                else:
+                    self.histogram[ord(value)] = self.data.count(value)
+        return self.histogram
+
+    def Statistics(self):
+        if self.statistics == None:
+            self.statistics = CalculateByteStatistics(dict(enumerate(self.Histogram())))
+        return self.statistics
+
 def ExtraInfoMD5(data):
     if data == None:
         return ''
@@ -1214,13 +1237,12 @@ def ExtraInfoSHA256(data):
         return ''
     return hashlib.sha256(data).hexdigest()
 
-def ExtraInfoENTROPY(data):
+def ExtraInfoENTROPY(data, oByteStatistics=None):
     if data == None:
         return ''
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
-    sumValues, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = CalculateByteStatistics(dPrevalence)
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    sumValues, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = oByteStatistics.Statistics()
     return '%f' % entropy
 
 def ExtraInfoHEADHEX(data):
@@ -1243,19 +1265,19 @@ def ExtraInfoTAILASCII(data):
         return ''
     return ''.join([IFF(ord(b) >= 32 and ord(b) < 128, b, '.') for b in data[-16:]])
 
-def ExtraInfoHISTOGRAM(data):
+def ExtraInfoHISTOGRAM(data, oByteStatistics=None):
     if data == None:
         return ''
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    histogram = oByteStatistics.Histogram()
     result = []
     count = 0
     minimum = None
     maximum = None
     for iter in range(0x100):
-        if dPrevalence[iter] > 0:
-            result.append('0x%02x:%d' % (iter, dPrevalence[iter]))
+        if histogram[iter] > 0:
+            result.append('0x%02x:%d' % (iter, histogram[iter]))
             count += 1
             if minimum == None:
                 minimum = iter
@@ -1270,13 +1292,12 @@ def ExtraInfoHISTOGRAM(data):
     result.insert(2, IFF(maximum == None, '', '0x%02x' % maximum))
     return ','.join(result)
 
-def ExtraInfoBYTESTATS(data):
+def ExtraInfoBYTESTATS(data, oByteStatistics=None):
     if data == None:
         return ''
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
-    sumValues, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = CalculateByteStatistics(dPrevalence)
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    sumValues, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = oByteStatistics.Statistics()
     return '%d,%d,%d,%d,%d' % (countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes)
 
 def GenerateExtraInfo(extra, data):
@@ -1284,17 +1305,18 @@ def GenerateExtraInfo(extra, data):
         return ''
     if extra.startswith('!') or extra.startswith('#'):
         extra = extra[1:]
+    oByteStatistics = cByteStatistics(data)
     dExtras = {'%LENGTH%': lambda x: IFF(data == None, '', lambda: '%d' % len(data)),
                '%MD5%': ExtraInfoMD5,
                '%SHA1%': ExtraInfoSHA1,
                '%SHA256%': ExtraInfoSHA256,
-               '%ENTROPY%': ExtraInfoENTROPY,
+               '%ENTROPY%': lambda x: ExtraInfoENTROPY(x, oByteStatistics),
                '%HEADHEX%': ExtraInfoHEADHEX,
                '%HEADASCII%': ExtraInfoHEADASCII,
                '%TAILHEX%': ExtraInfoTAILHEX,
                '%TAILASCII%': ExtraInfoTAILASCII,
-               '%HISTOGRAM%': ExtraInfoHISTOGRAM,
-               '%BYTESTATS%': ExtraInfoBYTESTATS,
+               '%HISTOGRAM%': lambda x: ExtraInfoHISTOGRAM(x, oByteStatistics),
+               '%BYTESTATS%': lambda x: ExtraInfoBYTESTATS(x, oByteStatistics),
               }
     for variable in dExtras:
         if variable in extra:
@@ -2,8 +2,8 @@
 
 __description__ = 'Network Appliance Forensic Toolkit - IOS Core Dumps'
 __author__ = 'Didier Stevens'
-__version__ = '0.0.9'
-__date__ = '2015/02/10'
+__version__ = '0.0.10'
+__date__ = '2026/10/17'
 
 """
 
@@ -33,6 +33,7 @@ History:
   2014/10/23: V0.0.9: option -w now also for heap command
   2014/10/24: added option -D and command integritycheck
   2015/02/10: added YARA support
+  2026/10/17: 0.0.10 YARA rules are compiled with module yaracache when available (cache of compiled rules)
 
 Todo:
 """
@@ -52,6 +53,11 @@ try:
 except:
     pass
 
+try:
+    import yaracache
+except:
+    yaracache = None
+
 def IOSRegions(coredumpFilename, options):
     oIOSCoreDump = naft_impf.cIOSCoreDump(coredumpFilename)
     if oIOSCoreDump.error  != '':
@@ -103,6 +109,13 @@ def ProcessAt(argument):
     else:
         return [argument]
 
+# with module yaracache, compiled rules are cached and reused as long as the rule files don't change
+def YARACompileRules(**kwargs):
+    if yaracache == None:
+        return yara.compile(**kwargs)
+    else:
+        return yaracache.Compile(**kwargs)
+
 def YARACompile(fileordirname):
     dFilepaths = {}
     if os.path.isdir(fileordirname):
@@ -113,7 +126,7 @@ def YARACompile(fileordirname):
     else:
         for filename in ProcessAt(fileordirname):
             dFilepaths[filename] = filename
-    return yara.compile(filepaths=dFilepaths)
+    return YARACompileRules(filepaths=dFilepaths)
 
 def AddDecoder(cClass):
     global decoders
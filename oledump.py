@@ -2,8 +2,8 @@
 
 __description__ = 'Analyze OLE files (Compound Binary Files)'
 __author__ = 'Didier Stevens'
-__version__ = '0.0.42'
-__date__ = '2019/03/12'
+__version__ = '0.0.43'
+__date__ = '2026/10/17'
 
 """
 
@@ -85,6 +85,13 @@ History:
   2018/12/18: 0.0.40 added option --password
   2019/02/16: 0.0.41 updated Cut
   2019/03/12: 0.0.42 added warning for ZIP container without ole file; fixed selectiong warning
+  2026/10/17: 0.0.43 added cVBADecompressCache: each VBA stream is decompressed only once per document
+  2026/10/17: added DecompressBytearray: faster VBA decompression
+  2026/10/17: ParseVBADIR parses all VBA/dir records with an offset (cVBADIR), available to plugins via global vbadir
+  2026/10/17: added cByteStatistics: one byte histogram for %ENTROPY%, %HISTOGRAM% and %BYTESTATS%
+  2026/10/17: OLEGetStreams is a generator of cOLEStream objects: stream content is read one stream at a time; added option --vbastorageonly
+  2026/10/17: added batch mode for more than one file, with options --jobs, --batchoutput, --timeout and --memorylimit
+  2026/10/17: YARA rules are compiled with module yaracache when available (cache of compiled rules)
 
 Todo:
 """
@@ -105,6 +112,10 @@ import string
 import codecs
 import json
 import struct
+import collections
+import glob
+import time
+import multiprocessing
 if sys.version_info[0] >= 3:
     from io import StringIO
 else:
@@ -115,11 +126,21 @@ try:
 except:
     dslsimulationdb = None
 
+try:
+    import resource
+except:
+    resource = None
+
 try:
     import yara
 except:
     pass
 
+try:
+    import yaracache
+except:
+    yaracache = None
+
 try:
     import olefile
 except:
@@ -300,6 +321,8 @@ C:\Demo>oledump.py -i Book2-vba.xls
 Modules can contain compiled code and source code (usually, both). In this example, stream 7 and 8 have extra information: the size of the compiled code (left of the + sign) and the size of de source code (right of the + sign).
 Stream 7 is a module with size 985, the first 813 bytes are the compiled code and the last 172 bytes are the source code.
 
+To produce the overview, oledump reads the content of every stream (one stream at a time) and searches it for compressed VBA code. For large files with large streams that are not VBA code, option --vbastorageonly makes oledump search only the streams in a VBA storage, the modules listed in the VBA/dir stream and orphaned streams: other streams are not read (unless their content is needed for options like --calc, -E, -p and -y), and their length is the size in the directory entry. Compressed VBA code stored in other streams is not detected with this option.
+
 When selecting the content of modules, the index can be suffixed with c to select only the bytes of the compiled code, or with s to select only the bytes of the source code:
 C:\Demo>oledump.py -s 7s Book2-vba.xls
 00000000: 01 A8 B0 00 41 74 74 72  69 62 75 74 00 65 20 56  ....Attribut.e V
@@ -359,6 +382,7 @@ C:\Demo>oledump.py -s 6 -e Book1-insert-object-calc-rol3.exe.xls > extracted.bin
 Analyzing the content of streams (and VBA macros) can be quite challenging. To help with the analysis, oledump provides support for plugins and YARA rules.
 
 plugins are Python programs that take the stream content as input and try to analyze it. Plugins can analyze the raw stream content or the decompressed VBA macro source code. Plugins analyze all streams, you don't need to select a particular stream.
+Plugins can use global variable vbadir: it contains the parsed VBA/dir streams of the document that is analyzed (project information, references and modules). For example, vbadir.ModuleInfo(name) returns the module information for a stream that is a VBA code module, and None for other streams.
 VBA macros code in malicious documents is often obfuscated, and hard to understand. plugin_http_heuristics is a plugin for VBA macros that tries to recover the URL used to download the trojan in a malicious Office document. This URL is often obfuscated, for example by using hexadecimal or base64 strings to represent the URL. plugin_http_heuristics tries several heuristics to recover a URL.
 Example:
 C:\Demo>oledump.py -p plugin_http_heuristics sample.xls
@@ -409,6 +433,8 @@ C:\Demo>oledump.py -y contains_pe_file.yara Book1-insert-object-exe.xls
 
 In this example, you use YARA rule contains_pe_file.yara to find PE files (executables) inside Microsoft Office files. The rule triggered for stream 5, because it contains an EXE file embedded as OLE object.
 
+When module yaracache (yaracache.py) is installed and environment variable YARACACHE is set to a directory, compiled YARA rules are saved in this cache directory. The next time the same rules are used, they are loaded from the cache in stead of compiled. The cache key is a hash of the rule sources, including the files of an at-file or a directory and the files they include: when a rule file changes, the rules are compiled again. Without environment variable YARACACHE, rules are not cached.
+
 If you want more information about what was detected by the YARA rule, use option --yarastrings like in this example:
 C:\Demo>oledump.py -y contains_pe_file.yara --yarastrings Book1-insert-object-exe.xls
   1:       107 '\\x01CompObj'
@@ -573,6 +599,10 @@ With option -T (--headtail), output can be truncated to the first 10 lines and l
 
 With option -j, oledump will output the content of the ole file as a JSON object that can be piped into other tools that support this JSON format.
 
+oledump can analyze more than one file: provide several filenames, wildcards or @files (a text file with a filename per line). This is batch mode: the plugins, decoders and YARA rules are loaded once, and the output of each file is printed after a line with the filename (File: ...). With option --batchoutput jsonl, each file produces one JSON object (one line) with the filename, the return code, the output and the error.
+With option --jobs, the files are analyzed in parallel by the given number of worker processes (0 is the number of CPUs). The output remains in the order of the files.
+Option --timeout stops the analysis of a file after the given number of seconds (the worker process is terminated and replaced), and option --memorylimit limits the memory of a worker process to the given number of MB (not supported on Windows). This protects a batch against malformed files that make olefile spin or consume all memory.
+
 The return codes of oledump are:
  -1 when an error occured
  0 when the file is not an ole file (or does not contain an ole file)
@@ -760,14 +790,20 @@ def ParseTokenSequence(data):
                 data = data[1:]
     return result, data
 
-def OffsetBits(data):
-    numberOfBits = int(math.ceil(math.log(len(data), 2)))
+def OffsetBitsLength(length):
+    numberOfBits = int(math.ceil(math.log(length, 2)))
     if numberOfBits < 4:
         numberOfBits = 4
     elif numberOfBits > 12:
         numberOfBits = 12
     return numberOfBits
 
+def OffsetBits(data):
+    return OffsetBitsLength(len(data))
+
+# index is the length of the decompressed chunk (index 0 is not used), longer chunks use 12 bits
+OFFSET_BITS = [4] + [OffsetBitsLength(length) for length in range(1, 4097)]
+
 def Bin(number):
     result = bin(number)[2:]
     while len(result) < 16:
@@ -811,16 +847,73 @@ def DecompressChunk(compressedChunk):
                 decompressedChunk += copy
     return decompressedChunk, compressedChunk[size:]
 
+# same result as DecompressChunk, but the compressed data is walked with an offset and the chunks are decompressed in place in a bytearray
+# returns (False, chunks decompressed before the error) when a chunk can not be decompressed
+def DecompressBytearray(compressedData):
+    data = bytearray(C2BIP3(compressedData))
+    decompressed = bytearray()
+    end = len(data)
+    position = 1
+    while position < end:
+        if end - position < 2:
+            return (False, decompressed)
+        chunkPosition = position
+        header = data[position] + data[position + 1] * 0x100
+        size = (header & 0x0FFF) + 3
+        chunkEnd = min(position + size, end)
+        position += 2
+        if header & 0x8000 == 0:
+            decompressed.extend(data[position:chunkEnd])
+        else:
+            chunkStart = len(decompressed)
+            while position < chunkEnd:
+                flags = data[position]
+                position += 1
+                if flags == 0:
+                    literalEnd = min(position + 8, chunkEnd)
+                    decompressed.extend(data[position:literalEnd])
+                    position = literalEnd
+                    continue
+                for mask in [0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80]:
+                    if position >= chunkEnd:
+                        break
+                    # a copy token truncated to 1 byte is a literal token
+                    if flags & mask == 0 or position + 1 == chunkEnd:
+                        decompressed.append(data[position])
+                        position += 1
+                        continue
+                    lengthChunk = len(decompressed) - chunkStart
+                    if lengthChunk == 0:
+                        del decompressed[chunkStart:]
+                        return (False, decompressed)
+                    if lengthChunk < len(OFFSET_BITS):
+                        numberOfOffsetBits = OFFSET_BITS[lengthChunk]
+                    else:
+                        numberOfOffsetBits = 12
+                    copyToken = data[position] + data[position + 1] * 0x100
+                    position += 2
+                    offset = 1 + (copyToken >> (16 - numberOfOffsetBits))
+                    length = 3 + (((copyToken << numberOfOffsetBits) & 0xFFFF) >> numberOfOffsetBits)
+                    # an offset before the start of the chunk copies from the start of the chunk
+                    copyStart = len(decompressed) - min(offset, lengthChunk)
+                    lengthCopy = len(decompressed) - copyStart
+                    if length <= lengthCopy:
+                        decompressed.extend(decompressed[copyStart:copyStart + length])
+                    else:
+                        decompressed.extend((decompressed[copyStart:] * (length // lengthCopy + 1))[:length])
+        position = chunkPosition + size
+    return (True, decompressed)
+
 def Decompress(compressedData, replace=True):
     if compressedData[0] != chr(1):
         return (False, None)
-    remainder = compressedData[1:]
-    decompressed = ''
-    while len(remainder) != 0:
-        decompressedChunk, remainder = DecompressChunk(remainder)
-        if decompressedChunk == None:
-            return (False, decompressed)
-        decompressed += decompressedChunk
+    result, decompressed = DecompressBytearray(compressedData)
+    if sys.version_info[0] > 2:
+        decompressed = decompressed.decode('latin')
+    else:
+        decompressed = str(decompressed)
+    if not result:
+        return (False, decompressed)
     if replace:
         return (True, decompressed.replace('\r\n', '\n'))
     else:
@@ -846,8 +939,7 @@ def SkipAttributes(text):
         text = text[len(oMatch.group()):]
     return text
 
-def SearchAndDecompress(data, ifError='Error: unable to decompress\n', skipAttributes=False):
-    result, decompress = SearchAndDecompressSub(data)
+def SearchAndDecompressResult(result, decompress, ifError, skipAttributes):
     if result or ifError == None:
         if skipAttributes:
             return SkipAttributes(decompress)
@@ -856,6 +948,29 @@ def SearchAndDecompress(data, ifError='Error: unable to decompress\n', skipAttri
     else:
         return ifError
 
+def SearchAndDecompress(data, ifError='Error: unable to decompress\n', skipAttributes=False):
+    result, decompress = SearchAndDecompressSub(data)
+    return SearchAndDecompressResult(result, decompress, ifError, skipAttributes)
+
+# decompression results of the VBA streams of a document, keyed by stream path: the listing, option -E, option --calc, the plugins, YARA and the selection all use the same decompression
+class cVBADecompressCache():
+    def __init__(self):
+        self.dCache = {}
+
+    def SearchAndDecompressSub(self, key, data):
+        if key in self.dCache and self.dCache[key][0] == data:
+            return self.dCache[key][1]
+        result = SearchAndDecompressSub(data)
+        self.dCache[key] = [data, result]
+        return result
+
+    def SearchAndDecompress(self, key, data, ifError='Error: unable to decompress\n', skipAttributes=False):
+        result, decompress = self.SearchAndDecompressSub(key, data)
+        return SearchAndDecompressResult(result, decompress, ifError, skipAttributes)
+
+    def MacrosContainsOnlyAttributesOrOptions(self, key, data):
+        return VBAContainsOnlyAttributesOrOptions(self.SearchAndDecompress(key, data))
+
 def ReadWORD(data):
     if len(data) < 2:
         return None, None
@@ -918,7 +1033,8 @@ def Info(data):
     return 'String 1: %s\nString 2: %s\nString 3: %s\nSize embedded file: %d\nMD5 embedded file: %s\nMAGIC:  %s\nHeader: %s\n' % (result[0], result[1], result[2], len(result[3]), hashlib.md5(result[3]).hexdigest(), GenerateMAGIC(result[3][0:4]), GenerateMAGIC(result[3][0:16]))
 
 def IfWIN32SetBinary(io):
-    if sys.platform == 'win32':
+    # in batch mode, stdout is captured with a StringIO object
+    if sys.platform == 'win32' and hasattr(io, 'fileno'):
         import msvcrt
         msvcrt.setmode(io.fileno(), os.O_BINARY)
 
@@ -1035,13 +1151,16 @@ def DecodeFunction(decoders, options, stream):
         return stream
     return decoders[0](stream, options.decoderoptions).Decode()
 
-def MacrosContainsOnlyAttributesOrOptions(stream):
-    lines = SearchAndDecompress(stream).split('\n')
+def VBAContainsOnlyAttributesOrOptions(vba):
+    lines = vba.split('\n')
     for line in [line.strip() for line in lines]:
         if line != '' and not line.startswith('Attribute ') and not line == 'Option Explicit':
             return False
     return True
 
+def MacrosContainsOnlyAttributesOrOptions(stream):
+    return VBAContainsOnlyAttributesOrOptions(SearchAndDecompress(stream))
+
 #https://msdn.microsoft.com/en-us/library/windows/desktop/dd317756%28v=vs.85%29.aspx
 dCodepages = {
     037: 'IBM EBCDIC US-Canada',
@@ -1425,11 +1544,32 @@ def CalculateByteStatistics(dPrevalence):
             entropy += - prevalence * math.log(prevalence, 2)
     return sumValues, entropy, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes
 
-def ExtraInfoENTROPY(data):
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
-    sumValues, entropy, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = CalculateByteStatistics(dPrevalence)
+# byte histogram of data, calculated once for %ENTROPY%, %HISTOGRAM% and %BYTESTATS%: each byte value present in data is counted with method count
+class cByteStatistics():
+    def __init__(self, data):
+        self.data = data
+        self.histogram = None
+        self.statistics = None
+
+    def Histogram(self):
+        if self.histogram == None:
+            self.histogram = [0] * 0x100
+            for value in set(self.data):
+                if isinstance(value, int):
+                    self.histogram[value] = self.data.count(value)
+                else:
+                    self.histogram[ord(value)] = self.data.count(value)
+        return self.histogram
+
+    def Statistics(self):
+        if self.statistics == None:
+            self.statistics = CalculateByteStatistics(dict(enumerate(self.Histogram())))
+        return self.statistics
+
+def ExtraInfoENTROPY(data, oByteStatistics=None):
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    sumValues, entropy, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = oByteStatistics.Statistics()
     return '%f' % entropy
 
 def ExtraInfoHEADHEX(data):
@@ -1444,17 +1584,17 @@ def ExtraInfoTAILHEX(data):
 def ExtraInfoTAILASCII(data):
     return ''.join([IFF(ord(b) >= 32, b, '.') for b in data[-16:]])
 
-def ExtraInfoHISTOGRAM(data):
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
+def ExtraInfoHISTOGRAM(data, oByteStatistics=None):
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    histogram = oByteStatistics.Histogram()
     result = []
     count = 0
     minimum = None
     maximum = None
     for iter in range(0x100):
-        if dPrevalence[iter] > 0:
-            result.append('0x%02x:%d' % (iter, dPrevalence[iter]))
+        if histogram[iter] > 0:
+            result.append('0x%02x:%d' % (iter, histogram[iter]))
             count += 1
             if minimum == None:
                 minimum = iter
@@ -1469,11 +1609,10 @@ def ExtraInfoHISTOGRAM(data):
     result.insert(2, IFF(maximum == None, '', '0x%02x' % maximum))
     return ','.join(result)
 
-def ExtraInfoBYTESTATS(data):
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
-    sumValues, entropy, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = CalculateByteStatistics(dPrevalence)
+def ExtraInfoBYTESTATS(data, oByteStatistics=None):
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    sumValues, entropy, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = oByteStatistics.Statistics()
     return '%d,%d,%d,%d,%d' % (countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes)
 
 def GenerateExtraInfo(extra, index, indicator, name, stream):
@@ -1486,6 +1625,7 @@ def GenerateExtraInfo(extra, index, indicator, name, stream):
         prefix = ' '
     if indicator == ' ':
         indicator = ''
+    oByteStatistics = cByteStatistics(stream)
     dExtras = {'%INDEX%': lambda x: index,
                '%INDICATOR%': lambda x: indicator,
                '%LENGTH%': lambda x: '%d' % len(stream),
@@ -1493,21 +1633,23 @@ def GenerateExtraInfo(extra, index, indicator, name, stream):
                '%MD5%': ExtraInfoMD5,
                '%SHA1%': ExtraInfoSHA1,
                '%SHA256%': ExtraInfoSHA256,
-               '%ENTROPY%': ExtraInfoENTROPY,
+               '%ENTROPY%': lambda x: ExtraInfoENTROPY(x, oByteStatistics),
                '%HEADHEX%': ExtraInfoHEADHEX,
                '%HEADASCII%': ExtraInfoHEADASCII,
                '%TAILHEX%': ExtraInfoTAILHEX,
                '%TAILASCII%': ExtraInfoTAILASCII,
-               '%HISTOGRAM%': ExtraInfoHISTOGRAM,
-               '%BYTESTATS%': ExtraInfoBYTESTATS,
+               '%HISTOGRAM%': lambda x: ExtraInfoHISTOGRAM(x, oByteStatistics),
+               '%BYTESTATS%': lambda x: ExtraInfoBYTESTATS(x, oByteStatistics),
               }
     for variable in dExtras:
         if variable in extra:
             extra = extra.replace(variable, dExtras[variable](stream))
     return prefix + extra.replace(r'\t', '\t').replace(r'\n', '\n')
 
-def OLE10HeaderPresent(data):
-    length = len(data)
+# length is the size of the stream when data is only the head of the stream
+def OLE10HeaderPresent(data, length=None):
+    if length == None:
+        length = len(data)
     if length < 6:
         return False
     size, data = ReadDWORD(data)
@@ -1518,17 +1660,56 @@ def OLE10HeaderPresent(data):
     version, data = ReadWORD(data)
     return version ==2
 
+# the content of a stream is only read when method Data is called
+# entry is compared with is None: olefile's OleDirectoryEntry overloads == and fails when comparing with None
+class cOLEStream():
+    def __init__(self, ole, fname=None, entry=None):
+        self.ole = ole
+        self.fname = fname
+        self.entry = entry
+        self.data = None
+
+    # size according to the directory entry, the content can be shorter for malformed files
+    def Size(self):
+        if self.entry is None:
+            return self.ole.get_size(self.fname)
+        else:
+            return self.entry.size
+
+    # length of the content when it has been read, otherwise the size according to the directory entry
+    def Length(self):
+        if self.data == None:
+            return self.Size()
+        else:
+            return len(self.data)
+
+    def Data(self):
+        if self.data == None:
+            if self.entry is None:
+                self.data = self.ole.openstream(self.fname).read()
+            else:
+                self.data = self.ole._open(self.entry.isectStart, self.entry.size).read()
+        return self.data
+
+    # the first size bytes of the content, only the sectors with these bytes are read
+    def Head(self, size):
+        if self.data != None:
+            return self.data[:size]
+        entry = self.entry
+        if entry is None:
+            entry = self.ole.direntries[self.ole._find(self.fname)]
+        return self.ole._open(entry.isectStart, min(size, entry.size), force_FAT=entry.size >= self.ole.minisectorcutoff).read()
+
+# generator: streams are enumerated from the directory, the content is read with cOLEStream.Data
 def OLEGetStreams(ole):
-    olestreams = []
     for fname in ole.listdir():
-        olestreams.append([0, fname, ole.get_type(fname), ole.openstream(fname).read()])
+        yield [0, fname, ole.get_type(fname), cOLEStream(ole, fname)]
     for sid in range(len(ole.direntries)):
         entry = ole.direntries[sid]
         if entry is None:
             entry = ole._load_direntry(sid)
             if entry.entry_type == 2:
-                olestreams.append([1, entry.name, entry.entry_type, ole._open(entry.isectStart, entry.size).read()])
-    return olestreams
+                yield [1, entry.name, entry.entry_type, cOLEStream(ole, entry=entry)]
 
 def SelectPart(stream, part, moduleinfodata):
     if part == '':
@@ -1542,73 +1723,147 @@ def SelectPart(stream, part, moduleinfodata):
     else:
         return stream[moduleinfodata[6]:]
 
+# record ids of the VBA/dir stream that can start a REFERENCE record (MS-OVBA 2.3.4.2.2)
+VBADIR_REFERENCE_IDS = [0x0016, 0x0033, 0x002F, 0x000D, 0x000E]
+# record ids that can precede a record of the same REFERENCE record
+VBADIR_REFERENCE_CONTINUATION_IDS = [0x0016, 0x003E, 0x0033, 0x002F]
+
+# returns a list of [id, data] records
+def ParseVBADIRRecords(vbadirdata):
+    records = []
+    position = 0
+    while position + 6 <= len(vbadirdata):
+        id, size = struct.unpack_from('<HI', vbadirdata, position)
+        position += 6
+        # PROJECTVERSION: the size field is 4, but 6 bytes follow
+        if id == 0x0009:
+            size = 6
+        records.append([id, vbadirdata[position:position + size]])
+        position += size
+        if id == 0x0010:
+            break
+    return records
+
+def UnpackRecordInteger(format, data):
+    if len(data) != struct.calcsize(format):
+        return None
+    return struct.unpack(format, data)[0]
+
+class cVBAProject():
+    def __init__(self, path, records):
+        self.path = path
+        self.records = records
+        # PROJECTINFORMATION records: id -> data
+        self.dInformation = {}
+        # list of REFERENCE records, each is a list of [id, data] records
+        self.references = []
+        self.moduleCount = None
+        self.cookie = None
+        # list of modules: [name, nameunicode, streamname, streamnameunicode, docstring, docstringunicode, offset, helpcontext, cookie, type, readonly, private]
+        self.modules = []
+
+        section = 'information'
+        previousId = None
+        module = None
+        for id, data in records:
+            if section == 'information' and id in VBADIR_REFERENCE_IDS:
+                section = 'references'
+            if id == 0x000F:
+                section = 'modules'
+                self.moduleCount = UnpackRecordInteger('<H', data)
+            if section == 'information':
+                self.dInformation[id] = data
+            elif section == 'references':
+                if id in VBADIR_REFERENCE_IDS and not previousId in VBADIR_REFERENCE_CONTINUATION_IDS or self.references == []:
+                    self.references.append([])
+                self.references[-1].append([id, data])
+            elif id == 0x0013 and module == None:
+                self.cookie = UnpackRecordInteger('<H', data)
+            elif id == 0x0019:
+                module = [data, '', '', '', '', '', None, None, None, None, False, False]
+            elif module != None:
+                if id == 0x0047:
+                    module[1] = data
+                elif id == 0x001A:
+                    module[2] = data
+                elif id == 0x0032:
+                    module[3] = data
+                elif id == 0x001C:
+                    module[4] = data
+                elif id == 0x0048:
+                    module[5] = data
+                elif id == 0x0031:
+                    module[6] = UnpackRecordInteger('<I', data)
+                elif id == 0x001E:
+                    module[7] = UnpackRecordInteger('<I', data)
+                elif id == 0x002C:
+                    module[8] = UnpackRecordInteger('<H', data)
+                elif id == 0x0021:
+                    module[9] = 'procedural'
+                elif id == 0x0022:
+                    module[9] = 'document'
+                elif id == 0x0025:
+                    module[10] = True
+                elif id == 0x0028:
+                    module[11] = True
+                elif id == 0x002B:
+                    self.modules.append(module)
+                    module = None
+            previousId = id
+
+    def Information(self, id):
+        return self.dInformation.get(id, None)
+
+    def Codepage(self):
+        return UnpackRecordInteger('<H', self.dInformation.get(0x0003, ''))
+
+    def Name(self):
+        return self.dInformation.get(0x0004, '')
+
+# the parsed VBA/dir streams of a document
+class cVBADIR():
+    def __init__(self):
+        self.projects = []
+        # path of the module stream (tuple) -> module
+        self.dModules = {}
+
+    def Add(self, path, vbadirdata):
+        oVBAProject = cVBAProject(path, ParseVBADIRRecords(vbadirdata))
+        self.projects.append(oVBAProject)
+        for module in oVBAProject.modules:
+            if module[2] == '' or module[6] == None:
+                continue
+            # olefile returns UTF-8 stream names, the MBCS stream name is only equal for ASCII names
+            streamnames = [module[2]]
+            try:
+                streamnames.append(module[3].decode('utf-16-le').encode('utf-8'))
+            except:
+                pass
+            for streamname in streamnames:
+                self.dModules[tuple(path[:-1] + [streamname])] = module
+
+    # fname is a stream path as returned by olefile's listdir method
+    def ModuleInfo(self, fname):
+        if not isinstance(fname, list):
+            return None
+        return self.dModules.get(tuple(fname), None)
+
 def ParseVBADIR(ole):
-    vbadirinfo = []
+    oVBADIR = cVBADIR()
     for fname in ole.listdir():
         if len(fname) >= 2 and fname[-2] == 'VBA' and fname[-1] == 'dir':
-            vbadirinfo = [fname]
-            status, vbadirdata = Decompress(ole.openstream(fname).read(), False)
+            vbadirdata = ole.openstream(fname).read()
+            if vbadirdata == '':
+                continue
+            status, vbadirdata = Decompress(vbadirdata, False)
             if status:
-                for position in FindAll(vbadirdata, '\x0F\x00\x02\x00\x00\x00'):
-                    result = struct.unpack('<HIHHIHH', vbadirdata[position:][0:18])
-                    if result[3] == 0x13 and result[4] == 0x02 and result[6] == 0x19:
-                        vbadirinfo.append(result[2])
-                        moduledata = vbadirdata[position + 16:]
-                        moduleinfo = {}
-                        while len(moduledata) > 2 and moduledata[0:2] == '\x19\x00':
-                            result = struct.unpack('<HI', moduledata[0:6])
-                            moduledata = moduledata[6:]
-                            namerecord = moduledata[0:result[1]]
-                            moduledata = moduledata[result[1]:]
-                            result = struct.unpack('<HI', moduledata[0:6])
-                            if result[0] != 0x47:
-                                break
-                            moduledata = moduledata[6:]
-                            nameunicoderecord = moduledata[0:result[1]]
-                            moduledata = moduledata[result[1]:]
-                            result = struct.unpack('<HI', moduledata[0:6])
-                            if result[0] != 0x1A:
-                                break
-                            moduledata = moduledata[6:]
-                            streamnamerecord = moduledata[0:result[1]]
-                            moduledata = moduledata[result[1]:]
-                            result = struct.unpack('<HI', moduledata[0:6])
-                            if result[0] != 0x32:
-                                break
-                            moduledata = moduledata[6:]
-                            streamnameunicoderecord = moduledata[0:result[1]]
-                            moduledata = moduledata[result[1]:]
-                            result = struct.unpack('<HI', moduledata[0:6])
-                            if result[0] != 0x1C:
-                                break
-                            moduledata = moduledata[6:]
-                            docstringrecordrecord = moduledata[0:result[1]]
-                            moduledata = moduledata[result[1]:]
-                            result = struct.unpack('<HI', moduledata[0:6])
-                            if result[0] != 0x48:
-                                break
-                            moduledata = moduledata[6:]
-                            docstringunicoderecordrecord = moduledata[0:result[1]]
-                            moduledata = moduledata[result[1]:]
-                            result = struct.unpack('<HII', moduledata[0:10])
-                            if result[0] != 0x31 or result[1] != 0x04:
-                                break
-                            moduledata = moduledata[10:]
-                            moduleoffset = result[2]
-                            moduledata = moduledata[10 + 8 + 6:]
-                            if moduledata[0:2] != '\x2B\x00':
-                                moduledata = moduledata[6:]
-                            if moduledata[0:2] != '\x2B\x00':
-                                moduledata = moduledata[6:]
-                            moduledata = moduledata[2 + 4:]
-                            moduleinfo[streamnamerecord] = [namerecord, nameunicoderecord, streamnamerecord, streamnameunicoderecord, docstringrecordrecord, docstringunicoderecordrecord, moduleoffset]
-                        if moduleinfo != {}:
-                            vbadirinfo.append(moduleinfo)
-    return vbadirinfo
+                oVBADIR.Add(fname, vbadirdata)
+    return oVBADIR
 
 def OLESub(ole, prefix, rules, options):
     global plugins
     global decoders
+    global vbadir
 
     returnCode = 1
     selectionCounter = 0
@@ -1636,22 +1891,22 @@ def OLESub(ole, prefix, rules, options):
     if options.jsonoutput:
         object = []
         counter = 1
-        for orphan, fname, entry_type, stream in OLEGetStreams(ole):
-            object.append({'id': counter, 'name': PrintableName(fname), 'content': binascii.b2a_base64(stream).strip('\n')})
+        for orphan, fname, entry_type, oOLEStream in OLEGetStreams(ole):
+            object.append({'id': counter, 'name': PrintableName(fname), 'content': binascii.b2a_base64(oOLEStream.Data()).strip('\n')})
             counter += 1
         print(json.dumps({'version': 2, 'id': 'didierstevens.com', 'type': 'content', 'fields': ['id', 'name', 'content'], 'items': object}))
         return (returnCode, 0)
 
-    vbadirinfo = ParseVBADIR(ole)
-    if len(vbadirinfo) == 3:
-        dModuleinfo = vbadirinfo[2]
-    else:
-        dModuleinfo = {}
+    vbadir = ParseVBADIR(ole)
+
+    oVBADecompressCache = cVBADecompressCache()
 
     if options.select == '':
         counter = 1
         vbaConcatenate = ''
-        for orphan, fname, entry_type, stream in OLEGetStreams(ole):
+        for orphan, fname, entry_type, oOLEStream in OLEGetStreams(ole):
+            # the content is read one stream at a time; with option --vbastorageonly, it is only read for VBA streams, plugins, YARA rules, hashes and extra info
+            streamKey = PrintableName(fname, orphan)
             indicator = ' '
             macroPresent = False
             if options.info:
@@ -1662,29 +1917,37 @@ def OLESub(ole, prefix, rules, options):
             if entry_type == 1:
                 indicator = '.'
             elif entry_type == 2:
-                lengthString = '%7d' % len(stream)
-                moduleinfodata = dModuleinfo.get(fname[-1], None)
+                moduleinfodata = vbadir.ModuleInfo(fname)
+                # with option --vbastorageonly, only streams in a VBA storage, modules listed in the dir stream and orphaned streams are searched for compressed VBA code
+                if not options.vbastorageonly or orphan or moduleinfodata != None or len(fname) >= 2 and fname[-2].upper() == 'VBA':
+                    macroPresent = FindCompression(oOLEStream.Data()) != -1
+                elif options.calc or options.extra != '' or plugins != [] or options.yara != None:
+                    oOLEStream.Data()
+                # the length of the content that was read: for malformed files, it can be shorter than the size in the directory entry
+                size = oOLEStream.Length()
+                lengthString = '%7d' % size
                 if options.info and moduleinfodata != None:
-                    moduleinfo = '%d+%d' % (moduleinfodata[6], len(stream) - moduleinfodata[6])
+                    moduleinfo = '%d+%d' % (moduleinfodata[6], size - moduleinfodata[6])
                     moduleinfo = '%12s' % moduleinfo
-                macroPresent = FindCompression(stream) != -1
                 if macroPresent:
                     returnCode = 2
-                    if not SearchAndDecompressSub(stream)[0]:
+                    if not oVBADecompressCache.SearchAndDecompressSub(streamKey, oOLEStream.Data())[0]:
                         indicator = 'E'
                     else:
                         indicator = 'M'
-                        if MacrosContainsOnlyAttributesOrOptions(stream):
+                        if oVBADecompressCache.MacrosContainsOnlyAttributesOrOptions(streamKey, oOLEStream.Data()):
                             indicator = 'm'
-                elif OLE10HeaderPresent(stream):
+                elif OLE10HeaderPresent(oOLEStream.Head(6), size):
                     indicator = 'O'
             index = '%s%d' % (prefix, counter)
             if not options.quiet:
                 line = '%3s: %s %s%s %s' % (index, indicator, lengthString, moduleinfo, PrintableName(fname, orphan))
                 if indicator.lower() == 'm' and options.vbadecompress:
-                    streamForExtra = SearchAndDecompress(stream)
+                    streamForExtra = oVBADecompressCache.SearchAndDecompress(streamKey, oOLEStream.Data())
+                elif options.calc or options.extra != '':
+                    streamForExtra = oOLEStream.Data()
                 else:
-                    streamForExtra = stream
+                    streamForExtra = ''
                 if options.calc:
                     line += ' %s' % hashlib.md5(streamForExtra).hexdigest()
                 if options.extra.startswith('!'):
@@ -1694,9 +1957,9 @@ def OLESub(ole, prefix, rules, options):
             for cPlugin in plugins:
                 try:
                     if cPlugin.macroOnly and macroPresent:
-                        oPlugin = cPlugin(fname, SearchAndDecompress(stream), options.pluginoptions)
+                        oPlugin = cPlugin(fname, oVBADecompressCache.SearchAndDecompress(streamKey, oOLEStream.Data()), options.pluginoptions)
                     elif not cPlugin.macroOnly:
-                        oPlugin = cPlugin(fname, stream, options.pluginoptions)
+                        oPlugin = cPlugin(fname, oOLEStream.Data(), options.pluginoptions)
                     else:
                         oPlugin = None
                 except Exception as e:
@@ -1727,6 +1990,7 @@ def OLESub(ole, prefix, rules, options):
                                     print('                 ' + MyRepr(line))
             counter += 1
             if options.yara != None:
+                stream = oOLEStream.Data()
                 oDecoders = [cIdentity(stream, None)]
                 for cDecoder in decoders:
                     try:
@@ -1747,7 +2011,7 @@ def OLESub(ole, prefix, rules, options):
                                     print('                %s' % binascii.hexlify(C2BIP3(stringdata[2])))
                                     print('                %s' % repr(stringdata[2]))
             if indicator.lower() == 'm':
-                vbaConcatenate += SearchAndDecompress(stream) + '\n'
+                vbaConcatenate += oVBADecompressCache.SearchAndDecompress(streamKey, oOLEStream.Data()) + '\n'
         if options.yara != None and vbaConcatenate != '':
             print('All VBA source code:')
             for result in rules.match(data=vbaConcatenate, externals={'streamname': '', 'VBA': True}):
@@ -1772,16 +2036,16 @@ def OLESub(ole, prefix, rules, options):
             DumpFunction = HexDump
         elif options.vbadecompress:
             if options.select == 'a':
-                DumpFunction = lambda x: SearchAndDecompress(x, '')
+                DumpFunction = lambda x: oVBADecompressCache.SearchAndDecompress(streamKey, x, '')
             else:
-                DumpFunction = SearchAndDecompress
+                DumpFunction = lambda x: oVBADecompressCache.SearchAndDecompress(streamKey, x)
         elif options.vbadecompressskipattributes:
             if options.select == 'a':
-                DumpFunction = lambda x: SearchAndDecompress(x, '', True)
+                DumpFunction = lambda x: oVBADecompressCache.SearchAndDecompress(streamKey, x, '', True)
             else:
-                DumpFunction = lambda x: SearchAndDecompress(x, skipAttributes=True)
+                DumpFunction = lambda x: oVBADecompressCache.SearchAndDecompress(streamKey, x, skipAttributes=True)
         elif options.vbadecompresscorrupt:
-            DumpFunction = lambda x: SearchAndDecompress(x, None)
+            DumpFunction = lambda x: oVBADecompressCache.SearchAndDecompress(streamKey, x, None)
         elif options.extract:
             DumpFunction = Extract
             IfWIN32SetBinary(sys.stdout)
@@ -1803,9 +2067,11 @@ def OLESub(ole, prefix, rules, options):
         else:
             selection = options.select
             part = ''
-        for orphan, fname, entry_type, stream in OLEGetStreams(ole):
+        for orphan, fname, entry_type, oOLEStream in OLEGetStreams(ole):
+            streamKey = PrintableName(fname, orphan)
             if selection == 'a' or ('%s%d' % (prefix, counter)) == selection or prefix == 'A' and str(counter) == selection:
-                StdoutWriteChunked(HeadTail(DumpFunction(DecompressFunction(DecodeFunction(decoders, options, CutData(SelectPart(stream, part, dModuleinfo.get(fname[-1], None)), options.cut)[0]))), options.headtail))
+                stream = oOLEStream.Data()
+                StdoutWriteChunked(HeadTail(DumpFunction(DecompressFunction(DecodeFunction(decoders, options, CutData(SelectPart(stream, part, vbadir.ModuleInfo(fname)), options.cut)[0]))), options.headtail))
                 selectionCounter += 1
                 if selection != 'a':
                     break
@@ -1813,6 +2079,13 @@ def OLESub(ole, prefix, rules, options):
 
     return (returnCode, selectionCounter)
 
+# with module yaracache, compiled rules are cached and reused as long as the rule files don't change
+def YARACompileRules(**kwargs):
+    if yaracache == None:
+        return yara.compile(**kwargs)
+    else:
+        return yaracache.Compile(**kwargs)
+
 def YARACompile(ruledata):
     if ruledata.startswith('#'):
         if ruledata.startswith('#h#'):
@@ -1829,7 +2102,7 @@ def YARACompile(ruledata):
             rule = 'rule regex {strings: $a = /%s/ ascii wide nocase condition: $a}' % ruledata[3:]
         else:
             rule = ruledata[1:]
-        return yara.compile(source=rule, externals={'streamname': '', 'VBA': False})
+        return YARACompileRules(source=rule, externals={'streamname': '', 'VBA': False})
     else:
         dFilepaths = {}
         if os.path.isdir(ruledata):
@@ -1840,7 +2113,7 @@ def YARACompile(ruledata):
         else:
             for filename in ProcessAt(ruledata):
                 dFilepaths[filename] = filename
-        return yara.compile(filepaths=dFilepaths, externals={'streamname': '', 'VBA': False})
+        return YARACompileRules(filepaths=dFilepaths, externals={'streamname': '', 'VBA': False})
 
 def FilenameInSimulations(filename):
     if dslsimulationdb == None:
@@ -1851,13 +2124,7 @@ def PrintWarningSelection(select, selectionCounter):
     if select != '' and selectionCounter == 0:
         print('Warning: no stream was selected with expression %s' % select)
 
-def OLEDump(filename, options):
-    returnCode = 0
-
-    if filename != '' and not FilenameInSimulations(filename) and not os.path.isfile(filename):
-        print('Error: %s is not a file.' % filename)
-        return returnCode
-
+def LoadPluginsAndDecoders(options):
     global plugins
     plugins = []
     LoadPlugins(options.plugins, options.plugindir, True)
@@ -1866,6 +2133,20 @@ def OLEDump(filename, options):
     decoders = []
     LoadDecoders(options.decoders, options.decoderdir, True)
 
+# loaded is True when the plugins, decoders and YARA rules (rules) are loaded by batch mode
+def OLEDump(filename, options, loaded=False, rules=None):
+    returnCode = 0
+
+    if filename != '' and not FilenameInSimulations(filename) and not os.path.isfile(filename):
+        print('Error: %s is not a file.' % filename)
+        return returnCode
+
+    if not loaded:
+        LoadPluginsAndDecoders(options)
+
+    global vbadir
+    vbadir = None
+
     if options.raw:
         if filename == '':
             IfWIN32SetBinary(sys.stdin)
@@ -1907,8 +2188,7 @@ def OLEDump(filename, options):
                             print(' ' + MyRepr(line))
         return returnCode
 
-    rules = None
-    if options.yara != None:
+    if options.yara != None and not loaded:
         if not 'yara' in sys.modules:
             print('Error: option yara requires the YARA Python module.')
             return returnCode
@@ -2017,12 +2297,160 @@ def OLEDump(filename, options):
 
     return returnCode
 
+# analyzes a file with the output captured: returns [filename, returnCode, output, error]
+def OLEDumpCapture(filename, options, rules):
+    stdout = sys.stdout
+    sys.stdout = StringIO()
+    returnCode = -1
+    error = None
+    try:
+        returnCode = OLEDump(filename, options, True, rules)
+    except MemoryError:
+        error = 'memory limit exceeded'
+    except Exception as e:
+        error = '%s: %s' % (e.__class__.__name__, e)
+    finally:
+        output = sys.stdout.getvalue()
+        sys.stdout = stdout
+    return [filename, returnCode, output, error]
+
+def BatchPrint(result, options):
+    filename, returnCode, output, error = result
+    if options.batchoutput == 'jsonl':
+        print(json.dumps({'filename': filename, 'returncode': returnCode, 'output': output.decode('latin'), 'error': error}))
+    else:
+        print('File: %s' % filename)
+        StdoutWriteChunked(output)
+        if error != None:
+            print('Error: %s' % error)
+    sys.stdout.flush()
+
+def BatchWorker(connection, options, rules):
+    # with fork, the plugins, decoders and YARA rules are inherited from the parent process
+    if globals().get('plugins', None) == None:
+        LoadPluginsAndDecoders(options)
+    if options.yara != None and rules == None:
+        rules = YARACompile(options.yara)
+    if options.memorylimit > 0:
+        memoryLimit = options.memorylimit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memoryLimit, memoryLimit))
+    while True:
+        filename = connection.recv()
+        if filename == None:
+            break
+        connection.send(OLEDumpCapture(filename, options, rules))
+    connection.close()
+
+class cBatchWorker():
+    def __init__(self, options, rules):
+        self.connection, connectionWorker = multiprocessing.Pipe()
+        # compiled YARA rules can not be pickled
+        if sys.platform == 'win32':
+            rules = None
+        self.oProcess = multiprocessing.Process(target=BatchWorker, args=(connectionWorker, options, rules))
+        self.oProcess.daemon = True
+        self.oProcess.start()
+        connectionWorker.close()
+        self.task = None
+        self.start = None
+
+    def Submit(self, task):
+        self.task = task
+        self.start = time.time()
+        self.connection.send(task[1])
+
+    # returns a result, or None when the worker is still busy; a worker that returns a result with failed True must be replaced
+    def Result(self, timeout):
+        if self.connection.poll():
+            try:
+                return self.connection.recv(), False
+            except EOFError:
+                return [self.task[1], -1, '', 'worker process stopped'], True
+        if not self.oProcess.is_alive():
+            return [self.task[1], -1, '', 'worker process stopped (exit code %s)' % self.oProcess.exitcode], True
+        if timeout > 0 and time.time() - self.start > timeout:
+            self.oProcess.terminate()
+            return [self.task[1], -1, '', 'timeout (%d seconds)' % timeout], True
+        return None, False
+
+    def Stop(self):
+        try:
+            self.connection.send(None)
+        except:
+            pass
+        self.oProcess.join(1)
+        if self.oProcess.is_alive():
+            self.oProcess.terminate()
+        self.connection.close()
+
+def BatchParallel(filenames, options, rules, jobs):
+    returnCode = 0
+    tasks = list(enumerate(filenames))
+    dResults = {}
+    indexPrint = 0
+    oBatchWorkers = [cBatchWorker(options, rules) for iter in range(min(jobs, len(tasks)))]
+    try:
+        while indexPrint < len(filenames):
+            idle = True
+            for iter, oBatchWorker in enumerate(oBatchWorkers):
+                if oBatchWorker.task == None:
+                    continue
+                result, failed = oBatchWorker.Result(options.timeout)
+                if result != None:
+                    idle = False
+                    dResults[oBatchWorker.task[0]] = result
+                    oBatchWorker.task = None
+                    if failed:
+                        oBatchWorker.Stop()
+                        oBatchWorkers[iter] = cBatchWorker(options, rules)
+            for oBatchWorker in oBatchWorkers:
+                if oBatchWorker.task == None and tasks != []:
+                    oBatchWorker.Submit(tasks.pop(0))
+                    idle = False
+            while indexPrint in dResults:
+                result = dResults.pop(indexPrint)
+                BatchPrint(result, options)
+                returnCode = max(returnCode, result[1])
+                indexPrint += 1
+            if idle:
+                time.sleep(0.01)
+    finally:
+        for oBatchWorker in oBatchWorkers:
+            oBatchWorker.Stop()
+    return returnCode
+
+def OLEDumpBatch(filenames, options):
+    if options.memorylimit > 0 and resource == None:
+        print('Error: option memorylimit is not supported on this platform.')
+        return 0
+
+    LoadPluginsAndDecoders(options)
+
+    rules = None
+    if options.yara != None:
+        if not 'yara' in sys.modules:
+            print('Error: option yara requires the YARA Python module.')
+            return 0
+        rules = YARACompile(options.yara)
+
+    jobs = options.jobs
+    if jobs == 0:
+        jobs = multiprocessing.cpu_count()
+    if jobs == 1 and options.timeout == 0 and options.memorylimit == 0:
+        returnCode = 0
+        for filename in filenames:
+            result = OLEDumpCapture(filename, options, rules)
+            BatchPrint(result, options)
+            returnCode = max(returnCode, result[1])
+        return returnCode
+    return BatchParallel(filenames, options, rules, jobs)
+
 def OptionsEnvironmentVariables(options):
     if options.extra == '':
         options.extra = os.getenv('OLEDUMP_EXTRA', options.extra)
 
 def Main():
-    oParser = optparse.OptionParser(usage='usage: %prog [options] [file]\n' + __description__, version='%prog ' + __version__)
+    oParser = optparse.OptionParser(usage='usage: %prog [options] [file ...]\n' + __description__, version='%prog ' + __version__)
     oParser.add_option('-m', '--man', action='store_true', default=False, help='Print manual')
     oParser.add_option('-s', '--select', default='', help='select item nr for dumping (a for all)')
     oParser.add_option('-d', '--dump', action='store_true', default=False, help='perform dump')
@@ -2034,6 +2462,7 @@ def Main():
     oParser.add_option('-v', '--vbadecompress', action='store_true', default=False, help='VBA decompression')
     oParser.add_option('--vbadecompressskipattributes', action='store_true', default=False, help='VBA decompression, skipping initial attributes')
     oParser.add_option('--vbadecompresscorrupt', action='store_true', default=False, help='VBA decompression, display beginning if corrupted')
+    oParser.add_option('--vbastorageonly', action='store_true', default=False, help='only search streams in a VBA storage for VBA code, other streams are not read')
     oParser.add_option('-r', '--raw', action='store_true', default=False, help='read raw file (use with options -v or -p')
     oParser.add_option('-t', '--translate', type=str, default='', help='string translation, like utf16 or .decode("utf8")')
     oParser.add_option('-e', '--extract', action='store_true', default=False, help='extract OLE embedded file')
@@ -2055,6 +2484,10 @@ def Main():
     oParser.add_option('-E', '--extra', type=str, default='', help='add extra info (environment variable: OLEDUMP_EXTRA)')
     oParser.add_option('-j', '--jsonoutput', action='store_true', default=False, help='produce json output')
     oParser.add_option('--password', default=MALWARE_PASSWORD, help='The ZIP password to be used (default %s)' % MALWARE_PASSWORD)
+    oParser.add_option('--jobs', type=int, default=1, help='batch mode: number of worker processes (default 1, 0 = number of CPUs)')
+    oParser.add_option('--batchoutput', type=str, default='text', help='batch mode: output format text or jsonl (default text)')
+    oParser.add_option('--timeout', type=int, default=0, help='batch mode: maximum number of seconds to analyze a file (default 0 = no limit)')
+    oParser.add_option('--memorylimit', type=int, default=0, help='batch mode: maximum memory in MB of a worker process (default 0 = no limit)')
     (options, args) = oParser.parse_args()
 
     if options.man:
@@ -2068,13 +2501,12 @@ def Main():
 
     OptionsEnvironmentVariables(options)
 
-    if len(args) > 1:
-        oParser.print_help()
-        print('')
-        print('  Source code put in the public domain by Didier Stevens, no Copyright')
-        print('  Use at your own risk')
-        print('  https://DidierStevens.com')
+    if not options.batchoutput in ['text', 'jsonl']:
+        print('Error: unknown batch output format: %s' % options.batchoutput)
         return 0
+
+    if len(args) > 1 or len(args) == 1 and not os.path.isfile(args[0]) and (args[0].startswith('@') or glob.has_magic(args[0])):
+        return OLEDumpBatch(ExpandFilenameArguments(args), options)
     elif len(args) == 0:
         return OLEDump('', options)
     else:
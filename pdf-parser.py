@@ -2,8 +2,8 @@
 
 __description__ = 'pdf-parser, use it to parse a PDF document'
 __author__ = 'Didier Stevens'
-__version__ = '0.7.3'
-__date__ = '2019/09/26'
+__version__ = '0.7.4'
+__date__ = '2026/10/17'
 __minimum_python_version__ = (2, 5, 1)
 __maximum_python_version__ = (3, 6, 3)
 
@@ -68,6 +68,15 @@ History:
   2019/04/12: V0.7.2 Python 2.6.6 compatibility fix
   2019/07/30: bug fixes (including fixes Josef Hinteregger)
   2019/09/26: V0.7.3 added multiple id selection to option -o; added man page (-m); added environment variable PDFPARSER_OPTIONS; bug fixes
+  2026/10/17: V0.7.4 memory-mapped input; added options --tokenizer, --verifytokenizer and --randomaccess
+  2026/10/17: added options --indexcache and --indexcachesize
+  2026/10/17: FlateDecode recovery of corrupt streams with chunks in stead of byte per byte
+  2026/10/17: bytearray based LZWDecode and RunLengthDecode; added option --maxdecompressed
+  2026/10/17: streaming filter pipeline cFilterPipeline
+  2026/10/17: /ObjStm objects are decompressed once and cached (cObjStm, cObjStmCache)
+  2026/10/17: cPDFElementIndirectObject derives type, references, names and dictionary only once, when first needed
+  2026/10/17: added options --batch, --jobs, --order and --timeout
+  2026/10/17: YARA rules are compiled with module yaracache when available (cache of compiled rules)
 
 Todo:
   - handle printf todo
@@ -85,6 +94,10 @@ import zipfile
 import time
 import os
 import textwrap
+import mmap
+import collections
+import json
+import multiprocessing
 if sys.version_info[0] >= 3:
     from io import StringIO
     import urllib.request
@@ -100,6 +113,11 @@ try:
 except:
     pass
 
+try:
+    import yaracache
+except:
+    yaracache = None
+
 CHAR_WHITESPACE = 1
 CHAR_DELIMITER = 2
 CHAR_REGULAR = 3
@@ -117,6 +135,13 @@ PDF_ELEMENT_STARTXREF = 5
 PDF_ELEMENT_MALFORMED = 6
 
 dumplinelength = 16
+maximumDecompressedSize = None
+
+PDF_BLOCKSIZE = 0x100000
+FLATEDECODE_CHUNKSIZE = 0x10000
+FLATEDECODE_OUTPUTSIZE = 0x100000
+STREAM_CHUNKSIZE = 0x10000
+OBJSTM_CACHESIZE = 32
 
 def PrintManual():
     manual = '''
@@ -135,6 +160,20 @@ Like option -O, to parse stream objects (/ObjStm).
 By defining PDFPARSER_OPTIONS=-O, pdf-parser will always parse stream objects (when found).
 PS: this feature is experimental.
 
+Option --tokenizer selects the tokenizer engine: classic (default) or fast.
+The fast tokenizer engine produces the same tokens as the classic engine, but it reads complete runs of characters with regular expressions in stead of one character at a time. This makes it several times faster on large files.
+Option --randomaccess is used together with option -o: in stead of parsing the complete PDF document to find the selected objects, pdf-parser reads the cross-reference data (xref tables and xref streams, following /Prev) and seeks directly to the selected objects. Together with option -O, objects inside object streams (/ObjStm) can be selected too.
+The objects are those referenced by the cross-reference data: with incremental updates, only the last version of an object is selected, while a complete parse selects all versions.
+When the cross-reference data is missing or damaged, or when a selected object is not referenced by the cross-reference data, pdf-parser falls back to parsing the complete PDF document.
+Option --indexcache takes a directory as value: pdf-parser stores an index of all indirect objects of the PDF document (id, version, position and type) in this directory. The first time a PDF document is analyzed, the complete document is parsed to build the index. The next times, options -o and -t use the index to seek directly to the selected objects, in stead of parsing the complete document. Unlike option --randomaccess, all versions of an object are selected, just like with a complete parse.
+An index is identified by the SHA-256 hash, the size and the modification time of the PDF document. Only local files are indexed (no ZIP files or URLs). Option --indexcachesize sets the maximum size of the cache directory in MB (default 100): when this size is exceeded, the least recently used indexes are removed.
+When objects contained in /ObjStm objects are selected with options --randomaccess or --indexcache (together with option -O), each /ObjStm object is decompressed only once: its stream is decoded and its header (object ids and offsets) is parsed, and the contained objects are parsed when they are selected. The last 32 /ObjStm objects are kept in memory.
+Option --batch analyzes many files in one run: each argument is a file (or an @file with a list of files), and the files are analyzed by a pool of processes (option --jobs, by default the number of CPUs). The output is in JSON Lines format: for each file, a record with the statistics (like option -a) is followed by a record for each indirect object (id, version, type, keywords, containing /ObjStm object, stream, filters and references; with option -H also the MD5 of the object). Options -o, -t and -s select the indirect objects to output, and option -O includes the objects of /ObjStm objects.
+Option --order selects the order of the output: input (default, same order as the files are given) or completion (a file's records are output as soon as it has been analyzed). Option --timeout sets the maximum number of seconds to analyze one file (default 60, 0 is no maximum): when it is exceeded, the process is terminated and replaced, and a record with status timeout is output. Files that can not be analyzed produce a record with status error.
+Streams are decoded in chunks: the stream content is passed through the chain of filters chunk by chunk. When the decoded stream is dumped to a file (option -d) or hashed (option -H), the complete decoded stream is never kept in memory.
+Option --maxdecompressed sets the maximum size (in bytes) of the output of each filter: when a stream decompresses to more data than this maximum (a decompression bomb), decompression is aborted and the filter reports that it failed. With option -y, the decoded stream is scanned up to this maximum size. By default, there is no maximum.
+Option --verifytokenizer tokenizes the given file (or files, with @file) with both engines and reports if the tokens differ.
+
 '''
     for line in manual.split('\n'):
         print(textwrap.fill(line))
@@ -187,9 +226,19 @@ def CopyWithoutWhiteSpace(content):
 def Obj2Str(content):
     return ''.join(map(lambda x: repr(x[1])[1:-1], CopyWithoutWhiteSpace(content)))
 
+def MemoryMapFile(infile):
+    if sys.version_info[0] < 3:
+        return None
+    try:
+        return mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    except:
+        return None
+
 class cPDFDocument:
     def __init__(self, file):
         self.file = file
+        self.mmap = None
+        self.seekable = False
         if type(file) != str:
             self.infile = file
         elif file.lower().startswith('http://') or file.lower().startswith('https://'):
@@ -217,23 +266,114 @@ class cPDFDocument:
                 print('Error opening file %s' % file)
                 print(sys.exc_info()[1])
                 sys.exit()
+            self.mmap = MemoryMapFile(self.infile)
+            self.seekable = True
         self.ungetted = []
         self.position = -1
+        if self.mmap == None:
+            self.buffer = bytearray()
+        else:
+            self.buffer = memoryview(self.mmap)
+        self.index = 0
+
+    def Fill(self):
+        if self.mmap != None or self.infile == None:
+            return False
+        block = self.infile.read(PDF_BLOCKSIZE)
+        if not block:
+            return False
+        if type(block) != bytes:
+            block = block.encode('latin')
+        # keep the last byte that was read, so that it can be ungetted
+        start = max(self.index - 1, 0)
+        self.buffer = self.buffer[start:] + bytearray(block)
+        self.index -= start
+        return True
+
+    def Close(self):
+        if self.mmap != None:
+            self.buffer.release()
+            self.mmap.close()
+            self.mmap = None
+        if self.infile != None:
+            self.infile.close()
+            self.infile = None
+        self.buffer = bytearray()
+        self.index = 0
+
+    def Seek(self, offset):
+        if self.mmap != None:
+            self.index = offset
+        elif self.seekable and self.infile != None:
+            self.infile.seek(offset)
+            self.buffer = bytearray()
+            self.index = 0
+        else:
+            return False
+        self.ungetted = []
+        self.position = offset - 1
+        return True
+
+    def ReadAt(self, offset, size):
+        if self.mmap != None:
+            return self.mmap[offset:offset + size]
+        elif self.seekable and self.infile != None:
+            current = self.infile.tell()
+            self.infile.seek(offset)
+            data = self.infile.read(size)
+            self.infile.seek(current)
+            return data
+        else:
+            return None
+
+    def Size(self):
+        if self.mmap != None:
+            return len(self.mmap)
+        elif self.seekable and self.infile != None:
+            return os.fstat(self.infile.fileno()).st_size
+        else:
+            return None
 
     def byte(self):
         if len(self.ungetted) != 0:
             self.position += 1
             return self.ungetted.pop()
-        inbyte = self.infile.read(1)
-        if not inbyte or inbyte == '':
-            self.infile.close()
-            return None
+        try:
+            byte = self.buffer[self.index]
+        except IndexError:
+            if not self.Fill():
+                self.Close()
+                return None
+            byte = self.buffer[self.index]
         self.position += 1
-        return ord(inbyte)
+        self.index += 1
+        return byte
+
+    def run(self, oRegex):
+        result = bytearray()
+        while len(self.ungetted) != 0:
+            if self.ungetted[-1] == None or oRegex.match(bytearray([self.ungetted[-1]])) == None:
+                return result
+            result.append(self.byte())
+        while True:
+            if self.index >= len(self.buffer) and not self.Fill():
+                return result
+            oMatch = oRegex.match(self.buffer, self.index)
+            if oMatch == None:
+                return result
+            end = oMatch.end()
+            result += self.buffer[self.index:end]
+            self.position += end - self.index
+            self.index = end
+            if end < len(self.buffer):
+                return result
 
     def unget(self, byte):
         self.position -= 1
-        self.ungetted.append(byte)
+        if len(self.ungetted) == 0 and self.index > 0 and self.buffer[self.index - 1] == byte:
+            self.index -= 1
+        else:
+            self.ungetted.append(byte)
 
 def CharacterClass(byte):
     if byte == 0 or byte == 9 or byte == 10 or byte == 12 or byte == 13 or byte == 32:
@@ -242,17 +382,47 @@ def CharacterClass(byte):
         return CHAR_DELIMITER
     return CHAR_REGULAR
 
+CHARACTER_CLASSES = [CharacterClass(byte) for byte in range(256)]
+REGEX_WHITESPACE = re.compile(b'[\x00\x09\x0A\x0C\x0D\x20]+')
+REGEX_REGULAR = re.compile(b'[^\x00\x09\x0A\x0C\x0D\x20()<>\\[\\]{}/%]+')
+REGEX_COMMENT = re.compile(b'[^\x0A\x0D]+')
+
+def Bytes2String(data):
+    if sys.version_info[0] > 2:
+        return data.decode('latin')
+    else:
+        return str(data)
+
 def IsNumeric(str):
     return re.match('^[0-9]+', str)
 
 class cPDFTokenizer:
     def __init__(self, file):
         self.oPDF = cPDFDocument(file)
+        self.oPDFDocument = self.oPDF
+        self.ungetted = []
+        self.tokenStart = None
+        self.history = collections.deque(maxlen=8)
+
+    def Seek(self, offset):
         self.ungetted = []
+        self.history.clear()
+        self.oPDF = self.oPDFDocument
+        return self.oPDF.Seek(offset)
 
+    # Token returns the next token and keeps the position of its first byte in self.tokenStart
     def Token(self):
         if len(self.ungetted) != 0:
-            return self.ungetted.pop()
+            token, self.tokenStart = self.ungetted.pop()
+        else:
+            token = self.ReadToken()
+            if token == None:
+                return None
+            self.tokenStart = self.oPDFDocument.position - len(token[1]) + 1
+        self.history.append((token, self.tokenStart))
+        return token
+
+    def ReadToken(self):
         if self.oPDF == None:
             return None
         self.byte = self.oPDF.byte()
@@ -330,16 +500,86 @@ class cPDFTokenizer:
         return tokens
 
     def unget(self, byte):
-        self.ungetted.append(byte)
+        start = None
+        for tokenHistory, startHistory in reversed(self.history):
+            if tokenHistory is byte:
+                start = startHistory
+                break
+        self.ungetted.append((byte, start))
+
+# Tokenizer engine that produces the same tokens as cPDFTokenizer, but uses a character class table and regular expressions to read complete runs of whitespace, regular and comment characters in one go
+class cPDFTokenizerFast(cPDFTokenizer):
+    def ReadToken(self):
+        if self.oPDF == None:
+            return None
+        self.byte = self.oPDF.byte()
+        if self.byte == None:
+            self.oPDF = None
+            return None
+        characterClass = CHARACTER_CLASSES[self.byte]
+        if characterClass == CHAR_WHITESPACE:
+            self.token = chr(self.byte) + Bytes2String(self.oPDF.run(REGEX_WHITESPACE))
+            return (CHAR_WHITESPACE, self.token)
+        elif characterClass == CHAR_REGULAR:
+            self.token = chr(self.byte) + Bytes2String(self.oPDF.run(REGEX_REGULAR))
+            return (CHAR_REGULAR, self.token)
+        elif self.byte == 0x3C or self.byte == 0x3E:
+            character = chr(self.byte)
+            self.byte = self.oPDF.byte()
+            if self.byte == ord(character):
+                return (CHAR_DELIMITER, character * 2)
+            else:
+                self.oPDF.unget(self.byte)
+                return (CHAR_DELIMITER, character)
+        elif self.byte == 0x25:
+            self.token = '%' + Bytes2String(self.oPDF.run(REGEX_COMMENT))
+            self.byte = self.oPDF.byte()
+            if self.byte == None:
+                self.oPDF = None
+                return (CHAR_DELIMITER, self.token)
+            self.token += chr(self.byte)
+            self.byte = self.oPDF.byte()
+            if self.byte == None:
+                self.oPDF = None
+            elif self.byte == 10:
+                self.token += chr(self.byte)
+            else:
+                self.oPDF.unget(self.byte)
+            return (CHAR_DELIMITER, self.token)
+        return (CHAR_DELIMITER, chr(self.byte))
+
+TOKENIZERS = {'classic': cPDFTokenizer, 'fast': cPDFTokenizerFast}
+
+def VerifyTokenizers(filenames):
+    for filename in filenames:
+        oPDFTokenizerClassic = cPDFTokenizer(filename)
+        oPDFTokenizerFast = cPDFTokenizerFast(filename)
+        count = 0
+        while True:
+            tokenClassic = oPDFTokenizerClassic.Token()
+            tokenFast = oPDFTokenizerFast.Token()
+            if tokenClassic != tokenFast:
+                print('%s: tokenizers differ at token %d: classic %s fast %s' % (filename, count, repr(tokenClassic), repr(tokenFast)))
+                break
+            if tokenClassic == None:
+                print('%s: tokenizers produce identical tokens (%d tokens)' % (filename, count))
+                break
+            count += 1
 
 class cPDFParser:
-    def __init__(self, file, verbose=False, extract=None, objstm=None):
+    def __init__(self, file, verbose=False, extract=None, objstm=None, tokenizer='classic'):
         self.context = CONTEXT_NONE
         self.content = []
-        self.oPDFTokenizer = cPDFTokenizer(file)
+        self.oPDFTokenizer = TOKENIZERS[tokenizer](file)
         self.verbose = verbose
         self.extract = extract
         self.objstm = objstm
+        self.objectStart = None
+
+    def Seek(self, offset):
+        self.context = CONTEXT_NONE
+        self.content = []
+        return self.oPDFTokenizer.Seek(offset)
 
     def GetObject(self):
         while True:
@@ -379,7 +619,11 @@ class cPDFParser:
                 else:
                     if self.context == CONTEXT_OBJ:
                         if self.token[1] == 'endobj':
-                            self.oPDFElementIndirectObject = cPDFElementIndirectObject(self.objectId, self.objectVersion, self.content, self.objstm)
+                            if self.objectStart == None or self.oPDFTokenizer.tokenStart == None:
+                                byteRange = None
+                            else:
+                                byteRange = (self.objectStart, self.oPDFTokenizer.tokenStart + len('endobj'))
+                            self.oPDFElementIndirectObject = cPDFElementIndirectObject(self.objectId, self.objectVersion, self.content, self.objstm, byteRange)
                             self.context = CONTEXT_NONE
                             self.content = []
                             return self.oPDFElementIndirectObject
@@ -405,12 +649,14 @@ class cPDFParser:
                             self.content.append(self.token)
                     else:
                         if IsNumeric(self.token[1]):
+                            tokenStart = self.oPDFTokenizer.tokenStart
                             self.token2 = self.oPDFTokenizer.TokenIgnoreWhiteSpace()
                             if IsNumeric(self.token2[1]):
                                 self.token3 = self.oPDFTokenizer.TokenIgnoreWhiteSpace()
                                 if self.token3[1] == 'obj':
                                     self.objectId = eval(self.token[1])
                                     self.objectVersion = eval(self.token2[1])
+                                    self.objectStart = tokenStart
                                     self.context = CONTEXT_OBJ
                                 else:
                                     self.oPDFTokenizer.unget(self.token3)
@@ -481,12 +727,20 @@ def IIf(expr, truepart, falsepart):
         return falsepart
 
 class cPDFElementIndirectObject:
-    def __init__(self, id, version, content, objstm=None):
+    def __init__(self, id, version, content, objstm=None, byteRange=None):
         self.type = PDF_ELEMENT_INDIRECT_OBJECT
         self.id = id
         self.version = version
         self.content = content
         self.objstm = objstm
+        self.byteRange = byteRange
+        # the following properties are derived from the content when they are first needed
+        self.streamPosition = None
+        self.typeCached = None
+        self.references = None
+        self.names = None
+        self.canonicalized = None
+        self.dictionaries = {}
         #fix stream for Ghostscript bug reported by Kurt
         if self.ContainsStream():
             position = len(self.content) - 1
@@ -505,24 +759,32 @@ class cPDFElementIndirectObject:
             self.content = self.content[0:position] + [(self.content[position][0], self.content[position][1][:-len('endstream')])] + [(self.content[position][0], 'endstream')] + self.content[position+1:]
 
     def GetType(self):
-        content = CopyWithoutWhiteSpace(self.content)
-        dictionary = 0
-        for i in range(0, len(content)):
-            if content[i][0] == CHAR_DELIMITER and content[i][1] == '<<':
-                dictionary += 1
-            if content[i][0] == CHAR_DELIMITER and content[i][1] == '>>':
-                dictionary -= 1
-            if dictionary == 1 and content[i][0] == CHAR_DELIMITER and EqualCanonical(content[i][1], '/Type') and i < len(content) - 1:
-                return content[i+1][1]
-        return ''
+        if self.typeCached == None:
+            self.typeCached = ''
+            dictionary = 0
+            typeFound = False
+            for token in self.content:
+                if token[0] == CHAR_WHITESPACE:
+                    continue
+                if typeFound:
+                    self.typeCached = token[1]
+                    break
+                if token[0] == CHAR_DELIMITER and token[1] == '<<':
+                    dictionary += 1
+                if token[0] == CHAR_DELIMITER and token[1] == '>>':
+                    dictionary -= 1
+                if dictionary == 1 and token[0] == CHAR_DELIMITER and EqualCanonical(token[1], '/Type'):
+                    typeFound = True
+        return self.typeCached
 
     def GetReferences(self):
-        content = CopyWithoutWhiteSpace(self.content)
-        references = []
-        for i in range(0, len(content)):
-            if i > 1 and content[i][0] == CHAR_REGULAR and content[i][1] == 'R' and content[i-2][0] == CHAR_REGULAR and IsNumeric(content[i-2][1]) and content[i-1][0] == CHAR_REGULAR and IsNumeric(content[i-1][1]):
-                references.append((content[i-2][1], content[i-1][1], content[i][1]))
-        return references
+        if self.references == None:
+            content = CopyWithoutWhiteSpace(self.content)
+            self.references = []
+            for i in range(0, len(content)):
+                if i > 1 and content[i][0] == CHAR_REGULAR and content[i][1] == 'R' and content[i-2][0] == CHAR_REGULAR and IsNumeric(content[i-2][1]) and content[i-1][0] == CHAR_REGULAR and IsNumeric(content[i-1][1]):
+                    self.references.append((content[i-2][1], content[i-1][1], content[i][1]))
+        return self.references
 
     def References(self, index):
         for ref in self.GetReferences():
@@ -531,27 +793,42 @@ class cPDFElementIndirectObject:
         return False
 
     def ContainsStream(self):
+        if self.streamPosition == None:
+            self.streamPosition = -1
+            for i in range(0, len(self.content)):
+                if self.content[i][0] == CHAR_REGULAR and self.content[i][1] == 'stream':
+                    self.streamPosition = i
+                    break
+        if self.streamPosition == -1:
+            return False
+        return self.content[0:self.streamPosition]
+
+    # returns the tokens preceding the first stream token (of any type)
+    def ContentPrecedingStream(self):
         for i in range(0, len(self.content)):
-            if self.content[i][0] == CHAR_REGULAR and self.content[i][1] == 'stream':
+            if self.content[i][1] == 'stream':
                 return self.content[0:i]
-        return False
+        return self.content
 
     def Contains(self, keyword):
-        data = ''
-        for i in range(0, len(self.content)):
-            if self.content[i][1] == 'stream':
-                break
-            else:
-                data += Canonicalize(self.content[i][1])
-        return data.upper().find(keyword.upper()) != -1
+        if self.canonicalized == None:
+            self.canonicalized = ''.join([Canonicalize(token[1]) for token in self.ContentPrecedingStream()]).upper()
+        return self.canonicalized.find(keyword.upper()) != -1
 
     def ContainsName(self, keyword):
-        for token in self.content:
-            if token[1] == 'stream':
-                return False
-            if token[0] == CHAR_DELIMITER and EqualCanonical(token[1], keyword):
-                return True
-        return False
+        if self.names == None:
+            self.names = set([Canonicalize(token[1]) for token in self.ContentPrecedingStream() if token[0] == CHAR_DELIMITER])
+        return keyword in self.names
+
+    # returns the parsed dictionary of the object (the dictionary preceding the stream for objects with a stream)
+    def Dictionary(self, nocanonicalizedoutput=False):
+        if not nocanonicalizedoutput in self.dictionaries:
+            dataPrecedingStream = self.ContainsStream()
+            if dataPrecedingStream:
+                self.dictionaries[nocanonicalizedoutput] = cPDFParseDictionary(dataPrecedingStream, nocanonicalizedoutput)
+            else:
+                self.dictionaries[nocanonicalizedoutput] = cPDFParseDictionary(self.content, nocanonicalizedoutput)
+        return self.dictionaries[nocanonicalizedoutput]
 
     def StreamContains(self, keyword, filter, casesensitive, regex, overridingfilters):
         if not self.ContainsStream():
@@ -566,7 +843,8 @@ class cPDFElementIndirectObject:
         else:
             return keyword.lower() in streamData.lower()
 
-    def Stream(self, filter=True, overridingfilters=''):
+    # returns the raw stream data and the filters, or None and the value Stream returns when there is no stream
+    def StreamData(self):
         state = 'start'
         countDirectories = 0
         data = ''
@@ -607,64 +885,49 @@ class cPDFElementIndirectObject:
                 state = 'stream-concat'
             elif state == 'stream-concat':
                 if self.content[i][0] == CHAR_REGULAR and self.content[i][1] == 'endstream':
-                    if filter:
-                        if overridingfilters == '':
-                            return self.Decompress(data, filters)
-                        elif overridingfilters == 'raw':
-                            return data
-                        else:
-                            return self.Decompress(data, overridingfilters.split(' '))
-                    else:
-                        return data
+                    return data, filters
                 else:
                     data += self.content[i][1]
             else:
-                return 'Unexpected filter state'
-        return filters
+                return None, 'Unexpected filter state'
+        return None, filters
+
+    # returns a cFilterPipeline to decode the stream in chunks
+    def StreamPipeline(self, filter=True, overridingfilters='', truncate=False):
+        data, filters = self.StreamData()
+        if data == None:
+            if filters == 'Unexpected filter state':
+                data = filters
+            else:
+                data = ''
+            filters = None
+        elif not filter or overridingfilters == 'raw':
+            filters = None
+        elif overridingfilters != '':
+            filters = overridingfilters.split(' ')
+        return cFilterPipeline(data, filters, maximumDecompressedSize, truncate)
 
-    def Decompress(self, data, filters):
-        for filter in filters:
-            if EqualCanonical(filter, '/FlateDecode') or EqualCanonical(filter, '/Fl'):
-                try:
-                    data = FlateDecode(data)
-                except zlib.error as e:
-                    message = 'FlateDecode decompress failed'
-                    if len(data) > 0 and ord(data[0]) & 0x0F != 8:
-                        message += ', unexpected compression method: %02x' % ord(data[0])
-                    return message + '. zlib.error %s' % e.message
-            elif EqualCanonical(filter, '/ASCIIHexDecode') or EqualCanonical(filter, '/AHx'):
-                try:
-                    data = ASCIIHexDecode(data)
-                except:
-                    return 'ASCIIHexDecode decompress failed'
-            elif EqualCanonical(filter, '/ASCII85Decode') or EqualCanonical(filter, '/A85'):
-                try:
-                    data = ASCII85Decode(data.rstrip('>'))
-                except:
-                    return 'ASCII85Decode decompress failed'
-            elif EqualCanonical(filter, '/LZWDecode') or EqualCanonical(filter, '/LZW'):
-                try:
-                    data = LZWDecode(data)
-                except:
-                    return 'LZWDecode decompress failed'
-            elif EqualCanonical(filter, '/RunLengthDecode') or EqualCanonical(filter, '/R'):
-                try:
-                    data = RunLengthDecode(data)
-                except:
-                    return 'RunLengthDecode decompress failed'
-#            elif i.startswith('/CC')                        # CCITTFaxDecode
-#            elif i.startswith('/DCT')                       # DCTDecode
+    def Stream(self, filter=True, overridingfilters=''):
+        data, filters = self.StreamData()
+        if data == None:
+            return filters
+        if filter:
+            if overridingfilters == '':
+                return self.Decompress(data, filters)
+            elif overridingfilters == 'raw':
+                return data
             else:
-                return 'Unsupported filter: %s' % repr(filters)
-        if len(filters) == 0:
-            return 'No filters'
+                return self.Decompress(data, overridingfilters.split(' '))
         else:
             return data
 
+    def Decompress(self, data, filters):
+        return cFilterPipeline(data, filters, maximumDecompressedSize).Decode()
+
     def StreamYARAMatch(self, rules, decoders, decoderoptions, filter, overridingfilters):
         if not self.ContainsStream():
             return None
-        streamData = self.Stream(filter, overridingfilters)
+        streamData = self.StreamPipeline(filter, overridingfilters, True).Decode()
         if filter and streamData == 'No filters':
             streamData = self.Stream(False, overridingfilters)
 
@@ -843,6 +1106,145 @@ class cPDFParseDictionary:
     def GetNested(self, select):
         return self.GetNestedSub(self.parsed, select)
 
+def GetDictionaryNumbers(oPDFParseDictionary, key):
+    value = oPDFParseDictionary.Get(key)
+    if value == None:
+        return None
+    return [int(item) for item in value if not item.strip() in ['', '[', ']']]
+
+class cPDFXrefTable:
+    def __init__(self, oPDFParser):
+        self.oPDFParser = oPDFParser
+        self.oPDFDocument = oPDFParser.oPDFTokenizer.oPDFDocument
+        self.objects = {}
+        self.compressed = {}
+        self.seen = set()
+        try:
+            self.valid = self.Parse()
+        except:
+            self.valid = False
+
+    def AddEntry(self, id, dictionary, entry):
+        if id in self.seen:
+            return
+        self.seen.add(id)
+        if dictionary != None:
+            dictionary[id] = entry
+
+    def Parse(self):
+        size = self.oPDFDocument.Size()
+        if size == None:
+            return False
+        oMatch = None
+        for oMatch in re.finditer(br'startxref\s+(\d+)', self.oPDFDocument.ReadAt(max(0, size - 1024), 1024)):
+            pass
+        if oMatch == None:
+            return False
+        offset = int(oMatch.group(1))
+        offsetsVisited = set()
+        while offset != None and not offset in offsetsVisited:
+            offsetsVisited.add(offset)
+            if offset >= size:
+                return False
+            start = self.oPDFDocument.ReadAt(offset, 32)
+            if re.match(br'\s*xref', start):
+                offset = self.ParseTable(offset)
+            elif re.match(br'\s*\d+\s+\d+\s+obj', start):
+                offset = self.ParseStream(offset)
+            else:
+                return False
+        return True
+
+    def ParseTable(self, offset):
+        data = b''
+        while True:
+            block = self.oPDFDocument.ReadAt(offset + len(data), 0x10000)
+            if not block:
+                raise Exception('xref table without trailer')
+            data += block
+            indexTrailer = data.find(b'trailer', max(0, len(data) - len(block) - len('trailer')))
+            if indexTrailer != -1:
+                break
+        fields = data[:indexTrailer].split()
+        if fields[0] != b'xref':
+            raise Exception('xref table expected')
+        index = 1
+        while index < len(fields):
+            start = int(fields[index])
+            count = int(fields[index + 1])
+            index += 2
+            for id in range(start, start + count):
+                if fields[index + 2] == b'n':
+                    self.AddEntry(id, self.objects, (int(fields[index]), int(fields[index + 1])))
+                else:
+                    self.AddEntry(id, None, None)
+                index += 3
+        self.oPDFParser.Seek(offset + indexTrailer)
+        oPDFElementTrailer = self.oPDFParser.GetObject()
+        if oPDFElementTrailer == None or oPDFElementTrailer.type != PDF_ELEMENT_TRAILER:
+            raise Exception('trailer expected')
+        oPDFParseDictionary = cPDFParseDictionary(oPDFElementTrailer.content[1:], False)
+        xrefstm = GetDictionaryNumbers(oPDFParseDictionary, '/XRefStm')
+        if xrefstm != None:
+            self.ParseStream(xrefstm[0])
+        prev = GetDictionaryNumbers(oPDFParseDictionary, '/Prev')
+        if prev == None:
+            return None
+        return prev[0]
+
+    def ParseStream(self, offset):
+        if not self.oPDFParser.Seek(offset):
+            raise Exception('seek failed')
+        object = self.oPDFParser.GetObject()
+        if object == None or object.type != PDF_ELEMENT_INDIRECT_OBJECT or not EqualCanonical(object.GetType(), '/XRef') or not object.ContainsStream():
+            raise Exception('xref stream expected')
+        oPDFParseDictionary = object.Dictionary()
+        widths = GetDictionaryNumbers(oPDFParseDictionary, '/W')
+        indexes = GetDictionaryNumbers(oPDFParseDictionary, '/Index')
+        if indexes == None:
+            indexes = [0, GetDictionaryNumbers(oPDFParseDictionary, '/Size')[0]]
+        predictor = 1
+        columns = 1
+        decodeParms = oPDFParseDictionary.Get('/DecodeParms')
+        if decodeParms != None:
+            for key, value in decodeParms:
+                if key == '/Predictor':
+                    predictor = int(value[0])
+                elif key == '/Columns':
+                    columns = int(value[0])
+        data = object.Stream()
+        if data == 'No filters':
+            data = object.Stream(False)
+        data = bytearray(C2BIP3(data))
+        if predictor >= 10:
+            data = PNGPredictorDecode(data, columns)
+        elif predictor != 1:
+            raise Exception('unsupported predictor %d' % predictor)
+        if len(data) < sum(widths) * sum(indexes[1::2]):
+            raise Exception('xref stream too short')
+        position = 0
+        for index in range(0, len(indexes), 2):
+            for id in range(indexes[index], indexes[index] + indexes[index + 1]):
+                fields = []
+                for width in widths:
+                    value = 0
+                    for byte in data[position:position + width]:
+                        value = value * 0x100 + byte
+                    fields.append(value)
+                    position += width
+                if widths[0] == 0:
+                    fields[0] = 1
+                if fields[0] == 1:
+                    self.AddEntry(id, self.objects, (fields[1], fields[2]))
+                elif fields[0] == 2:
+                    self.AddEntry(id, self.compressed, (fields[1], fields[2]))
+                else:
+                    self.AddEntry(id, None, None)
+        prev = GetDictionaryNumbers(oPDFParseDictionary, '/Prev')
+        if prev == None:
+            return None
+        return prev[0]
+
 def FormatOutput(data, raw):
     if raw:
         if type(data) == type([]):
@@ -892,21 +1294,33 @@ def PrintOutputObject(object, options):
         print(' Contains stream')
         if options.debug:
             print(' %s' % FormatOutput(dataPrecedingStream, options.raw))
-        oPDFParseDictionary = cPDFParseDictionary(dataPrecedingStream, options.nocanonicalizedoutput)
+        oPDFParseDictionary = object.Dictionary(options.nocanonicalizedoutput)
         if options.hash:
             streamContent = object.Stream(False, options.overridingfilters)
             print('  unfiltered')
             print('   len: %6d md5: %s' % (len(streamContent), hashlib.md5(streamContent).hexdigest()))
             print('   %s' % HexAsciiDumpLine(streamContent))
-            streamContent = object.Stream(True, options.overridingfilters)
+            oFilterPipeline = object.StreamPipeline(True, options.overridingfilters)
+            size = 0
+            oMD5 = hashlib.md5()
+            streamContent = b''
+            for chunk in oFilterPipeline.Chunks():
+                size += len(chunk)
+                oMD5.update(chunk)
+                if len(streamContent) < 16:
+                    streamContent += chunk[:16 - len(streamContent)]
+            if oFilterPipeline.error != None:
+                streamContent = oFilterPipeline.error
+                size = len(streamContent)
+                oMD5 = hashlib.md5(streamContent)
             print('  filtered')
-            print('   len: %6d md5: %s' % (len(streamContent), hashlib.md5(streamContent).hexdigest()))
+            print('   len: %6d md5: %s' % (size, oMD5.hexdigest()))
             print('   %s' % HexAsciiDumpLine(streamContent))
             streamContent = None
     else:
         if options.debug or options.raw:
             print(' %s' % FormatOutput(object.content, options.raw))
-        oPDFParseDictionary = cPDFParseDictionary(object.content, options.nocanonicalizedoutput)
+        oPDFParseDictionary = object.Dictionary(options.nocanonicalizedoutput)
     print('')
     oPDFParseDictionary.PrettyPrint('  ')
     print('')
@@ -926,13 +1340,16 @@ def PrintOutputObject(object, options):
 
 
     if options.dump:
-        filtered = object.Stream(options.filter == True, options.overridingfilters)
-        if filtered == []:
-            filtered = ''
+        oFilterPipeline = object.StreamPipeline(options.filter == True, options.overridingfilters)
         try:
             fDump = open(options.dump, 'wb')
             try:
-                fDump.write(C2BIP3(filtered))
+                for chunk in oFilterPipeline.Chunks():
+                    fDump.write(chunk)
+                if oFilterPipeline.error != None:
+                    fDump.seek(0)
+                    fDump.truncate()
+                    fDump.write(C2BIP3(oFilterPipeline.error))
             except:
                 print('Error writing file %s' % options.dump)
             fDump.close()
@@ -973,32 +1390,6 @@ def ConditionalCanonicalize(sIn, nocanonicalizedoutput):
     else:
         return Canonicalize(sIn)
 
-# http://code.google.com/p/pdfminerr/source/browse/trunk/pdfminer/pdfminer/ascii85.py
-def ASCII85Decode(data):
-  import struct
-  n = b = 0
-  out = ''
-  for c in data:
-    if '!' <= c and c <= 'u':
-      n += 1
-      b = b*85+(ord(c)-33)
-      if n == 5:
-        out += struct.pack('>L',b)
-        n = b = 0
-    elif c == 'z':
-      assert n == 0
-      out += '\0\0\0\0'
-    elif c == '~':
-      if n:
-        for _ in range(5-n):
-          b = b*85+84
-        out += struct.pack('>L',b)[:n-1]
-      break
-  return out
-
-def ASCIIHexDecode(data):
-    return binascii.unhexlify(''.join([c for c in data if c not in ' \t\n\r']).rstrip('>'))
-
 # if inflating fails, we try to inflate byte per byte (sample 4da299d6e52bbb79c0ac00bad6a1d51d4d5fe42965a8d94e88a359e5277117e2)
 def FlateDecode(data):
     try:
@@ -1006,120 +1397,508 @@ def FlateDecode(data):
     except:
         if len(data) <= 10:
             raise
+        decompressed, position, error = FlateDecodeRecover(data)
+        if error == None or len(data) - position <= 2:
+            return decompressed
+        else:
+            raise error
+
+# returns the maximal decompressed prefix, the position of the first byte that can not be decompressed and the zlib error (None and None when there is no error)
+# the data is fed in chunks of FLATEDECODE_CHUNKSIZE bytes; when a chunk fails, the chunk size is halved starting from the last good decompressor state, until the failing byte is found
+def FlateDecodeRecover(data, oDecompress=None):
+    data = C2BIP3(data)
+    if oDecompress == None:
         oDecompress = zlib.decompressobj()
-        oStringIO = StringIO()
-        count = 0
-        for byte in C2BIP3(data):
+    decompressed = []
+    position = 0
+    size = FLATEDECODE_CHUNKSIZE
+    while position < len(data):
+        oDecompressCopy = oDecompress.copy()
+        try:
+            decompressed.append(oDecompressCopy.decompress(data[position:position + size]))
+        except zlib.error as e:
+            if size == 1:
+                return b''.join(decompressed), position, e
+            size = size // 2
+            continue
+        oDecompress = oDecompressCopy
+        position += size
+    return b''.join(decompressed), None, None
+
+def PaethPredictor(left, above, upperLeft):
+    estimate = left + above - upperLeft
+    distanceLeft = abs(estimate - left)
+    distanceAbove = abs(estimate - above)
+    distanceUpperLeft = abs(estimate - upperLeft)
+    if distanceLeft <= distanceAbove and distanceLeft <= distanceUpperLeft:
+        return left
+    elif distanceAbove <= distanceUpperLeft:
+        return above
+    else:
+        return upperLeft
+
+# PNG predictors (/Predictor 10 and higher) with 1 byte per pixel, as used in cross-reference streams
+def PNGPredictorDecode(data, columns):
+    result = bytearray()
+    previous = bytearray(columns)
+    for index in range(0, len(data), columns + 1):
+        filterType = data[index]
+        row = bytearray(data[index + 1:index + 1 + columns])
+        for column in range(len(row)):
+            if column > 0:
+                left = row[column - 1]
+                upperLeft = previous[column - 1]
+            else:
+                left = 0
+                upperLeft = 0
+            if filterType == 1:
+                row[column] = (row[column] + left) & 0xFF
+            elif filterType == 2:
+                row[column] = (row[column] + previous[column]) & 0xFF
+            elif filterType == 3:
+                row[column] = (row[column] + (left + previous[column]) // 2) & 0xFF
+            elif filterType == 4:
+                row[column] = (row[column] + PaethPredictor(left, previous[column], upperLeft)) & 0xFF
+            elif filterType != 0:
+                raise Exception('unknown PNG filter type %d' % filterType)
+        result += row
+        previous = row
+    return result
+
+def String2Bytes(data):
+    if sys.version_info[0] > 2 and type(data) == str:
+        return data.encode('latin')
+    else:
+        return data
+
+# Incremental filters: method Decode takes a chunk of data and returns an iterable of decoded chunks, method Flush is called at the end of the data and returns a list of decoded chunks
+# Both methods raise an exception when decoding fails
+class cFlateDecodeFilter:
+    name = 'FlateDecode'
+    errors = zlib.error
+    keepsType = False
+
+    def __init__(self):
+        self.oDecompress = zlib.decompressobj()
+        self.buffer = b''
+        self.size = 0
+        self.position = 0
+        self.first = None
+        self.error = None
+        self.errorPosition = None
+        self.ended = False
+
+    # the first 10 bytes are buffered: FlateDecode does not try to recover streams of 10 bytes or less
+    def Decode(self, data):
+        if len(data) == 0:
+            return
+        if self.first == None:
+            self.first = bytearray(data[0:1])[0]
+        self.size += len(data)
+        if self.error != None or self.ended:
+            return
+        if self.buffer != None:
+            self.buffer += data
+            if self.size <= 10:
+                return
+            data = self.buffer
+            self.buffer = None
+        # the output is limited to FLATEDECODE_OUTPUTSIZE bytes per call; when decompression fails, the chunk is decompressed again from the start to find the failing byte
+        oDecompressStart = self.oDecompress.copy()
+        chunk = data
+        emitted = 0
+        while True:
             try:
-                oStringIO.write(oDecompress.decompress(byte))
-                count += 1
-            except:
+                output = self.oDecompress.decompress(data, FLATEDECODE_OUTPUTSIZE)
+            except zlib.error:
+                output, position, self.error = FlateDecodeRecover(chunk, oDecompressStart)
+                self.errorPosition = self.position + position
+                yield output[emitted:]
+                return
+            consumed = len(data) - len(self.oDecompress.unconsumed_tail)
+            emitted += len(output)
+            yield output
+            data = self.oDecompress.unconsumed_tail
+            if len(data) == 0 and len(output) < FLATEDECODE_OUTPUTSIZE:
                 break
-        if len(data) - count <= 2:
-            return oStringIO.getvalue()
-        else:
-            raise
+            # data after the end of the zlib stream is not consumed
+            if consumed == 0 and len(output) == 0:
+                self.ended = True
+                break
+        self.position += len(chunk)
+
+    def Flush(self):
+        if self.buffer != None:
+            return [FlateDecode(self.buffer)]
+        if self.error != None and self.size - self.errorPosition > 2:
+            raise self.error
+        return []
+
+    def ErrorMessage(self, e):
+        message = 'FlateDecode decompress failed'
+        if self.first != None and self.first & 0x0F != 8:
+            message += ', unexpected compression method: %02x' % self.first
+        return message + '. zlib.error %s' % e
+
+class cASCIIHexDecodeFilter:
+    name = 'ASCIIHexDecode'
+    errors = Exception
+    keepsType = False
 
-def RunLengthDecode(data):
-    f = StringIO(data)
-    decompressed = ''
-    runLength = ord(f.read(1))
-    while runLength:
-        if runLength < 128:
-            decompressed += f.read(runLength + 1)
-        if runLength > 128:
-            decompressed += f.read(1) * (257 - runLength)
-        if runLength == 128:
-            break
-        runLength = ord(f.read(1))
-#    return sub(r'(\d+)(\D)', lambda m: m.group(2) * int(m.group(1)), data)
-    return decompressed
-
-#### LZW code sourced from pdfminer
-# Copyright (c) 2004-2009 Yusuke Shinyama <yusuke at cs dot nyu dot edu>
-#
-# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
-# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
-# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
-# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
-
-class LZWDecoder(object):
-    def __init__(self, fp):
-        self.fp = fp
-        self.buff = 0
-        self.bpos = 8
-        self.nbits = 9
-        self.table = None
-        self.prevbuf = None
-        return
+    def __init__(self):
+        self.pending = b''
+
+    # trailing > characters and an odd hex digit are kept until the next chunk
+    def Decode(self, data):
+        data = self.pending + data.translate(None, b' \t\n\r')
+        end = len(data.rstrip(b'>'))
+        end -= end % 2
+        self.pending = data[end:]
+        return [binascii.unhexlify(data[:end])]
 
-    def readbits(self, bits):
-        v = 0
-        while 1:
-            # the number of remaining bits we can get from the current buffer.
-            r = 8-self.bpos
-            if bits <= r:
-                # |-----8-bits-----|
-                # |-bpos-|-bits-|  |
-                # |      |----r----|
-                v = (v<<bits) | ((self.buff>>(r-bits)) & ((1<<bits)-1))
-                self.bpos += bits
+    def Flush(self):
+        return [binascii.unhexlify(self.pending.rstrip(b'>'))]
+
+    def ErrorMessage(self, e):
+        return 'ASCIIHexDecode decompress failed'
+
+class cASCII85DecodeFilter:
+    name = 'ASCII85Decode'
+    errors = Exception
+    keepsType = False
+
+    def __init__(self):
+        self.n = 0
+        self.b = 0
+        self.pending = b''
+        self.ended = False
+
+    # trailing > characters are kept until the next chunk
+    def Decode(self, data):
+        import struct
+        if self.ended:
+            return []
+        data = self.pending + data
+        stripped = data.rstrip(b'>')
+        self.pending = data[len(stripped):]
+        n = self.n
+        b = self.b
+        out = []
+        for c in bytearray(stripped):
+            if 33 <= c and c <= 117:
+                n += 1
+                b = b*85+(c-33)
+                if n == 5:
+                    out.append(struct.pack('>L',b))
+                    n = b = 0
+            elif c == 122:
+                if n != 0:
+                    raise Exception('z inside ASCII85 group')
+                out.append(b'\0\0\0\0')
+            elif c == 126:
+                if n:
+                    for _ in range(5-n):
+                        b = b*85+84
+                    out.append(struct.pack('>L',b)[:n-1])
+                self.ended = True
                 break
+        self.n = n
+        self.b = b
+        return [b''.join(out)]
+
+    def Flush(self):
+        return []
+
+    def ErrorMessage(self, e):
+        return 'ASCII85Decode decompress failed'
+
+# LZW decoder: the codes are read MSB first with a bit buffer; a table entry is the position and length of a string in the window (the output since the last clear code),
+# because each new entry (previous string + first byte of the current string) is always followed in the output by the current string
+# when the table is full, the window is no longer extended
+class cLZWDecodeFilter:
+    name = 'LZWDecode'
+    errors = Exception
+    keepsType = True
+
+    def __init__(self):
+        self.window = bytearray()
+        self.emitted = 0
+        self.frozen = None
+        self.tableStart = [0] * 4096
+        self.tableLength = [0] * 4096
+        self.tableSize = None
+        self.nbits = 9
+        self.previousStart = 0
+        self.previousLength = 0
+        self.bitBuffer = 0
+        self.bitCount = 0
+
+    def Decode(self, data):
+        window = self.window
+        tableStart = self.tableStart
+        tableLength = self.tableLength
+        tableSize = self.tableSize
+        nbits = self.nbits
+        previousStart = self.previousStart
+        previousLength = self.previousLength
+        bitBuffer = self.bitBuffer
+        bitCount = self.bitCount
+        for byte in bytearray(data):
+            bitBuffer = (bitBuffer << 8) | byte
+            bitCount += 8
+            while bitCount >= nbits:
+                bitCount -= nbits
+                code = bitBuffer >> bitCount
+                bitBuffer &= (1 << bitCount) - 1
+                if code == 256:
+                    yield bytes(window[self.emitted:])
+                    window = self.window = bytearray()
+                    self.emitted = 0
+                    self.frozen = None
+                    tableSize = 258
+                    nbits = 9
+                    previousStart = 0
+                    previousLength = 0
+                elif code == 257:
+                    pass
+                elif tableSize == None:
+                    raise Exception('LZW code %d before clear code' % code)
+                elif previousLength == 0:
+                    if code >= 256:
+                        raise Exception('LZW code %d not in table' % code)
+                    previousStart = len(window)
+                    previousLength = 1
+                    window.append(code)
+                else:
+                    start = len(window)
+                    if code < 256:
+                        window.append(code)
+                        length = 1
+                    elif code < tableSize:
+                        length = tableLength[code]
+                        window += window[tableStart[code]:tableStart[code] + length]
+                    elif code == tableSize:
+                        length = previousLength + 1
+                        window += window[previousStart:previousStart + previousLength]
+                        window.append(window[previousStart])
+                    else:
+                        raise Exception('LZW code %d not in table' % code)
+                    if tableSize < 4096:
+                        tableStart[tableSize] = previousStart
+                        tableLength[tableSize] = previousLength + 1
+                        if tableSize == 4095:
+                            self.frozen = len(window)
+                    tableSize += 1
+                    if tableSize == 511:
+                        nbits = 10
+                    elif tableSize == 1023:
+                        nbits = 11
+                    elif tableSize == 2047:
+                        nbits = 12
+                    previousStart = start
+                    previousLength = length
+                if len(window) - self.emitted >= FLATEDECODE_OUTPUTSIZE:
+                    yield bytes(window[self.emitted:])
+                    self.Freeze(window)
+        self.tableSize = tableSize
+        self.nbits = nbits
+        self.previousStart = previousStart
+        self.previousLength = previousLength
+        self.bitBuffer = bitBuffer
+        self.bitCount = bitCount
+        yield bytes(window[self.emitted:])
+        self.Freeze(window)
+
+    # output that has been emitted after the table is full is not referenced by the table
+    def Freeze(self, window):
+        if self.frozen != None:
+            del window[self.frozen:]
+        self.emitted = len(window)
+
+    def Flush(self):
+        return []
+
+    def ErrorMessage(self, e):
+        return 'LZWDecode decompress failed'
+
+class cRunLengthDecodeFilter:
+    name = 'RunLengthDecode'
+    errors = Exception
+    keepsType = True
+
+    def __init__(self):
+        self.literal = 0
+        self.repeat = 0
+        self.ended = False
+
+    def Decode(self, data):
+        if self.ended:
+            return []
+        encoded = bytearray(data)
+        decompressed = bytearray()
+        position = 0
+        while position < len(encoded):
+            if self.literal > 0:
+                decompressed += encoded[position:position + self.literal]
+                length = min(self.literal, len(encoded) - position)
+                self.literal -= length
+                position += length
+            elif self.repeat > 0:
+                decompressed += encoded[position:position + 1] * self.repeat
+                self.repeat = 0
+                position += 1
             else:
-                # |-----8-bits-----|
-                # |-bpos-|---bits----...
-                # |      |----r----|
-                v = (v<<r) | (self.buff & ((1<<r)-1))
-                bits -= r
-                x = self.fp.read(1)
-                if not x: raise EOFError
-                self.buff = ord(x)
-                self.bpos = 0
-        return v
-
-    def feed(self, code):
-        x = ''
-        if code == 256:
-            self.table = [ chr(c) for c in range(256) ] # 0-255
-            self.table.append(None) # 256
-            self.table.append(None) # 257
-            self.prevbuf = ''
-            self.nbits = 9
-        elif code == 257:
-            pass
-        elif not self.prevbuf:
-            x = self.prevbuf = self.table[code]
-        else:
-            if code < len(self.table):
-                x = self.table[code]
-                self.table.append(self.prevbuf+x[0])
-            else:
-                self.table.append(self.prevbuf+self.prevbuf[0])
-                x = self.table[code]
-            l = len(self.table)
-            if l == 511:
-                self.nbits = 10
-            elif l == 1023:
-                self.nbits = 11
-            elif l == 2047:
-                self.nbits = 12
-            self.prevbuf = x
-        return x
-
-    def run(self):
-        while 1:
-            try:
-                code = self.readbits(self.nbits)
-            except EOFError:
-                break
-            x = self.feed(code)
-            yield x
-        return
+                runLength = encoded[position]
+                position += 1
+                if runLength < 128 and runLength != 0:
+                    self.literal = runLength + 1
+                elif runLength > 128:
+                    self.repeat = 257 - runLength
+                else:
+                    self.ended = True
+                    break
+#    return sub(r'(\d+)(\D)', lambda m: m.group(2) * int(m.group(1)), data)
+        return [bytes(decompressed)]
+
+    # the data has to end with an end of data byte (0 or 128)
+    def Flush(self):
+        if not self.ended:
+            raise Exception('RunLengthDecode: no end of data')
+        return []
+
+    def ErrorMessage(self, e):
+        return 'RunLengthDecode decompress failed'
+
+def FilterClass(filter):
+    if EqualCanonical(filter, '/FlateDecode') or EqualCanonical(filter, '/Fl'):
+        return cFlateDecodeFilter
+    elif EqualCanonical(filter, '/ASCIIHexDecode') or EqualCanonical(filter, '/AHx'):
+        return cASCIIHexDecodeFilter
+    elif EqualCanonical(filter, '/ASCII85Decode') or EqualCanonical(filter, '/A85'):
+        return cASCII85DecodeFilter
+    elif EqualCanonical(filter, '/LZWDecode') or EqualCanonical(filter, '/LZW'):
+        return cLZWDecodeFilter
+    elif EqualCanonical(filter, '/RunLengthDecode') or EqualCanonical(filter, '/R'):
+        return cRunLengthDecodeFilter
+#    elif i.startswith('/CC')                        # CCITTFaxDecode
+#    elif i.startswith('/DCT')                       # DCTDecode
+    else:
+        return None
 
-####
+# Streaming filter pipeline: the stream data is passed in chunks of STREAM_CHUNKSIZE bytes through the chain of incremental filters
+# Method Chunks yields the decoded chunks; when decoding fails, attribute error contains the error message after the last chunk, and the decoded chunks have to be discarded
+# The error message is the same as decoding the complete stream filter by filter: the failure of the first filter in the chain takes precedence
+# maximumSize limits the output of each filter: when it is exceeded, decoding fails, or stops without error when truncate is True
+# filters None means no filtering
+class cFilterPipeline:
+    def __init__(self, data, filters, maximumSize=None, truncate=False):
+        self.data = data
+        self.filters = filters
+        self.maximumSize = maximumSize
+        self.truncate = truncate
+        self.error = None
+        self.unsupported = None
+        self.failed = None
+        self.failedMessage = None
+        self.stopped = False
+        self.stages = []
+        self.outputIsString = True
+        if filters == None:
+            return
+        if filters == []:
+            self.error = 'No filters'
+        for filter in filters:
+            cFilter = FilterClass(filter)
+            if cFilter == None:
+                self.unsupported = 'Unsupported filter: %s' % repr(filters)
+                break
+            self.stages.append(cFilter())
+            self.outputIsString = self.outputIsString and cFilter.keepsType
+        self.sizes = [0] * len(self.stages)
+
+    def Fail(self, index, message):
+        if self.failed == None or index < self.failed:
+            self.failed = index
+            self.failedMessage = message
+
+    def Push(self, index, data):
+        if self.stopped or self.failed != None and index >= self.failed:
+            return
+        if index == len(self.stages):
+            if self.unsupported == None:
+                yield data
+            return
+        oFilter = self.stages[index]
+        try:
+            for output in oFilter.Decode(data):
+                for final in self.Output(index, output):
+                    yield final
+                if self.stopped or self.failed != None and index >= self.failed:
+                    return
+        except oFilter.errors as e:
+            self.Fail(index, oFilter.ErrorMessage(e))
 
-def LZWDecode(data):
-    return ''.join(LZWDecoder(StringIO(data)).run())
+    def Flush(self, index):
+        if self.stopped or self.failed != None and index >= self.failed:
+            return
+        oFilter = self.stages[index]
+        try:
+            outputs = oFilter.Flush()
+        except oFilter.errors as e:
+            self.Fail(index, oFilter.ErrorMessage(e))
+            return
+        for output in outputs:
+            for final in self.Output(index, output):
+                yield final
+
+    # passes the output of filter index to the next filter, checking the maximum size
+    def Output(self, index, output):
+        if len(output) == 0:
+            return
+        self.sizes[index] += len(output)
+        if self.maximumSize != None and self.sizes[index] > self.maximumSize:
+            if not self.truncate:
+                self.Fail(index, '%s decompress failed, maximum decompressed size exceeded' % self.stages[index].name)
+                return
+            output = output[:len(output) - (self.sizes[index] - self.maximumSize)]
+            for final in self.Push(index + 1, output):
+                yield final
+            self.stopped = True
+            return
+        for final in self.Push(index + 1, output):
+            yield final
+
+    def Chunks(self):
+        if self.error != None:
+            return
+        data = String2Bytes(self.data)
+        if self.filters == None:
+            for position in range(0, len(data), STREAM_CHUNKSIZE):
+                yield data[position:position + STREAM_CHUNKSIZE]
+            return
+        for position in range(0, len(data), STREAM_CHUNKSIZE):
+            for final in self.Push(0, data[position:position + STREAM_CHUNKSIZE]):
+                yield final
+            if self.stopped or self.failed == 0:
+                break
+        for index in range(len(self.stages)):
+            for final in self.Flush(index):
+                yield final
+        if self.failed != None:
+            self.error = self.failedMessage
+        elif self.unsupported != None and not self.stopped:
+            self.error = self.unsupported
+
+    # returns the complete decoded data, or the error message
+    def Decode(self):
+        if self.filters == None:
+            return self.data
+        decompressed = b''.join(self.Chunks())
+        if self.error != None:
+            return self.error
+        if self.outputIsString:
+            return Bytes2String(decompressed)
+        return decompressed
 
 def PrintGenerateObject(object, options, newId=None):
     if newId == None:
@@ -1131,7 +1910,7 @@ def PrintGenerateObject(object, options, newId=None):
         if options.filter:
             decompressed = object.Stream(True, options.overridingfilters)
             if decompressed == 'No filters' or decompressed.startswith('Unsupported filter: '):
-                print('    oPDF.stream(%d, %d, %s, %s)' % (objectId, object.version, repr(object.Stream(False, options.overridingfilters).rstrip()), repr(re.sub('/Length\s+\d+', '/Length %d', FormatOutput(dataPrecedingStream, True)).strip())))
+                print('    oPDF.stream(%d, %d, %s, %s)' % (objectId, object.version, repr(object.Stream(False, options.overridingfilters).rstrip()), repr(re.sub(r'/Length\s+\d+', '/Length %d', FormatOutput(dataPrecedingStream, True)).strip())))
             else:
                 dictionary = FormatOutput(dataPrecedingStream, True)
                 dictionary = re.sub(r'/Length\s+\d+', '', dictionary)
@@ -1142,7 +1921,7 @@ def PrintGenerateObject(object, options, newId=None):
                 dictionary = dictionary.strip()
                 print("    oPDF.stream2(%d, %d, %s, %s, 'f')" % (objectId, object.version, repr(decompressed.rstrip()), repr(dictionary)))
         else:
-            print('    oPDF.stream(%d, %d, %s, %s)' % (objectId, object.version, repr(object.Stream(False, options.overridingfilters).rstrip()), repr(re.sub('/Length\s+\d+', '/Length %d', FormatOutput(dataPrecedingStream, True)).strip())))
+            print('    oPDF.stream(%d, %d, %s, %s)' % (objectId, object.version, repr(object.Stream(False, options.overridingfilters).rstrip()), repr(re.sub(r'/Length\s+\d+', '/Length %d', FormatOutput(dataPrecedingStream, True)).strip())))
     else:
         print('    oPDF.indirectobject(%d, %d, %s)' % (objectId, object.version, repr(FormatOutput(object.content, True).strip())))
 
@@ -1174,6 +1953,13 @@ def ProcessAt(argument):
     else:
         return [argument]
 
+# with module yaracache, compiled rules are cached and reused as long as the rule files don't change
+def YARACompileRules(**kwargs):
+    if yaracache == None:
+        return yara.compile(**kwargs)
+    else:
+        return yaracache.Compile(**kwargs)
+
 def YARACompile(ruledata):
     if ruledata.startswith('#'):
         if ruledata.startswith('#h#'):
@@ -1186,7 +1972,7 @@ def YARACompile(ruledata):
             rule = ruledata[3:].replace("'", '"')
         else:
             rule = ruledata[1:]
-        return yara.compile(source=rule)
+        return YARACompileRules(source=rule)
     else:
         dFilepaths = {}
         if os.path.isdir(ruledata):
@@ -1197,7 +1983,7 @@ def YARACompile(ruledata):
         else:
             for filename in ProcessAt(ruledata):
                 dFilepaths[filename] = filename
-        return yara.compile(filepaths=dFilepaths)
+        return YARACompileRules(filepaths=dFilepaths)
 
 def AddDecoder(cClass):
     global decoders
@@ -1308,6 +2094,482 @@ def ParseINIFile():
 def MatchObjectID(id, selection):
     return str(id) in selection.split(',')
 
+# an /ObjStm object is decompressed once, its header is parsed into a map of object ids to slices of the decompressed stream, and the contained objects are parsed on demand
+class cObjStm:
+    def __init__(self, object, options):
+        self.id = object.id
+        self.version = object.version
+        self.options = options
+        oPDFParseDictionary = object.Dictionary(options.nocanonicalizedoutput)
+        numberOfObjects = int(oPDFParseDictionary.Get('/N')[0])
+        offsetFirstObject = int(oPDFParseDictionary.Get('/First')[0])
+        data = C2SIP3(object.Stream())
+        indexes = list(map(int, data[:offsetFirstObject].strip().split(' ')))
+        if len(indexes) % 2 != 0 or len(indexes) / 2 != numberOfObjects:
+            raise Exception('Error in index of /ObjStm stream')
+        self.data = data[offsetFirstObject:]
+        self.ids = indexes[0::2]
+        offsets = indexes[1::2]
+        self.slices = [(offset, offsetNext) for offset, offsetNext in zip(offsets, offsets[1:] + [len(self.data)])]
+        self.ordinals = {}
+        for ordinal, id in enumerate(self.ids):
+            if not id in self.ordinals:
+                self.ordinals[id] = ordinal
+        self.objects = {}
+
+    def Synthesize(self, ordinal):
+        offset, offsetNextObject = self.slices[ordinal]
+        return '%d 0 obj\n%s\nendobj\n' % (self.ids[ordinal], self.data[offset:offsetNextObject])
+
+    # returns a parser for a synthesized PDF document with all objects contained in the /ObjStm object
+    def Parser(self):
+        return cPDFParser(StringIO(''.join([self.Synthesize(ordinal) for ordinal in range(len(self.ids))])), self.options.verbose, self.options.extract, (self.id, self.version), self.options.tokenizer)
+
+    def GetObjectByOrdinal(self, ordinal):
+        if ordinal < 0 or ordinal >= len(self.ids):
+            return None
+        if not ordinal in self.objects:
+            self.objects[ordinal] = cPDFParser(StringIO(self.Synthesize(ordinal)), self.options.verbose, self.options.extract, (self.id, self.version), self.options.tokenizer).GetObject()
+        return self.objects[ordinal]
+
+    def GetObjectById(self, id):
+        if not id in self.ordinals:
+            return None
+        return self.GetObjectByOrdinal(self.ordinals[id])
+
+# least recently used cache of cObjStm instances, keyed by id and version of the /ObjStm object
+class cObjStmCache:
+    def __init__(self, maximum=OBJSTM_CACHESIZE):
+        self.maximum = maximum
+        self.cache = collections.OrderedDict()
+
+    def Lookup(self, key):
+        if not key in self.cache:
+            return None
+        oObjStm = self.cache.pop(key)
+        self.cache[key] = oObjStm
+        return oObjStm
+
+    def Add(self, object, options):
+        oObjStm = cObjStm(object, options)
+        self.cache[(object.id, object.version)] = oObjStm
+        while len(self.cache) > self.maximum:
+            self.cache.popitem(last=False)
+        return oObjStm
+
+def ObjStmParser(object, options):
+    # parsing objects inside an /ObjStm object by extracting & parsing the stream content to create a synthesized PDF document, that is then parsed by cPDFParser
+    return cObjStm(object, options).Parser()
+
+def RandomAccessPossible(options):
+    return options.randomaccess and options.object and not (options.elements or options.stats or options.search or options.key or options.extract or options.generate or options.generateembedded != 0)
+
+# returns the selected indirect objects, or None when the cross-reference data can not be used
+def GetObjectsRandomAccess(oPDFParser, options):
+    oPDFXrefTable = cPDFXrefTable(oPDFParser)
+    if not oPDFXrefTable.valid:
+        return None
+    # an object selected more than once is output once, like with a complete parse
+    located = set()
+    for selection in set(options.object.split(',')):
+        if not re.match('^[0-9]+$', selection):
+            return None
+        id = int(selection)
+        if id in oPDFXrefTable.objects:
+            located.add((oPDFXrefTable.objects[id][0], -1, id, None))
+        elif options.objstm and id in oPDFXrefTable.compressed and oPDFXrefTable.compressed[id][0] in oPDFXrefTable.objects:
+            idContainer = oPDFXrefTable.compressed[id][0]
+            located.add((oPDFXrefTable.objects[idContainer][0], oPDFXrefTable.compressed[id][1], id, (idContainer, oPDFXrefTable.objects[idContainer][1])))
+        else:
+            return None
+    objects = []
+    oObjStmCache = cObjStmCache()
+    for offset, index, id, container in sorted(located):
+        oObjStm = oObjStmCache.Lookup(container)
+        if oObjStm == None:
+            if not oPDFParser.Seek(offset):
+                return None
+            object = oPDFParser.GetObject()
+            if object == None or object.type != PDF_ELEMENT_INDIRECT_OBJECT:
+                return None
+        if index != -1:
+            if oObjStm == None:
+                if not EqualCanonical(object.GetType(), '/ObjStm') or not object.ContainsStream():
+                    return None
+                oObjStm = oObjStmCache.Add(object, options)
+            object = oObjStm.GetObjectById(id)
+        if object == None or object.id != id:
+            return None
+        objects.append(object)
+    return objects
+
+def IndexCachePossible(options):
+    return options.indexcache and (options.object or options.type) and not (options.elements or options.stats or options.search or options.key or options.reference or options.extract or options.generate or options.generateembedded != 0)
+
+def GetObjectFilters(object):
+    dataPrecedingStream = object.ContainsStream()
+    if not dataPrecedingStream:
+        return []
+    oPDFParseDictionary = object.Dictionary()
+    if oPDFParseDictionary.parsed == None:
+        return []
+    value = oPDFParseDictionary.Get('/Filter')
+    if value == None:
+        return []
+    return [item for item in value if item.startswith('/')]
+
+# the object index of a PDF document is a list of entries [id, version, start, end, type, objstm]
+# start and end are file positions of the indirect object, objstm is [id, version, ordinal] of the containing /ObjStm object (None when not contained)
+def BuildObjectIndex(filename, options):
+    try:
+        oPDFParser = cPDFParser(filename, tokenizer=options.tokenizer)
+        index = []
+        oPDFParserOBJSTM = None
+        container = None
+        ordinal = 0
+        while True:
+            if oPDFParserOBJSTM == None:
+                object = oPDFParser.GetObject()
+            else:
+                object = oPDFParserOBJSTM.GetObject()
+                if object == None:
+                    oPDFParserOBJSTM = None
+                    object = oPDFParser.GetObject()
+            if object == None:
+                break
+            if object.type != PDF_ELEMENT_INDIRECT_OBJECT:
+                continue
+            if object.objstm == None:
+                if object.byteRange == None:
+                    return None
+                index.append([object.id, object.version, object.byteRange[0], object.byteRange[1], object.GetType(), None])
+            else:
+                index.append([object.id, object.version, None, None, object.GetType(), [container[0], container[1], ordinal]])
+                ordinal += 1
+            if oPDFParserOBJSTM == None and EqualCanonical(object.GetType(), '/ObjStm') and object.ContainsStream():
+                oPDFParserOBJSTM = ObjStmParser(object, options)
+                container = (object.id, object.version)
+                ordinal = 0
+        oPDFParser.oPDFTokenizer.oPDFDocument.Close()
+        return index
+    except:
+        return None
+
+# returns the selected indirect objects, or None when the object index can not be used
+def GetObjectsFromIndex(oPDFParser, index, options):
+    if options.type == '-':
+        optionsType = ''
+    else:
+        optionsType = options.type
+    containers = {}
+    objects = []
+    oObjStmCache = cObjStmCache()
+    for id, version, start, end, type, objstm in index:
+        if objstm != None and not options.objstm:
+            continue
+        if options.object:
+            selected = MatchObjectID(id, options.object)
+        else:
+            selected = EqualCanonical(type, optionsType)
+        if objstm == None:
+            if EqualCanonical(type, '/ObjStm'):
+                containers[(id, version)] = start
+            if not selected:
+                continue
+            if not oPDFParser.Seek(start):
+                return None
+            object = oPDFParser.GetObject()
+        else:
+            if not selected:
+                continue
+            container = (objstm[0], objstm[1])
+            oObjStm = oObjStmCache.Lookup(container)
+            if oObjStm == None:
+                if not container in containers or not oPDFParser.Seek(containers[container]):
+                    return None
+                object = oPDFParser.GetObject()
+                if object == None or object.type != PDF_ELEMENT_INDIRECT_OBJECT or not object.ContainsStream():
+                    return None
+                oObjStm = oObjStmCache.Add(object, options)
+            object = oObjStm.GetObjectByOrdinal(objstm[2])
+        if object == None or object.type != PDF_ELEMENT_INDIRECT_OBJECT or object.id != id or object.version != version:
+            return None
+        objects.append(object)
+    return objects
+
+# filename of an index: SHA-256 hash, size and modification time of the PDF document
+REGEX_INDEXFILENAME = re.compile(r'^[0-9a-f]{64}-\d+-\d+\.json$')
+
+class cPDFObjectIndexCache:
+    def __init__(self, directory, maximumSize):
+        self.directory = directory
+        self.maximumSize = maximumSize
+        self.indexFilename = None
+
+    # the key of an index is the SHA-256 hash, the size and the modification time of the PDF document
+    def IndexFilename(self, filename):
+        if self.indexFilename == None:
+            oStat = os.stat(filename)
+            oSHA256 = hashlib.sha256()
+            fPDF = open(filename, 'rb')
+            try:
+                while True:
+                    data = fPDF.read(PDF_BLOCKSIZE)
+                    if not data:
+                        break
+                    oSHA256.update(data)
+            finally:
+                fPDF.close()
+            self.indexFilename = os.path.join(self.directory, '%s-%d-%d.json' % (oSHA256.hexdigest(), oStat.st_size, int(oStat.st_mtime)))
+        return self.indexFilename
+
+    def Load(self, filename):
+        try:
+            indexFilename = self.IndexFilename(filename)
+            if not os.path.isfile(indexFilename):
+                return None
+            fIndex = open(indexFilename, 'r')
+            try:
+                dIndex = json.load(fIndex)
+            finally:
+                fIndex.close()
+            # an index written by another version of pdf-parser is built again
+            if dIndex['version'] != __version__:
+                return None
+            index = dIndex['objects']
+            os.utime(indexFilename, None)
+            return index
+        except:
+            return None
+
+    def Save(self, filename, index):
+        try:
+            indexFilename = self.IndexFilename(filename)
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            temporaryFilename = '%s.%d.tmp' % (indexFilename, os.getpid())
+            fIndex = open(temporaryFilename, 'w')
+            try:
+                json.dump({'version': __version__, 'objects': index}, fIndex)
+            finally:
+                fIndex.close()
+            os.rename(temporaryFilename, indexFilename)
+            self.Evict()
+        except:
+            try:
+                os.remove(temporaryFilename)
+            except:
+                pass
+
+    def Remove(self, filename):
+        try:
+            os.remove(self.IndexFilename(filename))
+        except:
+            pass
+
+    # least recently used indexes (oldest modification time) are removed until the size of the cache is below the maximum
+    # other files in the cache directory are not counted and never removed
+    def Evict(self):
+        indexes = []
+        for name in os.listdir(self.directory):
+            if REGEX_INDEXFILENAME.match(name):
+                path = os.path.join(self.directory, name)
+                oStat = os.stat(path)
+                indexes.append((oStat.st_mtime, oStat.st_size, path))
+        total = sum([size for mtime, size, path in indexes])
+        for mtime, size, path in sorted(indexes):
+            if total <= self.maximumSize:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except:
+                pass
+
+def JSONString(value):
+    if sys.version_info[0] < 3 and isinstance(value, str):
+        return value.decode('latin')
+    return value
+
+def BatchKeywords():
+    keywords = ['/JS', '/JavaScript', '/AA', '/OpenAction', '/AcroForm', '/RichMedia', '/Launch', '/EmbeddedFile', '/XFA', '/URI']
+    for extrakeyword in ParseINIFile():
+        if not extrakeyword in keywords:
+            keywords.append(extrakeyword)
+    return keywords
+
+def BatchObjectSelected(object, options):
+    if options.object and not MatchObjectID(object.id, options.object):
+        return False
+    if options.type and not EqualCanonical(object.GetType(), IFF(options.type == '-', '', options.type)):
+        return False
+    if options.search and not object.Contains(options.search):
+        return False
+    return True
+
+# parses one PDF document and returns a list of JSON records: first a record for the document, followed by a record for each selected indirect object
+def BatchAnalyze(filename, options):
+    keywords = BatchKeywords()
+    recordFile = {'record': 'file', 'filename': JSONString(filename), 'status': 'ok', 'comments': 0, 'xrefs': 0, 'trailers': 0, 'startxrefs': 0, 'indirectobjects': 0, 'types': {}, 'keywords': {}}
+    records = [recordFile]
+    oPDFParser = cPDFParser(filename, options.verbose, tokenizer=options.tokenizer)
+    oPDFParserOBJSTM = None
+    while True:
+        if oPDFParserOBJSTM == None:
+            object = oPDFParser.GetObject()
+        else:
+            object = oPDFParserOBJSTM.GetObject()
+            if object == None:
+                oPDFParserOBJSTM = None
+                object = oPDFParser.GetObject()
+        if object == None:
+            break
+        if object.type == PDF_ELEMENT_COMMENT:
+            recordFile['comments'] += 1
+        elif object.type == PDF_ELEMENT_XREF:
+            recordFile['xrefs'] += 1
+        elif object.type == PDF_ELEMENT_TRAILER:
+            recordFile['trailers'] += 1
+        elif object.type == PDF_ELEMENT_STARTXREF:
+            recordFile['startxrefs'] += 1
+        elif object.type == PDF_ELEMENT_INDIRECT_OBJECT:
+            recordFile['indirectobjects'] += 1
+            objectType = JSONString(object.GetType())
+            recordFile['types'].setdefault(objectType, []).append(object.id)
+            objectKeywords = [keyword for keyword in keywords if object.ContainsName(keyword)]
+            for keyword in objectKeywords:
+                recordFile['keywords'].setdefault(keyword, []).append(object.id)
+            if options.objstm and EqualCanonical(object.GetType(), '/ObjStm') and object.ContainsStream():
+                oPDFParserOBJSTM = ObjStmParser(object, options)
+            if BatchObjectSelected(object, options):
+                recordObject = {'record': 'object', 'filename': JSONString(filename), 'id': object.id, 'version': object.version, 'type': objectType, 'keywords': objectKeywords}
+                if object.objstm == None:
+                    recordObject['objstm'] = None
+                else:
+                    recordObject['objstm'] = list(object.objstm)
+                recordObject['stream'] = object.ContainsStream() != False
+                recordObject['filters'] = [JSONString(filter) for filter in GetObjectFilters(object)]
+                recordObject['references'] = [JSONString(' '.join(reference)) for reference in object.GetReferences()]
+                if options.hash:
+                    recordObject['md5'] = hashlib.md5(C2BIP3(FormatOutput(object.content, True))).hexdigest()
+                records.append(recordObject)
+    oPDFParser.oPDFTokenizer.oPDFDocument.Close()
+    return records
+
+# the output of the analysis is captured, as well as the exit when the PDF document can not be opened
+def BatchAnalyzeCapture(filename, options):
+    stdout = sys.stdout
+    sys.stdout = StringIO()
+    try:
+        return BatchAnalyze(filename, options)
+    except SystemExit:
+        message = sys.stdout.getvalue().strip().replace('\n', ': ')
+    except Exception as e:
+        message = str(e)
+    finally:
+        sys.stdout = stdout
+    return [{'record': 'file', 'filename': JSONString(filename), 'status': 'error', 'error': JSONString(message)}]
+
+def BatchWorker(connection, options):
+    global maximumDecompressedSize
+
+    if options.maxdecompressed > 0:
+        maximumDecompressedSize = options.maxdecompressed
+    while True:
+        task = connection.recv()
+        if task == None:
+            break
+        index, filename = task
+        connection.send((index, BatchAnalyzeCapture(filename, options)))
+
+# a worker process analyzes the files it receives through a pipe; a worker that exceeds the timeout is terminated and replaced
+class cBatchWorker:
+    def __init__(self, options):
+        self.connection, connectionWorker = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=BatchWorker, args=(connectionWorker, options))
+        self.process.daemon = True
+        self.process.start()
+        self.task = None
+        self.started = None
+
+    def Submit(self, task):
+        self.task = task
+        self.started = time.time()
+        self.connection.send(task)
+
+    def Result(self):
+        if self.task == None or not self.connection.poll():
+            return None
+        result = self.connection.recv()
+        self.task = None
+        return result
+
+    def TimedOut(self, timeout):
+        return self.task != None and timeout > 0 and time.time() - self.started > timeout
+
+    def Stop(self):
+        try:
+            self.connection.send(None)
+        except:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def Terminate(self):
+        self.process.terminate()
+        self.process.join()
+
+def BatchOutput(records):
+    for record in records:
+        print(json.dumps(record, sort_keys=True))
+    sys.stdout.flush()
+
+# analyzes the files with a pool of worker processes and outputs JSON Lines, in input order or in completion order
+def BatchProcess(filenames, options):
+    if options.jobs > 0:
+        jobs = options.jobs
+    else:
+        jobs = multiprocessing.cpu_count()
+    tasks = collections.deque(enumerate(filenames))
+    workers = [cBatchWorker(options) for iter in range(min(jobs, len(filenames)))]
+    results = {}
+    nextIndex = 0
+    try:
+        while nextIndex < len(filenames):
+            progress = False
+            for position, oBatchWorker in enumerate(workers):
+                if oBatchWorker.task == None and len(tasks) > 0:
+                    oBatchWorker.Submit(tasks.popleft())
+                result = oBatchWorker.Result()
+                if result == None and oBatchWorker.TimedOut(options.timeout):
+                    index, filename = oBatchWorker.task
+                    oBatchWorker.Terminate()
+                    workers[position] = cBatchWorker(options)
+                    result = (index, [{'record': 'file', 'filename': JSONString(filename), 'status': 'timeout', 'error': 'Analysis exceeded %d seconds' % options.timeout}])
+                elif result == None and oBatchWorker.task != None and not oBatchWorker.process.is_alive():
+                    index, filename = oBatchWorker.task
+                    workers[position] = cBatchWorker(options)
+                    result = (index, [{'record': 'file', 'filename': JSONString(filename), 'status': 'error', 'error': 'Worker process exited with code %s' % oBatchWorker.process.exitcode}])
+                if result != None:
+                    progress = True
+                    if options.order == 'completion':
+                        BatchOutput(result[1])
+                        nextIndex += 1
+                    else:
+                        results[result[0]] = result[1]
+                        while nextIndex in results:
+                            BatchOutput(results.pop(nextIndex))
+                            nextIndex += 1
+            if not progress:
+                time.sleep(0.01)
+    finally:
+        for oBatchWorker in workers:
+            if oBatchWorker.task == None:
+                oBatchWorker.Stop()
+            else:
+                oBatchWorker.Terminate()
+
 def GetArguments():
     arguments = sys.argv[1:]
     envvar = os.getenv('PDFPARSER_OPTIONS')
@@ -1320,6 +2582,7 @@ def Main():
     """
 
     global decoders
+    global maximumDecompressedSize
 
     oParser = optparse.OptionParser(usage='usage: %prog [options] pdf-file|zip-file|url\n' + __description__, version='%prog ' + __version__)
     oParser.add_option('-m', '--man', action='store_true', default=False, help='Print manual')
@@ -1351,6 +2614,16 @@ def Main():
     oParser.add_option('--decoders', type=str, default='', help='decoders to load (separate decoders with a comma , ; @file supported)')
     oParser.add_option('--decoderoptions', type=str, default='', help='options for the decoder')
     oParser.add_option('-k', '--key', help='key to search in dictionaries')
+    oParser.add_option('--maxdecompressed', type=int, default=0, help='maximum size in bytes of the output of stream filters (default 0: no maximum)')
+    oParser.add_option('--indexcache', help='directory to cache the object index of PDF documents (used with options -o and -t)')
+    oParser.add_option('--indexcachesize', type=int, default=100, help='maximum size of the object index cache in MB (default 100)')
+    oParser.add_option('--randomaccess', action='store_true', default=False, help='use the cross-reference data to seek directly to the objects selected with option -o')
+    oParser.add_option('--tokenizer', type=str, default='classic', help='tokenizer engine to use: classic or fast (default classic)')
+    oParser.add_option('--batch', action='store_true', default=False, help='analyze all files (@file supported) with a pool of processes and output JSON Lines')
+    oParser.add_option('--jobs', type=int, default=0, help='number of processes for option --batch (default 0: number of CPUs)')
+    oParser.add_option('--order', type=str, default='input', help='order of the output of option --batch: input or completion (default input)')
+    oParser.add_option('--timeout', type=int, default=60, help='maximum number of seconds to analyze a file with option --batch (default 60, 0: no maximum)')
+    oParser.add_option('--verifytokenizer', action='store_true', default=False, help='verify that the classic and fast tokenizer engines produce identical tokens (@file supported)')
     (options, args) = oParser.parse_args(GetArguments())
 
     if options.man:
@@ -1358,7 +2631,7 @@ def Main():
         PrintManual()
         return 0
 
-    if len(args) != 1:
+    if len(args) != 1 and not (options.batch and len(args) > 0):
         oParser.print_help()
         print('')
         print('  %s' % __description__)
@@ -1366,11 +2639,60 @@ def Main():
         print('  Use at your own risk')
         print('  https://DidierStevens.com')
 
+    elif options.verifytokenizer:
+        VerifyTokenizers(ProcessAt(args[0]))
+
+    elif not options.tokenizer in TOKENIZERS:
+        print('Error: unknown --tokenizer value %s' % options.tokenizer)
+
+    elif options.batch:
+        if not options.order in ['input', 'completion']:
+            print('Error: unknown --order value %s' % options.order)
+            return
+        filenames = []
+        for argument in args:
+            filenames.extend(ProcessAt(argument))
+        BatchProcess(filenames, options)
+
     else:
         decoders = []
+        if options.maxdecompressed > 0:
+            maximumDecompressedSize = options.maxdecompressed
         LoadDecoders(options.decoders, True)
 
-        oPDFParser = cPDFParser(args[0], options.verbose, options.extract)
+        oPDFParser = cPDFParser(args[0], options.verbose, options.extract, tokenizer=options.tokenizer)
+
+        if IndexCachePossible(options) and oPDFParser.oPDFTokenizer.oPDFDocument.seekable:
+            oPDFObjectIndexCache = cPDFObjectIndexCache(options.indexcache, options.indexcachesize * 1024 * 1024)
+            index = oPDFObjectIndexCache.Load(args[0])
+            if index == None:
+                index = BuildObjectIndex(args[0], options)
+                if index != None:
+                    oPDFObjectIndexCache.Save(args[0], index)
+            if index != None:
+                objects = GetObjectsFromIndex(oPDFParser, index, options)
+                if objects != None:
+                    for object in objects:
+                        PrintObject(object, options)
+                    oPDFParser.oPDFTokenizer.oPDFDocument.Close()
+                    return
+                oPDFObjectIndexCache.Remove(args[0])
+            if options.verbose:
+                print('Object index can not be used, parsing complete file')
+            oPDFParser.oPDFTokenizer.oPDFDocument.Close()
+            oPDFParser = cPDFParser(args[0], options.verbose, options.extract, tokenizer=options.tokenizer)
+
+        if RandomAccessPossible(options):
+            objects = GetObjectsRandomAccess(oPDFParser, options)
+            if objects != None:
+                for object in objects:
+                    PrintObject(object, options)
+                oPDFParser.oPDFTokenizer.oPDFDocument.Close()
+                return
+            if options.verbose:
+                print('Cross-reference data can not be used, parsing complete file')
+            oPDFParser.oPDFTokenizer.oPDFDocument.Close()
+            oPDFParser = cPDFParser(args[0], options.verbose, options.extract, tokenizer=options.tokenizer)
         cntComment = 0
         cntXref = 0
         cntTrailer = 0
@@ -1474,25 +2796,7 @@ def Main():
                     oPDFParserOBJSTM = None
                     object = oPDFParser.GetObject()
             if options.objstm and hasattr(object, 'GetType') and EqualCanonical(object.GetType(), '/ObjStm') and object.ContainsStream():
-                # parsing objects inside an /ObjStm object by extracting & parsing the stream content to create a synthesized PDF document, that is then parsed by cPDFParser
-                oPDFParseDictionary = cPDFParseDictionary(object.ContainsStream(), options.nocanonicalizedoutput)
-                numberOfObjects = int(oPDFParseDictionary.Get('/N')[0])
-                offsetFirstObject = int(oPDFParseDictionary.Get('/First')[0])
-                indexes = list(map(int, C2SIP3(object.Stream())[:offsetFirstObject].strip().split(' ')))
-                if len(indexes) % 2 != 0 or len(indexes) / 2 != numberOfObjects:
-                    raise Exception('Error in index of /ObjStm stream')
-                streamObject = C2SIP3(object.Stream()[offsetFirstObject:])
-                synthesizedPDF = ''
-                while len(indexes) > 0:
-                    objectNumber = indexes[0]
-                    offset = indexes[1]
-                    indexes = indexes[2:]
-                    if len(indexes) >= 2:
-                        offsetNextObject = indexes[1]
-                    else:
-                        offsetNextObject = len(streamObject)
-                    synthesizedPDF += '%d 0 obj\n%s\nendobj\n' % (objectNumber, streamObject[offset:offsetNextObject])
-                oPDFParserOBJSTM = cPDFParser(StringIO(synthesizedPDF), options.verbose, options.extract, (object.id, object.version))
+                oPDFParserOBJSTM = ObjStmParser(object, options)
             if object != None:
                 if options.stats:
                     if object.type == PDF_ELEMENT_COMMENT:
@@ -1517,7 +2821,7 @@ def Main():
                     if object.type == PDF_ELEMENT_COMMENT and selectComment:
                         if options.generate:
                             comment = object.comment[1:].rstrip()
-                            if re.match('PDF-\d\.\d', comment):
+                            if re.match(r'PDF-\d\.\d', comment):
                                 print("    oPDF.header('%s')" % comment[4:])
                             elif comment != '%EOF':
                                 print('    oPDF.comment(%s)' % repr(comment))
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+
+__description__ = 'Client for the pdfid.py service (option --service)'
+__author__ = 'Didier Stevens'
+__version__ = '0.0.1'
+__date__ = '2026/10/17'
+
+"""
+Source code put in public domain by Didier Stevens, no Copyright
+https://DidierStevens.com
+Use at your own risk
+
+History:
+  2026/10/17: start
+
+Todo:
+"""
+
+import optparse
+import socket
+import json
+import base64
+import os
+import sys
+import time
+import subprocess
+
+#Convert 2 Bytes If Python 3
+def C2BIP3(string):
+    if sys.version_info[0] > 2:
+        return bytes([ord(x) for x in string])
+    else:
+        return string
+
+class cPDFiDClient():
+    def __init__(self, socketPath):
+        self.oSocket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.oSocket.connect(socketPath)
+        self.fSocket = self.oSocket.makefile('rb')
+
+    def Request(self, request):
+        self.oSocket.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        line = self.fSocket.readline()
+        if line == C2BIP3(''):
+            raise Exception('Connection closed by service')
+        return json.loads(line.decode('utf-8'))
+
+    def Close(self):
+        self.fSocket.close()
+        self.oSocket.close()
+
+def MakeRequest(filename, options):
+    # the service does not have the working directory of the client
+    if options.data:
+        request = {'filename': filename}
+    else:
+        request = {'filename': os.path.abspath(filename)}
+    request.update({'all': options.all, 'extra': options.extra, 'force': options.force})
+    if options.engine != '':
+        request['engine'] = options.engine
+    if options.select != '':
+        request['select'] = options.select
+    if options.data:
+        fIn = open(filename, 'rb')
+        try:
+            request['data'] = base64.b64encode(fIn.read()).decode('ascii')
+        finally:
+            fIn.close()
+    return request
+
+def Statistics(durations):
+    durations = sorted(durations)
+    return 'average %.1f ms, median %.1f ms, minimum %.1f ms, maximum %.1f ms' % (sum(durations) / len(durations) * 1000.0, durations[len(durations) // 2] * 1000.0, durations[0] * 1000.0, durations[-1] * 1000.0)
+
+# latency of a request to the service (one connection per request, like a mail filter calling pdfid for each attachment) compared with running pdfid.py for each file
+def Benchmark(socketPath, filenames, options):
+    serviceDurations = []
+    processDurations = []
+    arguments = [sys.executable, options.pdfid]
+    if options.all:
+        arguments.append('-a')
+    if options.extra:
+        arguments.append('-e')
+    if options.force:
+        arguments.append('-f')
+    if options.engine != '':
+        arguments.append('--engine=' + options.engine)
+    if options.select != '':
+        arguments.append('--select=' + options.select)
+    for iter in range(options.benchmark):
+        for filename in filenames:
+            start = time.time()
+            oPDFiDClient = cPDFiDClient(socketPath)
+            oPDFiDClient.Request(MakeRequest(filename, options))
+            oPDFiDClient.Close()
+            serviceDurations.append(time.time() - start)
+
+            start = time.time()
+            fNull = open(os.devnull, 'wb')
+            try:
+                subprocess.call(arguments + [filename], stdout=fNull, stderr=fNull)
+            finally:
+                fNull.close()
+            processDurations.append(time.time() - start)
+    print('Requests: %d' % len(serviceDurations))
+    print('Service: %s' % Statistics(serviceDurations))
+    print('Process: %s' % Statistics(processDurations))
+
+def PDFiDClient(socketPath, filenames, options):
+    if options.benchmark > 0:
+        Benchmark(socketPath, filenames, options)
+        return
+    oPDFiDClient = cPDFiDClient(socketPath)
+    try:
+        for filename in filenames:
+            print(json.dumps(oPDFiDClient.Request(MakeRequest(filename, options))))
+    finally:
+        oPDFiDClient.Close()
+
+def Main():
+    moredesc = '''
+
+Sends a request for each file to a pdfid.py service started with option --service
+(pdfid.py --service socket), and prints the JSON responses (one per line).
+
+Request (one JSON object per line):
+{"filename": "sample.pdf", "all": false, "extra": false, "force": false, "engine": "fast", "select": "pdf.js.count > 0"}
+Without "data", the service reads the file itself. With "data", the content of the file
+is BASE64 encoded and "filename" is only used as name in the response.
+
+Source code put in the public domain by Didier Stevens, no Copyright
+Use at your own risk
+https://DidierStevens.com'''
+
+    oParser = optparse.OptionParser(usage='usage: %prog [options] socket file ...\n' + __description__ + moredesc, version='%prog ' + __version__)
+    oParser.add_option('-a', '--all', action='store_true', default=False, help='display all the names')
+    oParser.add_option('-e', '--extra', action='store_true', default=False, help='display extra data, like dates')
+    oParser.add_option('-f', '--force', action='store_true', default=False, help='force the scan of the file, even without proper %PDF header')
+    oParser.add_option('-S', '--select', type=str, default='', help='selection expression')
+    oParser.add_option('--engine', type=str, default='', help='scan engine: classic or fast (default: engine of the service)')
+    oParser.add_option('-d', '--data', action='store_true', default=False, help='send the content of the files in stead of the filenames')
+    oParser.add_option('-b', '--benchmark', type=int, default=0, help='measure the latency of the given number of requests per file, compared with running pdfid.py per file')
+    oParser.add_option('--pdfid', type=str, default=os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), 'pdfid.py'), help='pdfid.py to run for option --benchmark (default: pdfid.py in the directory of this program)')
+    (options, args) = oParser.parse_args()
+
+    if len(args) < 2:
+        oParser.print_help()
+        return
+    PDFiDClient(args[0], args[1:], options)
+
+if __name__ == '__main__':
+    Main()
@@ -2,8 +2,8 @@
 
 __description__ = 'Tool to test a PDF file'
 __author__ = 'Didier Stevens'
-__version__ = '0.2.6'
-__date__ = '2019/09/30'
+__version__ = '0.2.7'
+__date__ = '2026/10/17'
 
 """
 
@@ -55,6 +55,13 @@ History:
   2018/01/29: bugfix oPDFEOF.cntCharsAfterLastEOF when no %%EOF
   2018/07/05: V0.2.5 introduced cExpandFilenameArguments; renamed option literal to literalfilenames
   2019/09/30: V0.2.6 color bugfix, thanks to Leo
+  2026/10/17: V0.2.7 added fast engine PDFiDBlockScan; added options --engine and --verifyengine
+  2026/10/17: added options --jobs, --order and --progress
+  2026/10/17: added options --scandb, --scandbhash and --scandbonly
+  2026/10/17: introduced cPDFiDResult: the XML document is only built when requested; added option --format
+  2026/10/17: disarm writes per block with the fast engine
+  2026/10/17: added option --service (client: pdfid-client.py); keywords of pdfid.ini are read once
+  2026/10/17: select expressions with keyword counts only are evaluated while scanning (cSelectExpression)
 
 Todo:
   - update XML example (entropy, EOF)
@@ -75,6 +82,16 @@ import zipfile
 import collections
 import glob
 import fnmatch
+import bisect
+import time
+import multiprocessing
+import hashlib
+import socket
+import signal
+import stat
+import base64
+import io
+import ast
 if sys.version_info[0] >= 3:
     import urllib.request as urllib23
 else:
@@ -83,6 +100,14 @@ if sys.version_info[0] >= 3:
     import configparser as ConfigParser
 else:
     import ConfigParser
+if sys.version_info[0] >= 3:
+    import socketserver as SocketServer
+else:
+    import SocketServer
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
 
 #Convert 2 Bytes If Python 3
 def C2BIP3(string):
@@ -92,9 +117,11 @@ def C2BIP3(string):
         return string
 
 class cBinaryFile:
-    def __init__(self, file):
+    def __init__(self, file, data=None):
         self.file = file
-        if file == '':
+        if data != None:
+            self.infile = io.BytesIO(data)
+        elif file == '':
             self.infile = sys.stdin
         elif file.lower().startswith('http://') or file.lower().startswith('https://'):
             try:
@@ -147,6 +174,16 @@ class cBinaryFile:
         self.ungetted = []
         return result
 
+    def block(self, size):
+        if len(self.ungetted) != 0:
+            result = bytes(bytearray(reversed(self.ungetted)))
+            self.ungetted = []
+            return result
+        inbytes = self.infile.read(size)
+        if not inbytes:
+            self.infile.close()
+        return inbytes
+
     def unget(self, byte):
         self.ungetted.append(byte)
 
@@ -238,6 +275,12 @@ class cEntropy:
         if insideStream:
             self.streamBucket[byte] += 1
 
+    def addData(self, data, insideStream):
+        histogram = ByteHistogram(data)
+        self.allBucket = list(map(operator.add, self.allBucket, histogram))
+        if insideStream:
+            self.streamBucket = list(map(operator.add, self.streamBucket, histogram))
+
     def removeInsideStream(self, byte):
         if self.streamBucket[byte] > 0:
             self.streamBucket[byte] -= 1
@@ -290,6 +333,26 @@ class cPDFEOF:
         else:
             self.token = ''
 
+    # same result as calling parse for each character: with an empty token, only %% can start %%EOF (a single % consumes the next character)
+    def parseData(self, data):
+        position = 0
+        while position < len(data):
+            if self.token == '':
+                index = data.find('%%', position)
+                if index == -1:
+                    # a % at the end of the data can be followed by % in the next data
+                    if data.endswith('%'):
+                        index = len(data) - 1
+                    else:
+                        index = len(data)
+                if self.cntEOFs > 0:
+                    self.cntCharsAfterLastEOF += index - position
+                position = index
+                if position == len(data):
+                    break
+            self.parse(data[position])
+            position += 1
+
 def FindPDFHeaderRelaxed(oBinaryFile):
     bytes = oBinaryFile.bytes(1024)
     index = ''.join([chr(byte) for byte in bytes]).find('%PDF')
@@ -320,7 +383,16 @@ def HexcodeName2String(hexcodeName):
 def SwapName(wordExact):
     return map(SwapCase, wordExact)
 
-def UpdateWords(word, wordExact, slash, words, hexcode, allNames, lastName, insideStream, oEntropy, fOut):
+# names disabled by option disarm: the case of the letters is swapped, e.g. /JavaScript -> /jAVAsCRIPT
+def DisarmWord(slash, word, wordExact):
+    if slash == '/' and '/' + word in ('/JS', '/JavaScript', '/AA', '/OpenAction', '/JBIG2Decode', '/RichMedia', '/Launch'):
+        wordExactSwapped = HexcodeName2String(SwapName(wordExact))
+        print('/%s -> /%s' % (HexcodeName2String(wordExact), wordExactSwapped))
+        return wordExactSwapped
+    else:
+        return HexcodeName2String(wordExact)
+
+def UpdateWords(word, wordExact, slash, words, hexcode, allNames, lastName, insideStream, oEntropy):
     if word != '':
         if slash + word in words:
             words[slash + word][0] += 1
@@ -340,15 +412,201 @@ def UpdateWords(word, wordExact, slash, words, hexcode, allNames, lastName, insi
                     for char in 'endstream':
                         oEntropy.removeInsideStream(ord(char))
                 insideStream = False
-        if fOut != None:
-            if slash == '/' and '/' + word in ('/JS', '/JavaScript', '/AA', '/OpenAction', '/JBIG2Decode', '/RichMedia', '/Launch'):
-                wordExactSwapped = HexcodeName2String(SwapName(wordExact))
-                fOut.write(C2BIP3(wordExactSwapped))
-                print('/%s -> /%s' % (HexcodeName2String(wordExact), wordExactSwapped))
-            else:
-                fOut.write(C2BIP3(HexcodeName2String(wordExact)))
     return ('', [], False, lastName, insideStream)
 
+def IsWordCharacter(char):
+    charUpper = char.upper()
+    return charUpper >= 'A' and charUpper <= 'Z' or charUpper >= '0' and charUpper <= '9'
+
+def IsHexCharacter(char):
+    return char >= '0' and char <= '9' or char.upper() >= 'A' and char.upper() <= 'F'
+
+# the character classes are derived from the tests of the classic engine, as these give different results for Python 2 and Python 3 (chr(0xDF).upper() is 'SS' in Python 3)
+def RegexCharacterClass(test):
+    return ''.join(['\\x%02x' % byte for byte in range(256) if test(chr(byte))])
+
+def RegexCompile(pattern, binary):
+    if binary and sys.version_info[0] > 2:
+        return re.compile(pattern.encode('latin'))
+    else:
+        return re.compile(pattern)
+
+PDFID_BLOCKSIZE = 0x100000
+WORD_CHARACTERS = RegexCharacterClass(IsWordCharacter)
+# parts of a name: #xx hexcode, # not followed by a hexcode, name characters
+oRENamePart = RegexCompile('#([%s]{2})|#|[%s]+' % (RegexCharacterClass(IsHexCharacter), WORD_CHARACTERS), False)
+
+def Bytes2String(data):
+    if sys.version_info[0] > 2:
+        return data.decode('latin')
+    else:
+        return data
+
+# a name (/ followed by name characters and #) or one of the given words (not preceded or followed by a name character)
+def RegexNameOrWords(words):
+    return RegexCompile('/[%s#]*|(?<![%s])(?:%s)(?![%s])' % (WORD_CHARACTERS, WORD_CHARACTERS, '|'.join(words), WORD_CHARACTERS), True)
+
+# a date is D: followed by 14 digits and a timezone (+, - or Z followed by HH'MM) or a character that is not a digit (see cPDFDate)
+oREDate = RegexCompile("D:([0-9]{14})(?:([-+Z][0-9]{2}'[0-9]{2})|(?=[^-+Z0-9D]))", True)
+DATE_MAXIMUM_LENGTH = 24
+
+try:
+    import numpy
+except:
+    numpy = None
+
+def ByteHistogram(data):
+    if numpy != None:
+        return numpy.bincount(numpy.frombuffer(data, dtype=numpy.uint8), minlength=256).tolist()
+    elif sys.version_info[0] > 2:
+        counter = collections.Counter(data)
+        return [counter[byte] for byte in range(256)]
+    else:
+        return [data.count(chr(byte)) for byte in range(256)]
+
+# fast engine: reads the file in blocks and finds names and keywords with regular expressions in stead of a state machine that processes one byte at a time
+# it produces the same results as the classic engine in PDFiD (keywords, hexcodes, /Colors > 2^24 and, with oEntropy, oPDFEOF and dates, the extra data)
+# with fOut, the disarmed file is written: the unchanged bytes are copied per block, only the names that are disarmed or that contain hexcodes (written as #xx with lowercase hex digits) are rewritten
+# with stop, the scan stops after a block when stop() returns True
+def PDFiDBlockScan(oBinaryFile, words, allNames, oCVE_2009_3459, oEntropy=None, oPDFEOF=None, dates=None, fOut=None, stop=None):
+    keywordsWithoutSlash = [re.escape(keyword) for keyword in words if keyword != '' and not keyword.startswith('/') and all(map(IsWordCharacter, keyword))]
+    oRENameOrKeyword = RegexNameOrWords(keywordsWithoutSlash + ['(?!)'])
+    # after /Colors, numbers are also needed to check CVE-2009-3459
+    oRENameOrKeywordOrNumber = RegexNameOrWords(keywordsWithoutSlash + ['[0-9]+'])
+    nameCharacters = set([C2BIP3(chr(byte)) for byte in range(256) if IsWordCharacter(chr(byte)) or chr(byte) in '/#'])
+    slash = C2BIP3('/')
+    dateStart = C2BIP3('D:')
+    lastName = ''
+    insideStream = False
+    data = C2BIP3('')
+    eof = False
+    while not eof:
+        block = oBinaryFile.block(PDFID_BLOCKSIZE)
+        eof = not block
+        data += block
+        # name characters at the end of the block can be part of a name or word that continues in the next block, and so can a date
+        end = len(data)
+        if not eof:
+            if dates != None:
+                end = max(0, end - DATE_MAXIMUM_LENGTH)
+            while end > 0 and data[end - 1:end] in nameCharacters:
+                end -= 1
+            while dates != None and end > 0 and data.rfind(dateStart, max(0, end - DATE_MAXIMUM_LENGTH), end) != -1:
+                end = data.rfind(dateStart, max(0, end - DATE_MAXIMUM_LENGTH), end)
+                while end > 0 and data[end - 1:end] in nameCharacters:
+                    end -= 1
+        lastNameBlock = lastName
+        namePositions = []
+        names = []
+        hexcodeDs = set()
+        streams = []
+        patches = []
+        streamStart = 0
+        position = 0
+        while True:
+            if lastName == '/Colors':
+                oMatch = oRENameOrKeywordOrNumber.search(data, position, end)
+            else:
+                oMatch = oRENameOrKeyword.search(data, position, end)
+            if oMatch == None:
+                break
+            position = oMatch.end()
+            # the classic engine only checks /Colors when a word is terminated by a character, not by a # or by the end of the file
+            terminatedByCharacter = oMatch.end() < len(data)
+            match = oMatch.group()
+            if match[0:1] == slash:
+                wordSlash = '/'
+                word = ''
+                wordExact = []
+                disarmed = '/'
+                hexcode = False
+                for oMatchPart in oRENamePart.finditer(Bytes2String(match[1:])):
+                    if oMatchPart.group(1) != None:
+                        word += chr(int(oMatchPart.group(1), 16))
+                        wordExact.append(int(oMatchPart.group(1), 16))
+                        hexcode = True
+                        # the classic engine does not pass the digits of a hexcode to cPDFDate
+                        if oMatchPart.group(1)[-1] == 'D':
+                            hexcodeDs.add(oMatch.start() + 1 + oMatchPart.end() - 1)
+                    elif oMatchPart.group() == '#':
+                        if word != '':
+                            namePositions.append(oMatch.start() + 1 + oMatchPart.start())
+                            names.append('/' + word)
+                        if fOut != None:
+                            disarmed += DisarmWord('/', word, wordExact) + '#'
+                        (word, wordExact, hexcode, lastName, insideStream) = UpdateWords(word, wordExact, '/', words, hexcode, allNames, lastName, insideStream, None)
+                    else:
+                        word += oMatchPart.group()
+                        wordExact.append(oMatchPart.group())
+                if word != '':
+                    namePositions.append(oMatch.end())
+                    names.append('/' + word)
+                if fOut != None:
+                    disarmed = C2BIP3(disarmed + DisarmWord('/', word, wordExact))
+                    if disarmed != match:
+                        patches.append((oMatch.start(), oMatch.end(), disarmed))
+            else:
+                wordSlash = ''
+                word = Bytes2String(match)
+                hexcode = False
+            if terminatedByCharacter:
+                oCVE_2009_3459.Check(lastName, word)
+            insideStreamBefore = insideStream
+            (word, wordExact, hexcode, lastName, insideStream) = UpdateWords(word, [], wordSlash, words, hexcode, allNames, lastName, insideStream, None)
+            if insideStream != insideStreamBefore:
+                if insideStream:
+                    streamStart = oMatch.end()
+                else:
+                    # the bytes of endstream are not counted inside the stream (cEntropy.removeInsideStream)
+                    streams.append((streamStart, oMatch.start()))
+        if insideStream:
+            streams.append((streamStart, end))
+
+        if oEntropy != None:
+            dataOutsideStreams = []
+            dataInsideStreams = []
+            position = 0
+            for streamStart, streamEnd in streams:
+                dataOutsideStreams.append(data[position:streamStart])
+                dataInsideStreams.append(data[streamStart:streamEnd])
+                position = streamEnd
+            dataOutsideStreams.append(data[position:end])
+            oEntropy.addData(C2BIP3('').join(dataOutsideStreams), False)
+            oEntropy.addData(C2BIP3('').join(dataInsideStreams), True)
+
+        if oPDFEOF != None:
+            oPDFEOF.parseData(Bytes2String(data[:end]))
+
+        if fOut != None:
+            position = 0
+            for patchStart, patchEnd, patch in patches:
+                fOut.write(data[position:patchStart])
+                fOut.write(patch)
+                position = patchEnd
+            fOut.write(data[position:end])
+
+        if dates != None:
+            for oMatch in oREDate.finditer(data, 0, end):
+                if oMatch.start() in hexcodeDs:
+                    continue
+                # the date is complete with the last digit of the timezone, or with the character following the date
+                if oMatch.group(2) == None:
+                    date = 'D:' + Bytes2String(oMatch.group(1))
+                    position = oMatch.end()
+                else:
+                    date = 'D:' + Bytes2String(oMatch.group(1) + oMatch.group(2))
+                    position = oMatch.end() - 1
+                index = bisect.bisect_right(namePositions, position)
+                if index == 0:
+                    dates.append([date, lastNameBlock])
+                else:
+                    dates.append([date, names[index - 1]])
+
+        data = data[end:]
+
+        if stop != None and stop():
+            return
+
 class cCVE_2009_3459:
     def __init__(self):
         self.count = 0
@@ -375,7 +633,167 @@ def ParseINIFile():
                 keywords.append(key)
     return keywords
 
-def PDFiD(file, allNames=False, extraData=False, disarm=False, force=False):
+# result of PDFiDResult: a compact record, the XML document is only built when requested (method XMLDoc)
+class cPDFiDResult(object):
+    __slots__ = ['version', 'filename', 'errorOccured', 'errorMessage', 'isPDF', 'header', 'entropy', 'countEOF', 'countCharsAfterLastEOF', 'keywords', 'dates']
+
+    def __init__(self, filename, version=__version__):
+        self.version = version
+        self.filename = filename
+        self.errorOccured = False
+        self.errorMessage = ''
+        self.isPDF = None
+        self.header = None
+        self.entropy = None
+        self.countEOF = None
+        self.countCharsAfterLastEOF = None
+        # keywords is a list of [name, count, hexcodecount] and dates is a list of [value, name], both are None when the file is not scanned (no PDF header)
+        self.keywords = None
+        self.dates = None
+
+    # the attributes of the PDFiD element, in the order of the XML document
+    def Attributes(self):
+        attributes = [('Version', self.version), ('Filename', self.filename), ('ErrorOccured', str(self.errorOccured)), ('ErrorMessage', self.errorMessage)]
+        if self.isPDF == None:
+            attributes.append(('IsPDF', ''))
+        else:
+            attributes.append(('IsPDF', str(self.isPDF)))
+        if self.header != None:
+            attributes.append(('Header', self.header))
+        if self.keywords == None:
+            return attributes
+        if self.entropy != None:
+            (countAll, entropyAll , countStream, entropyStream, countNonStream, entropyNonStream) = self.entropy
+            attributes.append(('TotalEntropy', '%f' % entropyAll))
+            attributes.append(('TotalCount', '%d' % countAll))
+            if entropyStream == None:
+                attributes.append(('StreamEntropy', 'N/A     '))
+            else:
+                attributes.append(('StreamEntropy', '%f' % entropyStream))
+            attributes.append(('StreamCount', '%d' % countStream))
+            attributes.append(('NonStreamEntropy', '%f' % entropyNonStream))
+            attributes.append(('NonStreamCount', '%d' % countNonStream))
+        else:
+            attributes.extend([(name, '') for name in ['TotalEntropy', 'TotalCount', 'StreamEntropy', 'StreamCount', 'NonStreamEntropy', 'NonStreamCount']])
+        if self.countEOF == None:
+            attributes.append(('CountEOF', ''))
+        else:
+            attributes.append(('CountEOF', '%d' % self.countEOF))
+        if self.countCharsAfterLastEOF == None:
+            attributes.append(('CountCharsAfterLastEOF', ''))
+        else:
+            attributes.append(('CountCharsAfterLastEOF', '%d' % self.countCharsAfterLastEOF))
+        return attributes
+
+    def Attribute(self, name):
+        for key, value in self.Attributes():
+            if key == name:
+                return value
+        return ''
+
+    def JSON(self):
+        return json.dumps([getattr(self, name) for name in self.__slots__])
+
+    def XMLDoc(self):
+        xmlDoc = xml.dom.minidom.getDOMImplementation().createDocument(None, 'PDFiD', None)
+        for name, value in self.Attributes():
+            XMLAddAttribute(xmlDoc, name, value)
+        if self.keywords == None:
+            return xmlDoc
+        eleKeywords = xmlDoc.createElement('Keywords')
+        xmlDoc.documentElement.appendChild(eleKeywords)
+        for name, count, hexcodeCount in self.keywords:
+            eleKeyword = xmlDoc.createElement('Keyword')
+            eleKeywords.appendChild(eleKeyword)
+            for attributeName, value in [('Name', name), ('Count', str(count)), ('HexcodeCount', str(hexcodeCount))]:
+                att = xmlDoc.createAttribute(attributeName)
+                att.nodeValue = value
+                eleKeyword.setAttributeNode(att)
+        eleDates = xmlDoc.createElement('Dates')
+        xmlDoc.documentElement.appendChild(eleDates)
+        for value, name in self.dates:
+            eleDate = xmlDoc.createElement('Date')
+            eleDates.appendChild(eleDate)
+            for attributeName, attributeValue in [('Value', value), ('Name', name)]:
+                att = xmlDoc.createAttribute(attributeName)
+                att.nodeValue = attributeValue
+                eleDate.setAttributeNode(att)
+        return xmlDoc
+
+def XMLDoc2PDFiDResult(xmlDoc):
+    oPDFiDResult = cPDFiDResult(xmlDoc.documentElement.getAttribute('Filename'), xmlDoc.documentElement.getAttribute('Version'))
+    oPDFiDResult.errorOccured = xmlDoc.documentElement.getAttribute('ErrorOccured') == 'True'
+    oPDFiDResult.errorMessage = xmlDoc.documentElement.getAttribute('ErrorMessage')
+    if xmlDoc.documentElement.getAttribute('IsPDF') != '':
+        oPDFiDResult.isPDF = xmlDoc.documentElement.getAttribute('IsPDF') == 'True'
+    if xmlDoc.documentElement.hasAttribute('Header'):
+        oPDFiDResult.header = xmlDoc.documentElement.getAttribute('Header')
+    if xmlDoc.documentElement.getElementsByTagName('Keywords') == []:
+        return oPDFiDResult
+    if xmlDoc.documentElement.getAttribute('TotalEntropy') != '':
+        if xmlDoc.documentElement.getAttribute('StreamEntropy') == 'N/A     ':
+            entropyStream = None
+        else:
+            entropyStream = float(xmlDoc.documentElement.getAttribute('StreamEntropy'))
+        oPDFiDResult.entropy = (int(xmlDoc.documentElement.getAttribute('TotalCount')), float(xmlDoc.documentElement.getAttribute('TotalEntropy')), int(xmlDoc.documentElement.getAttribute('StreamCount')), entropyStream, int(xmlDoc.documentElement.getAttribute('NonStreamCount')), float(xmlDoc.documentElement.getAttribute('NonStreamEntropy')))
+    if xmlDoc.documentElement.getAttribute('CountEOF') != '':
+        oPDFiDResult.countEOF = int(xmlDoc.documentElement.getAttribute('CountEOF'))
+    if xmlDoc.documentElement.getAttribute('CountCharsAfterLastEOF') != '':
+        oPDFiDResult.countCharsAfterLastEOF = int(xmlDoc.documentElement.getAttribute('CountCharsAfterLastEOF'))
+    oPDFiDResult.keywords = [[node.getAttribute('Name'), int(node.getAttribute('Count')), int(node.getAttribute('HexcodeCount'))] for node in xmlDoc.documentElement.getElementsByTagName('Keywords')[0].childNodes]
+    oPDFiDResult.dates = [[node.getAttribute('Value'), node.getAttribute('Name')] for node in xmlDoc.documentElement.getElementsByTagName('Dates')[0].childNodes]
+    return oPDFiDResult
+
+def JSON2PDFiDResult(data):
+    oPDFiDResult = cPDFiDResult('')
+    for name, value in zip(cPDFiDResult.__slots__, json.loads(data)):
+        setattr(oPDFiDResult, name, value)
+    return oPDFiDResult
+
+# the functions that take an XML document (PDFiD2String, PDFiD2JSON, cPDFiD) also accept a cPDFiDResult
+def PDFiDResultOrXMLDoc(result):
+    if isinstance(result, cPDFiDResult):
+        return result
+    return XMLDoc2PDFiDResult(result)
+
+def PDFiDKeywords():
+    keywords = ['obj',
+                'endobj',
+                'stream',
+                'endstream',
+                'xref',
+                'trailer',
+                'startxref',
+                '/Page',
+                '/Encrypt',
+                '/ObjStm',
+                '/JS',
+                '/JavaScript',
+                '/AA',
+                '/OpenAction',
+                '/AcroForm',
+                '/JBIG2Decode',
+                '/RichMedia',
+                '/Launch',
+                '/EmbeddedFile',
+                '/XFA',
+               ]
+    for extrakeyword in ParseINIFileCached():
+        if not extrakeyword in keywords:
+            keywords.append(extrakeyword)
+    return keywords
+
+keywordsINI = None
+
+# pdfid.ini is read once per process
+def ParseINIFileCached():
+    global keywordsINI
+
+    if keywordsINI == None:
+        keywordsINI = ParseINIFile()
+    return keywordsINI
+
+def PDFiD(file, allNames=False, extraData=False, disarm=False, force=False, engine='classic'):
     """Example of XML output:
     <PDFiD ErrorOccured="False" ErrorMessage="" Filename="test.pdf" Header="%PDF-1.1" IsPDF="True" Version="0.0.4" Entropy="4.28">
             <Keywords>
@@ -400,54 +818,29 @@ def PDFiD(file, allNames=False, extraData=False, disarm=False, force=False):
     </PDFiD>
     """
 
+    return PDFiDResult(file, allNames, extraData, disarm, force, engine).XMLDoc()
+
+# with data (bytes), the content of the file is data and file is only used as filename in the result
+def PDFiDResult(file, allNames=False, extraData=False, disarm=False, force=False, engine='classic', data=None):
     word = ''
     wordExact = []
     hexcode = False
     lastName = ''
     insideStream = False
-    keywords = ['obj',
-                'endobj',
-                'stream',
-                'endstream',
-                'xref',
-                'trailer',
-                'startxref',
-                '/Page',
-                '/Encrypt',
-                '/ObjStm',
-                '/JS',
-                '/JavaScript',
-                '/AA',
-                '/OpenAction',
-                '/AcroForm',
-                '/JBIG2Decode',
-                '/RichMedia',
-                '/Launch',
-                '/EmbeddedFile',
-                '/XFA',
-               ]
+    keywords = PDFiDKeywords()
     words = {}
     dates = []
-    for extrakeyword in ParseINIFile():
-        if not extrakeyword in keywords:
-            keywords.append(extrakeyword)
     for keyword in keywords:
         words[keyword] = [0, 0]
     slash = ''
-    xmlDoc = xml.dom.minidom.getDOMImplementation().createDocument(None, 'PDFiD', None)
-    XMLAddAttribute(xmlDoc, 'Version', __version__)
-    XMLAddAttribute(xmlDoc, 'Filename', file)
-    attErrorOccured = XMLAddAttribute(xmlDoc, 'ErrorOccured', 'False')
-    attErrorMessage = XMLAddAttribute(xmlDoc, 'ErrorMessage', '')
+    oPDFiDResult = cPDFiDResult(file)
 
     oPDFDate = None
     oEntropy = None
     oPDFEOF = None
     oCVE_2009_3459 = cCVE_2009_3459()
     try:
-        attIsPDF = xmlDoc.createAttribute('IsPDF')
-        xmlDoc.documentElement.setAttributeNode(attIsPDF)
-        oBinaryFile = cBinaryFile(file)
+        oBinaryFile = cBinaryFile(file, data)
         if extraData:
             oPDFDate = cPDFDate()
             oEntropy = cEntropy()
@@ -456,26 +849,31 @@ def PDFiD(file, allNames=False, extraData=False, disarm=False, force=False):
         if disarm:
             (pathfile, extension) = os.path.splitext(file)
             fOut = open(pathfile + '.disarmed' + extension, 'wb')
-            for byteHeader in bytesHeader:
-                fOut.write(C2BIP3(chr(byteHeader)))
+            fOut.write(bytes(bytearray(bytesHeader)))
         else:
             fOut = None
         if oEntropy != None:
             for byteHeader in bytesHeader:
                 oEntropy.add(byteHeader, insideStream)
         if pdfHeader == None and not force:
-            attIsPDF.nodeValue = 'False'
-            return xmlDoc
+            oPDFiDResult.isPDF = False
+            return oPDFiDResult
         else:
             if pdfHeader == None:
-                attIsPDF.nodeValue = 'False'
+                oPDFiDResult.isPDF = False
                 pdfHeader = ''
             else:
-                attIsPDF.nodeValue = 'True'
-            att = xmlDoc.createAttribute('Header')
-            att.nodeValue = repr(pdfHeader[0:10]).strip("'")
-            xmlDoc.documentElement.setAttributeNode(att)
-        byte = oBinaryFile.byte()
+                oPDFiDResult.isPDF = True
+            oPDFiDResult.header = repr(pdfHeader[0:10]).strip("'")
+        # disarm is always done by the fast engine: it copies the file per block and only rewrites the names to disarm
+        if engine == 'fast' or disarm:
+            if extraData:
+                PDFiDBlockScan(oBinaryFile, words, allNames, oCVE_2009_3459, oEntropy, oPDFEOF, dates, fOut)
+            else:
+                PDFiDBlockScan(oBinaryFile, words, allNames, oCVE_2009_3459, fOut=fOut)
+            byte = None
+        else:
+            byte = oBinaryFile.byte()
         while byte != None:
             char = chr(byte)
             charUpper = char.upper()
@@ -499,24 +897,18 @@ def PDFiD(file, allNames=False, extraData=False, disarm=False, force=False):
                     else:
                         oBinaryFile.unget(d2)
                         oBinaryFile.unget(d1)
-                        (word, wordExact, hexcode, lastName, insideStream) = UpdateWords(word, wordExact, slash, words, hexcode, allNames, lastName, insideStream, oEntropy, fOut)
-                        if disarm:
-                            fOut.write(C2BIP3(char))
+                        (word, wordExact, hexcode, lastName, insideStream) = UpdateWords(word, wordExact, slash, words, hexcode, allNames, lastName, insideStream, oEntropy)
                 else:
                     oBinaryFile.unget(d1)
-                    (word, wordExact, hexcode, lastName, insideStream) = UpdateWords(word, wordExact, slash, words, hexcode, allNames, lastName, insideStream, oEntropy, fOut)
-                    if disarm:
-                        fOut.write(C2BIP3(char))
+                    (word, wordExact, hexcode, lastName, insideStream) = UpdateWords(word, wordExact, slash, words, hexcode, allNames, lastName, insideStream, oEntropy)
             else:
                 oCVE_2009_3459.Check(lastName, word)
 
-                (word, wordExact, hexcode, lastName, insideStream) = UpdateWords(word, wordExact, slash, words, hexcode, allNames, lastName, insideStream, oEntropy, fOut)
+                (word, wordExact, hexcode, lastName, insideStream) = UpdateWords(word, wordExact, slash, words, hexcode, allNames, lastName, insideStream, oEntropy)
                 if char == '/':
                     slash = '/'
                 else:
                     slash = ''
-                if disarm:
-                    fOut.write(C2BIP3(char))
 
             if oPDFDate != None and oPDFDate.parse(char) != None:
                 dates.append([oPDFDate.date, lastName])
@@ -528,7 +920,7 @@ def PDFiD(file, allNames=False, extraData=False, disarm=False, force=False):
                 oPDFEOF.parse(char)
 
             byte = oBinaryFile.byte()
-        (word, wordExact, hexcode, lastName, insideStream) = UpdateWords(word, wordExact, slash, words, hexcode, allNames, lastName, insideStream, oEntropy, fOut)
+        (word, wordExact, hexcode, lastName, insideStream) = UpdateWords(word, wordExact, slash, words, hexcode, allNames, lastName, insideStream, oEntropy)
 
         # check to see if file ended with %%EOF.  If so, we can reset charsAfterLastEOF and add one to EOF count.  This is never performed in
         # the parse function because it never gets called due to hitting the end of file.
@@ -541,137 +933,81 @@ def PDFiD(file, allNames=False, extraData=False, disarm=False, force=False):
     except SystemExit:
         sys.exit()
     except:
-        attErrorOccured.nodeValue = 'True'
-        attErrorMessage.nodeValue = traceback.format_exc()
+        oPDFiDResult.errorOccured = True
+        oPDFiDResult.errorMessage = traceback.format_exc()
 
     if disarm:
         fOut.close()
 
-    attEntropyAll = xmlDoc.createAttribute('TotalEntropy')
-    xmlDoc.documentElement.setAttributeNode(attEntropyAll)
-    attCountAll = xmlDoc.createAttribute('TotalCount')
-    xmlDoc.documentElement.setAttributeNode(attCountAll)
-    attEntropyStream = xmlDoc.createAttribute('StreamEntropy')
-    xmlDoc.documentElement.setAttributeNode(attEntropyStream)
-    attCountStream = xmlDoc.createAttribute('StreamCount')
-    xmlDoc.documentElement.setAttributeNode(attCountStream)
-    attEntropyNonStream = xmlDoc.createAttribute('NonStreamEntropy')
-    xmlDoc.documentElement.setAttributeNode(attEntropyNonStream)
-    attCountNonStream = xmlDoc.createAttribute('NonStreamCount')
-    xmlDoc.documentElement.setAttributeNode(attCountNonStream)
     if oEntropy != None:
-        (countAll, entropyAll , countStream, entropyStream, countNonStream, entropyNonStream) = oEntropy.calc()
-        attEntropyAll.nodeValue = '%f' % entropyAll
-        attCountAll.nodeValue = '%d' % countAll
-        if entropyStream == None:
-            attEntropyStream.nodeValue = 'N/A     '
-        else:
-            attEntropyStream.nodeValue = '%f' % entropyStream
-        attCountStream.nodeValue = '%d' % countStream
-        attEntropyNonStream.nodeValue = '%f' % entropyNonStream
-        attCountNonStream.nodeValue = '%d' % countNonStream
-    else:
-        attEntropyAll.nodeValue = ''
-        attCountAll.nodeValue = ''
-        attEntropyStream.nodeValue = ''
-        attCountStream.nodeValue = ''
-        attEntropyNonStream.nodeValue = ''
-        attCountNonStream.nodeValue = ''
-    attCountEOF = xmlDoc.createAttribute('CountEOF')
-    xmlDoc.documentElement.setAttributeNode(attCountEOF)
-    attCountCharsAfterLastEOF = xmlDoc.createAttribute('CountCharsAfterLastEOF')
-    xmlDoc.documentElement.setAttributeNode(attCountCharsAfterLastEOF)
+        oPDFiDResult.entropy = oEntropy.calc()
     if oPDFEOF != None:
-        attCountEOF.nodeValue = '%d' % oPDFEOF.cntEOFs
+        oPDFiDResult.countEOF = oPDFEOF.cntEOFs
         if oPDFEOF.cntEOFs > 0:
-            attCountCharsAfterLastEOF.nodeValue = '%d' % oPDFEOF.cntCharsAfterLastEOF
-        else:
-            attCountCharsAfterLastEOF.nodeValue = ''
-    else:
-        attCountEOF.nodeValue = ''
-        attCountCharsAfterLastEOF.nodeValue = ''
+            oPDFiDResult.countCharsAfterLastEOF = oPDFEOF.cntCharsAfterLastEOF
 
-    eleKeywords = xmlDoc.createElement('Keywords')
-    xmlDoc.documentElement.appendChild(eleKeywords)
-    for keyword in keywords:
-        eleKeyword = xmlDoc.createElement('Keyword')
-        eleKeywords.appendChild(eleKeyword)
-        att = xmlDoc.createAttribute('Name')
-        att.nodeValue = keyword
-        eleKeyword.setAttributeNode(att)
-        att = xmlDoc.createAttribute('Count')
-        att.nodeValue = str(words[keyword][0])
-        eleKeyword.setAttributeNode(att)
-        att = xmlDoc.createAttribute('HexcodeCount')
-        att.nodeValue = str(words[keyword][1])
-        eleKeyword.setAttributeNode(att)
-    eleKeyword = xmlDoc.createElement('Keyword')
-    eleKeywords.appendChild(eleKeyword)
-    att = xmlDoc.createAttribute('Name')
-    att.nodeValue = '/Colors > 2^24'
-    eleKeyword.setAttributeNode(att)
-    att = xmlDoc.createAttribute('Count')
-    att.nodeValue = str(oCVE_2009_3459.count)
-    eleKeyword.setAttributeNode(att)
-    att = xmlDoc.createAttribute('HexcodeCount')
-    att.nodeValue = str(0)
-    eleKeyword.setAttributeNode(att)
+    oPDFiDResult.keywords = [[keyword, words[keyword][0], words[keyword][1]] for keyword in keywords]
+    oPDFiDResult.keywords.append(['/Colors > 2^24', oCVE_2009_3459.count, 0])
     if allNames:
-        keys = sorted(words.keys())
-        for word in keys:
+        for word in sorted(words.keys()):
             if not word in keywords:
-                eleKeyword = xmlDoc.createElement('Keyword')
-                eleKeywords.appendChild(eleKeyword)
-                att = xmlDoc.createAttribute('Name')
-                att.nodeValue = word
-                eleKeyword.setAttributeNode(att)
-                att = xmlDoc.createAttribute('Count')
-                att.nodeValue = str(words[word][0])
-                eleKeyword.setAttributeNode(att)
-                att = xmlDoc.createAttribute('HexcodeCount')
-                att.nodeValue = str(words[word][1])
-                eleKeyword.setAttributeNode(att)
-    eleDates = xmlDoc.createElement('Dates')
-    xmlDoc.documentElement.appendChild(eleDates)
+                oPDFiDResult.keywords.append([word, words[word][0], words[word][1]])
     dates.sort(key=lambda x: x[0])
-    for date in dates:
-        eleDate = xmlDoc.createElement('Date')
-        eleDates.appendChild(eleDate)
-        att = xmlDoc.createAttribute('Value')
-        att.nodeValue = date[0]
-        eleDate.setAttributeNode(att)
-        att = xmlDoc.createAttribute('Name')
-        att.nodeValue = date[1]
-        eleDate.setAttributeNode(att)
-    return xmlDoc
+    oPDFiDResult.dates = dates
+    return oPDFiDResult
 
 def PDFiD2String(xmlDoc, nozero, force):
-    result = 'PDFiD %s %s\n' % (xmlDoc.documentElement.getAttribute('Version'), xmlDoc.documentElement.getAttribute('Filename'))
-    if xmlDoc.documentElement.getAttribute('ErrorOccured') == 'True':
-        return result + '***Error occured***\n%s\n' % xmlDoc.documentElement.getAttribute('ErrorMessage')
-    if not force and xmlDoc.documentElement.getAttribute('IsPDF') == 'False':
+    oPDFiDResult = PDFiDResultOrXMLDoc(xmlDoc)
+    result = 'PDFiD %s %s\n' % (oPDFiDResult.version, oPDFiDResult.filename)
+    if oPDFiDResult.errorOccured:
+        return result + '***Error occured***\n%s\n' % oPDFiDResult.errorMessage
+    if not force and oPDFiDResult.isPDF == False:
         return result + ' Not a PDF document\n'
-    result += ' PDF Header: %s\n' % xmlDoc.documentElement.getAttribute('Header')
-    for node in xmlDoc.documentElement.getElementsByTagName('Keywords')[0].childNodes:
-        if not nozero or nozero and int(node.getAttribute('Count')) > 0:
-            result += ' %-16s %7d' % (node.getAttribute('Name'), int(node.getAttribute('Count')))
-            if int(node.getAttribute('HexcodeCount')) > 0:
-                result += '(%d)' % int(node.getAttribute('HexcodeCount'))
+    result += ' PDF Header: %s\n' % oPDFiDResult.Attribute('Header')
+    for name, count, hexcodeCount in oPDFiDResult.keywords:
+        if not nozero or nozero and count > 0:
+            result += ' %-16s %7d' % (name, count)
+            if hexcodeCount > 0:
+                result += '(%d)' % hexcodeCount
             result += '\n'
-    if xmlDoc.documentElement.getAttribute('CountEOF') != '':
-        result += ' %-16s %7d\n' % ('%%EOF', int(xmlDoc.documentElement.getAttribute('CountEOF')))
-    if xmlDoc.documentElement.getAttribute('CountCharsAfterLastEOF') != '':
-        result += ' %-16s %7d\n' % ('After last %%EOF', int(xmlDoc.documentElement.getAttribute('CountCharsAfterLastEOF')))
-    for node in xmlDoc.documentElement.getElementsByTagName('Dates')[0].childNodes:
-        result += ' %-23s %s\n' % (node.getAttribute('Value'), node.getAttribute('Name'))
-    if xmlDoc.documentElement.getAttribute('TotalEntropy') != '':
-        result += ' Total entropy:           %s (%10s bytes)\n' % (xmlDoc.documentElement.getAttribute('TotalEntropy'), xmlDoc.documentElement.getAttribute('TotalCount'))
-    if xmlDoc.documentElement.getAttribute('StreamEntropy') != '':
-        result += ' Entropy inside streams:  %s (%10s bytes)\n' % (xmlDoc.documentElement.getAttribute('StreamEntropy'), xmlDoc.documentElement.getAttribute('StreamCount'))
-    if xmlDoc.documentElement.getAttribute('NonStreamEntropy') != '':
-        result += ' Entropy outside streams: %s (%10s bytes)\n' % (xmlDoc.documentElement.getAttribute('NonStreamEntropy'), xmlDoc.documentElement.getAttribute('NonStreamCount'))
+    if oPDFiDResult.countEOF != None:
+        result += ' %-16s %7d\n' % ('%%EOF', oPDFiDResult.countEOF)
+    if oPDFiDResult.countCharsAfterLastEOF != None:
+        result += ' %-16s %7d\n' % ('After last %%EOF', oPDFiDResult.countCharsAfterLastEOF)
+    for value, name in oPDFiDResult.dates:
+        result += ' %-23s %s\n' % (value, name)
+    if oPDFiDResult.entropy != None:
+        attributes = dict(oPDFiDResult.Attributes())
+        result += ' Total entropy:           %s (%10s bytes)\n' % (attributes['TotalEntropy'], attributes['TotalCount'])
+        result += ' Entropy inside streams:  %s (%10s bytes)\n' % (attributes['StreamEntropy'], attributes['StreamCount'])
+        result += ' Entropy outside streams: %s (%10s bytes)\n' % (attributes['NonStreamEntropy'], attributes['NonStreamCount'])
     return result
 
+# attributes of cPDFiD for the keywords
+KEYWORD_ATTRIBUTES = [
+    ('obj', 'obj'),
+    ('endobj', 'endobj'),
+    ('stream', 'stream'),
+    ('endstream', 'endstream'),
+    ('xref', 'xref'),
+    ('trailer', 'trailer'),
+    ('startxref', 'startxref'),
+    ('page', '/Page'),
+    ('encrypt', '/Encrypt'),
+    ('objstm', '/ObjStm'),
+    ('js', '/JS'),
+    ('javascript', '/JavaScript'),
+    ('aa', '/AA'),
+    ('openaction', '/OpenAction'),
+    ('acroform', '/AcroForm'),
+    ('jbig2decode', '/JBIG2Decode'),
+    ('richmedia', '/RichMedia'),
+    ('launch', '/Launch'),
+    ('embeddedfile', '/EmbeddedFile'),
+    ('xfa', '/XFA'),
+    ('colors_gt_2_24', '/Colors > 2^24'),
+]
+
 class cCount():
     def __init__(self, count, hexcode):
         self.count = count
@@ -679,43 +1015,244 @@ class cCount():
 
 class cPDFiD():
     def __init__(self, xmlDoc, force):
-        self.version = xmlDoc.documentElement.getAttribute('Version')
-        self.filename = xmlDoc.documentElement.getAttribute('Filename')
-        self.errorOccured = xmlDoc.documentElement.getAttribute('ErrorOccured') == 'True'
-        self.errorMessage = xmlDoc.documentElement.getAttribute('ErrorMessage')
+        oPDFiDResult = PDFiDResultOrXMLDoc(xmlDoc)
+        self.version = oPDFiDResult.version
+        self.filename = oPDFiDResult.filename
+        self.errorOccured = oPDFiDResult.errorOccured
+        self.errorMessage = oPDFiDResult.errorMessage
         self.isPDF = None
         if self.errorOccured:
             return
-        self.isPDF = xmlDoc.documentElement.getAttribute('IsPDF') == 'True'
+        self.isPDF = oPDFiDResult.isPDF == True
         if not force and not self.isPDF:
             return
-        self.header = xmlDoc.documentElement.getAttribute('Header')
+        self.header = oPDFiDResult.Attribute('Header')
         self.keywords = {}
-        for node in xmlDoc.documentElement.getElementsByTagName('Keywords')[0].childNodes:
-            self.keywords[node.getAttribute('Name')] = cCount(int(node.getAttribute('Count')), int(node.getAttribute('HexcodeCount')))
-        self.obj = self.keywords['obj']
-        self.endobj = self.keywords['endobj']
-        self.stream = self.keywords['stream']
-        self.endstream = self.keywords['endstream']
-        self.xref = self.keywords['xref']
-        self.trailer = self.keywords['trailer']
-        self.startxref = self.keywords['startxref']
-        self.page = self.keywords['/Page']
-        self.encrypt = self.keywords['/Encrypt']
-        self.objstm = self.keywords['/ObjStm']
-        self.js = self.keywords['/JS']
-        self.javascript = self.keywords['/JavaScript']
-        self.aa = self.keywords['/AA']
-        self.openaction = self.keywords['/OpenAction']
-        self.acroform = self.keywords['/AcroForm']
-        self.jbig2decode = self.keywords['/JBIG2Decode']
-        self.richmedia = self.keywords['/RichMedia']
-        self.launch = self.keywords['/Launch']
-        self.embeddedfile = self.keywords['/EmbeddedFile']
-        self.xfa = self.keywords['/XFA']
-        self.colors_gt_2_24 = self.keywords['/Colors > 2^24']
+        for name, count, hexcodeCount in oPDFiDResult.keywords:
+            self.keywords[name] = cCount(count, hexcodeCount)
+        for attribute, keyword in KEYWORD_ATTRIBUTES:
+            setattr(self, attribute, self.keywords[keyword])
+
+INFINITY = float('inf')
+
+# a select expression that only uses keyword counts (pdf.js.count, pdf.keywords['/JS'].hexcode, numbers, comparisons, +, -, *, and, or, not)
+# can be evaluated during the scan: a count can only increase, so the value of a count is an interval [count so far, infinity]
+# the expression is evaluated with intervals, and the scan can stop when the result is True or False for all possible final counts
+class cSelectExpression():
+    def __init__(self, expression):
+        self.keywords = set()
+        self.keywordsAll = set(PDFiDKeywords() + ['/Colors > 2^24'])
+        self.attributes = dict(KEYWORD_ATTRIBUTES)
+        self.tree = ast.parse(expression.strip(), mode='eval').body
+        self.Keyword(self.tree, True)
+
+    # raises an exception for an expression that is not supported, returns the keyword for pdf.keyword and pdf.keywords['keyword']
+    def Keyword(self, node, boolean):
+        if isinstance(node, ast.BoolOp) or isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            if not boolean:
+                raise Exception('Unsupported select expression')
+            if isinstance(node, ast.BoolOp):
+                children = node.values
+            else:
+                children = [node.operand]
+            for child in children:
+                self.Keyword(child, True)
+        elif isinstance(node, ast.Compare):
+            if not boolean:
+                raise Exception('Unsupported select expression')
+            for child in [node.left] + node.comparators:
+                self.Keyword(child, False)
+            for op in node.ops:
+                if not type(op) in [ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq]:
+                    raise Exception('Unsupported select expression')
+        elif isinstance(node, ast.BinOp) and type(node.op) in [ast.Add, ast.Sub, ast.Mult] or isinstance(node, ast.UnaryOp) and type(node.op) in [ast.USub, ast.UAdd]:
+            if isinstance(node, ast.BinOp):
+                children = [node.left, node.right]
+            else:
+                children = [node.operand]
+            for child in children:
+                self.Keyword(child, False)
+        elif SelectNumber(node) != None:
+            pass
+        elif isinstance(node, ast.Attribute) and node.attr in ['count', 'hexcode']:
+            keyword = None
+            if isinstance(node.value, ast.Attribute) and isinstance(node.value.value, ast.Name) and node.value.value.id == 'pdf':
+                keyword = self.attributes.get(node.value.attr, None)
+            elif isinstance(node.value, ast.Subscript) and isinstance(node.value.value, ast.Attribute) and node.value.value.attr == 'keywords' and isinstance(node.value.value.value, ast.Name) and node.value.value.value.id == 'pdf':
+                keyword = SelectString(node.value.slice)
+            if not keyword in self.keywordsAll:
+                raise Exception('Unsupported select expression')
+            self.keywords.add(keyword)
+            return keyword
+        else:
+            raise Exception('Unsupported select expression')
+
+    # returns True, False or None (undecided) for a boolean node, and an interval (minimum, maximum) for a number
+    def Evaluate(self, node, counts, final):
+        if isinstance(node, ast.BoolOp):
+            results = [self.Boolean(child, counts, final) for child in node.values]
+            if isinstance(node.op, ast.And):
+                if False in results:
+                    return False
+                return IFF(None in results, None, True)
+            else:
+                if True in results:
+                    return True
+                return IFF(None in results, None, False)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            result = self.Boolean(node.operand, counts, final)
+            if result == None:
+                return None
+            return not result
+        elif isinstance(node, ast.Compare):
+            left = self.Evaluate(node.left, counts, final)
+            results = []
+            for op, comparator in zip(node.ops, node.comparators):
+                right = self.Evaluate(comparator, counts, final)
+                results.append(CompareIntervals(type(op), left, right))
+                left = right
+            if False in results:
+                return False
+            return IFF(None in results, None, True)
+        elif isinstance(node, ast.BinOp):
+            left = self.Evaluate(node.left, counts, final)
+            right = self.Evaluate(node.right, counts, final)
+            if isinstance(node.op, ast.Add):
+                return (left[0] + right[0], left[1] + right[1])
+            elif isinstance(node.op, ast.Sub):
+                return (left[0] - right[1], left[1] - right[0])
+            else:
+                # 0 * infinity is nan: the product is 0 when one of the counts is 0
+                products = [IFF(x * y != x * y, 0, x * y) for x in left for y in right]
+                return (min(products), max(products))
+        elif isinstance(node, ast.UnaryOp):
+            operand = self.Evaluate(node.operand, counts, final)
+            if isinstance(node.op, ast.USub):
+                return (-operand[1], -operand[0])
+            return operand
+        elif isinstance(node, ast.Attribute):
+            keyword = self.Keyword(node, False)
+            count = counts[keyword][IFF(node.attr == 'count', 0, 1)]
+            return (count, IFF(final, count, INFINITY))
+        else:
+            number = SelectNumber(node)
+            return (number, number)
+
+    def Boolean(self, node, counts, final):
+        result = self.Evaluate(node, counts, final)
+        if isinstance(result, tuple):
+            # a number: True when it is not 0
+            if result[0] > 0 or result[1] < 0:
+                return True
+            if result == (0, 0):
+                return False
+            return None
+        return result
+
+    def Result(self, counts, final):
+        return self.Boolean(self.tree, counts, final)
+
+def IFF(expression, valueTrue, valueFalse):
+    if expression:
+        return valueTrue
+    else:
+        return valueFalse
+
+def SelectNumber(node):
+    if sys.version_info >= (3, 8):
+        if isinstance(node, ast.Constant) and type(node.value) in [int, float]:
+            return node.value
+    elif isinstance(node, ast.Num):
+        return node.n
+    return None
+
+def SelectString(node):
+    if sys.version_info < (3, 9) and isinstance(node, ast.Index):
+        node = node.value
+    if sys.version_info >= (3, 8):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value
+    elif isinstance(node, ast.Str):
+        return node.s
+    return None
+
+# True, False or None (undecided) for interval comparisons
+def CompareIntervals(op, left, right):
+    if op in [ast.Lt, ast.LtE]:
+        return CompareIntervals(IFF(op == ast.Lt, ast.Gt, ast.GtE), right, left)
+    if op == ast.Gt:
+        if left[0] > right[1]:
+            return True
+        if left[1] <= right[0]:
+            return False
+    elif op == ast.GtE:
+        if left[0] >= right[1]:
+            return True
+        if left[1] < right[0]:
+            return False
+    else:
+        if left[0] == left[1] == right[0] == right[1]:
+            equal = True
+        elif left[1] < right[0] or right[1] < left[0]:
+            equal = False
+        else:
+            return None
+        return IFF(op == ast.Eq, equal, not equal)
+    return None
+
+selectExpressions = {}
+
+def SelectExpression(expression):
+    if not expression in selectExpressions:
+        try:
+            selectExpressions[expression] = cSelectExpression(expression)
+        except:
+            selectExpressions[expression] = None
+    return selectExpressions[expression]
+
+# fast path for option select: only the keywords of the select expression are counted, and the scan stops as soon as the result is known
+# returns True or False, or None when the full scan is needed to evaluate the expression (error, ...)
+def PDFiDSelect(filename, options, oSelectExpression):
+    try:
+        oBinaryFile = cBinaryFile(filename)
+        (bytesHeader, pdfHeader) = FindPDFHeaderRelaxed(oBinaryFile)
+        if pdfHeader == None and not options.force:
+            oBinaryFile.infile.close()
+            if hasattr(oBinaryFile, 'zipfile'):
+                oBinaryFile.zipfile.close()
+            return False
+        words = dict([[keyword, [0, 0]] for keyword in oSelectExpression.keywords if keyword != '/Colors > 2^24'])
+        oCVE_2009_3459 = cCVE_2009_3459()
+        results = []
+
+        def Counts():
+            counts = dict(words)
+            counts['/Colors > 2^24'] = [oCVE_2009_3459.count, 0]
+            return counts
+
+        def Stop():
+            results.append(oSelectExpression.Result(Counts(), False))
+            return results[-1] != None
+
+        PDFiDBlockScan(oBinaryFile, words, False, oCVE_2009_3459, stop=Stop)
+        oBinaryFile.infile.close()
+        if hasattr(oBinaryFile, 'zipfile'):
+            oBinaryFile.zipfile.close()
+        if results[-1] != None:
+            return results[-1]
+        return oSelectExpression.Result(Counts(), True)
+    except SystemExit:
+        raise
+    except:
+        return None
+
+# list of output lines when a scan worker process is capturing the output of ProcessFile
+printCapture = None
 
 def Print(lines, options):
+    if printCapture != None:
+        printCapture.append(lines)
+        return
     print(lines)
     filename = None
     if options.scan:
@@ -738,13 +1275,143 @@ def MakeCSVLine(fields, separator=';', quote='"'):
     strings = [Quote(field[1], separator, quote) for field in fields]
     return formatstring % tuple(strings)
 
-def ProcessFile(filename, options, plugins):
-    xmlDoc = PDFiD(filename, options.all, options.extra, options.disarm, options.force)
+# incremental scan database: the result of each file (cPDFiDResult in JSON) is stored with the size, the modification time and (optionally) the SHA-256 of the file
+# a stored result is only valid for the same parameters (version, options -a -e -f and the extra keywords of pdfid.ini)
+class cScanDB():
+    def __init__(self, filename, hash=False, pending=False):
+        self.hash = hash
+        if pending:
+            self.pending = []
+        else:
+            self.pending = None
+        self.uncommitted = 0
+        self.connection = sqlite3.connect(filename, timeout=60)
+        self.connection.text_factory = str
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results (path TEXT, parameters TEXT, size INTEGER, mtime REAL, sha256 TEXT, result TEXT, PRIMARY KEY (path, parameters))')
+        self.connection.commit()
+
+    def Key(self, filename):
+        oStat = os.stat(filename)
+        if self.hash:
+            oSHA256 = hashlib.sha256()
+            fIn = open(filename, 'rb')
+            try:
+                for data in iter(lambda: fIn.read(PDFID_BLOCKSIZE), b''):
+                    oSHA256.update(data)
+            finally:
+                fIn.close()
+            sha256 = oSHA256.hexdigest()
+        else:
+            sha256 = None
+        return (oStat.st_size, oStat.st_mtime, sha256)
+
+    def Lookup(self, filename, parameters, key):
+        row = self.connection.execute('SELECT size, mtime, sha256, result FROM results WHERE path = ? AND parameters = ?', (filename, parameters)).fetchone()
+        if row == None or row[0] != key[0] or row[1] != key[1]:
+            return None
+        if key[2] != None and row[2] != key[2]:
+            return None
+        return JSON2PDFiDResult(row[3])
+
+    # a worker process (option --jobs) does not write to the database: the records are returned to the main process
+    def Store(self, filename, parameters, key, oPDFiDResult):
+        if self.pending != None:
+            self.pending.append((filename, parameters, key, oPDFiDResult))
+            return
+        self.connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)', (filename, parameters, key[0], key[1], key[2], oPDFiDResult.JSON()))
+        self.uncommitted += 1
+        if self.uncommitted >= 100:
+            self.Commit()
+
+    def Pending(self):
+        pending = self.pending
+        self.pending = []
+        return pending
+
+    def Commit(self):
+        self.connection.commit()
+        self.uncommitted = 0
+
+    def Records(self, parameters):
+        for filename, result in self.connection.execute('SELECT path, result FROM results WHERE parameters = ? ORDER BY path', (parameters,)).fetchall():
+            yield filename, JSON2PDFiDResult(result)
+
+    def Close(self):
+        self.Commit()
+        self.connection.close()
+
+oScanDB = None
+
+def ScanDBParameters(options):
+    return 'version=%s all=%s extra=%s force=%s keywords=%s' % (__version__, options.all, options.extra, options.force, ','.join(ParseINIFileCached()))
+
+# unchanged files are answered from the scan database, new or changed files are parsed and stored
+def PDFiDScanDB(filename, options):
+    if oScanDB == None or options.disarm or not os.path.isfile(filename):
+        return PDFiDResult(filename, options.all, options.extra, options.disarm, options.force, options.engine)
+    parameters = ScanDBParameters(options)
+    key = oScanDB.Key(filename)
+    oPDFiDResult = oScanDB.Lookup(filename, parameters, key)
+    if oPDFiDResult != None:
+        return oPDFiDResult
+    oPDFiDResult = PDFiDResult(filename, options.all, options.extra, options.disarm, options.force, options.engine)
+    if not oPDFiDResult.errorOccured:
+        oScanDB.Store(filename, parameters, key, oPDFiDResult)
+    return oPDFiDResult
+
+# select expressions and plugins are evaluated against the stored results, the files are not accessed
+# results are stored per set of parameters: without records for the current parameters, the options differ from the options used for the scan
+def ScanDBOnly(filenames, options, plugins):
+    records = 0
+    for filename, oPDFiDResult in oScanDB.Records(ScanDBParameters(options)):
+        records += 1
+        if filenames == [''] or filename in filenames or options.scan and any(filename.startswith(os.path.join(directory, '')) for directory in filenames):
+            ProcessFile(filename, options, plugins, oPDFiDResult)
+    if records == 0:
+        print('Error: the scan database %s has no results for these options, use the same options -a, -e and -f (and pdfid.ini keywords) as for the scan' % options.scandb)
+
+def PDFiD2CSVFields(extra):
+    fields = ['Filename', 'Header', 'IsPDF', 'ErrorOccured'] + PDFiDKeywords() + ['/Colors > 2^24']
+    if extra:
+        fields += ['CountEOF', 'CountCharsAfterLastEOF', 'TotalEntropy', 'StreamEntropy', 'NonStreamEntropy']
+    return fields
+
+# one line per file, the columns are the keywords (without the names of option -a)
+def PDFiD2CSV(xmlDoc, extra):
+    oPDFiDResult = PDFiDResultOrXMLDoc(xmlDoc)
+    values = dict(oPDFiDResult.Attributes())
+    for name, count, hexcodeCount in oPDFiDResult.keywords or []:
+        values[name] = str(count)
+    return MakeCSVLine([('%s', values.get(field, '')) for field in PDFiD2CSVFields(extra)])
+
+def PDFiDOutput(oPDFiDResult, options):
+    if options.format == 'xml':
+        return oPDFiDResult.XMLDoc().toxml()
+    elif options.format == 'json':
+        return PDFiD2JSON(oPDFiDResult, options.force)
+    elif options.format == 'csv':
+        return PDFiD2CSV(oPDFiDResult, options.extra)
+    else:
+        return PDFiD2String(oPDFiDResult, options.nozero, options.force)
+
+def ProcessFile(filename, options, plugins, oPDFiDResult=None):
     if plugins == [] and options.select == '':
-        Print(PDFiD2String(xmlDoc, options.nozero, options.force), options)
+        if oPDFiDResult == None:
+            oPDFiDResult = PDFiDScanDB(filename, options)
+        Print(PDFiDOutput(oPDFiDResult, options), options)
         return
 
-    oPDFiD = cPDFiD(xmlDoc, options.force)
+    # files that are not selected are not scanned completely; only for local files, stdin and URLs can not be read a second time
+    if plugins == [] and oPDFiDResult == None and oScanDB == None and not options.disarm and filename != '' and os.path.isfile(filename) and SelectExpression(options.select) != None:
+        if PDFiDSelect(filename, options, SelectExpression(options.select)) == False:
+            return
+        if options.csv:
+            Print(filename, options)
+            return
+
+    if oPDFiDResult == None:
+        oPDFiDResult = PDFiDScanDB(filename, options)
+    oPDFiD = cPDFiD(oPDFiDResult, options.force)
     if options.select:
         if options.force or not oPDFiD.errorOccured and oPDFiD.isPDF:
             pdf = oPDFiD
@@ -759,7 +1426,7 @@ def ProcessFile(filename, options, plugins):
                 if options.csv:
                     Print(filename, options)
                 else:
-                    Print(PDFiD2String(xmlDoc, options.nozero, options.force), options)
+                    Print(PDFiDOutput(oPDFiDResult, options), options)
     else:
         for cPlugin in plugins:
             if not cPlugin.onlyValidPDF or not oPDFiD.errorOccured and oPDFiD.isPDF:
@@ -784,7 +1451,7 @@ def ProcessFile(filename, options, plugins):
                         Print(MakeCSVLine((('%s', filename), ('%s', cPlugin.name), ('%.02f', score))), options)
                 else:
                     if score >= options.minimumscore:
-                        Print(PDFiD2String(xmlDoc, options.nozero, options.force), options)
+                        Print(PDFiDOutput(oPDFiDResult, options), options)
                         Print('%s score:        %.02f' % (cPlugin.name, score), options)
                         try:
                             Print('%s instructions: %s' % (cPlugin.name, oPlugin.Instructions(score)), options)
@@ -797,7 +1464,7 @@ def ProcessFile(filename, options, plugins):
                     if not oPDFiD.isPDF:
                         Print(MakeCSVLine((('%s', filename), ('%s', cPlugin.name), ('%s', 'Not a PDF document'))), options)
                 else:
-                    Print(PDFiD2String(xmlDoc, options.nozero, options.force), options)
+                    Print(PDFiDOutput(oPDFiDResult, options), options)
 
 
 def Scan(directory, options, plugins):
@@ -813,47 +1480,255 @@ def Scan(directory, options, plugins):
 #        print(sys.exc_info()[2])
 #        print traceback.format_exc()
 
+# same order as Scan: directories are recursed with os.listdir
+def ScanFilenames(filenames, options):
+    for filename in filenames:
+        if options.scan and os.path.isdir(filename):
+            try:
+                entries = os.listdir(filename)
+            except Exception as e:
+                print(e)
+                continue
+            for filename in ScanFilenames([os.path.join(filename, entry) for entry in entries], options):
+                yield filename
+        else:
+            yield filename
+
+# called once for each worker process: the plugins are loaded once per worker, not once per file
+def ScanWorkerInitialize(options):
+    global plugins
+    global scanOptions
+    global oScanDB
+
+    scanOptions = options
+    if options.scandb != '':
+        oScanDB = cScanDB(options.scandb, options.scandbhash, True)
+    # with the fork start method, the worker inherits the plugins loaded by the main process
+    if not 'plugins' in globals():
+        plugins = []
+        LoadPlugins(options.plugins, options.verbose)
+
+def ScanWorker(filename):
+    global printCapture
+
+    printCapture = []
+    error = None
+    try:
+        ProcessFile(filename, scanOptions, plugins)
+    except (Exception, SystemExit) as e:
+        error = str(e)
+    lines = printCapture
+    printCapture = None
+    if oScanDB != None:
+        return lines, error, oScanDB.Pending()
+    else:
+        return lines, error, []
+
+def ScanProgress(counter, start, final=False):
+    duration = time.time() - start
+    if duration > 0.0:
+        throughput = counter / duration
+    else:
+        throughput = 0.0
+    sys.stderr.write('\r%d files %.1f files/s' % (counter, throughput))
+    if final:
+        sys.stderr.write('\n')
+    sys.stderr.flush()
+
+# the output of each file is captured by the worker and printed by the main process (in input order or in completion order)
+def ScanParallel(filenames, options):
+    if options.jobs > 0:
+        jobs = options.jobs
+    else:
+        jobs = multiprocessing.cpu_count()
+    oPool = multiprocessing.Pool(jobs, ScanWorkerInitialize, (options,))
+    try:
+        if options.order == 'completion':
+            results = oPool.imap_unordered(ScanWorker, ScanFilenames(filenames, options), 8)
+        else:
+            results = oPool.imap(ScanWorker, ScanFilenames(filenames, options), 8)
+        counter = 0
+        start = time.time()
+        lastProgress = start
+        for lines, error, records in results:
+            for line in lines:
+                Print(line, options)
+            if error != None:
+                print(error)
+            for record in records:
+                oScanDB.Store(*record)
+            counter += 1
+            if options.progress and time.time() - lastProgress >= 1.0:
+                lastProgress = time.time()
+                ScanProgress(counter, start)
+        oPool.close()
+        if options.progress:
+            ScanProgress(counter, start, True)
+    except:
+        oPool.terminate()
+        raise
+    finally:
+        oPool.join()
+
+# service: a request is a JSON object with the filename or the data (BASE64) of the file to analyze, and optionally all, extra, force, engine and select
+# the response is a JSON object with the result (like PDFiD2JSON), the result of the select expression and the scores of the plugins
+def ServiceAnalyze(request):
+    filename = request.get('filename', '')
+    force = request.get('force', False)
+    response = {'filename': filename}
+    try:
+        if 'data' in request:
+            data = base64.b64decode(request['data'])
+        elif filename == '':
+            raise Exception('Request without filename or data')
+        else:
+            data = None
+        oPDFiDResult = PDFiDResult(filename, request.get('all', False), request.get('extra', False), False, force, request.get('engine', scanOptions.engine), data)
+        response['pdfid'] = PDFiD2Dict(oPDFiDResult, force)
+        oPDFiD = cPDFiD(oPDFiDResult, force)
+        if request.get('select', '') != '':
+            if force or not oPDFiD.errorOccured and oPDFiD.isPDF:
+                pdf = oPDFiD
+                response['selected'] = bool(eval(request['select']))
+            else:
+                response['selected'] = False
+        if plugins != []:
+            response['plugins'] = []
+            for cPlugin in plugins:
+                if not cPlugin.onlyValidPDF or not oPDFiD.errorOccured and oPDFiD.isPDF:
+                    try:
+                        response['plugins'].append({'name': cPlugin.name, 'score': cPlugin(oPDFiD, scanOptions.pluginoptions).Score()})
+                    except Exception as e:
+                        response['plugins'].append({'name': cPlugin.name, 'error': str(e)})
+    except SystemExit:
+        response['error'] = 'Error opening file %s' % filename
+    except Exception as e:
+        response['error'] = str(e)
+    return response
+
+# one request per line, one response per line; a connection can be used for several requests
+class cServiceHandler(SocketServer.StreamRequestHandler):
+    def handle(self):
+        for line in iter(self.rfile.readline, C2BIP3('')):
+            if line.strip() == C2BIP3(''):
+                continue
+            try:
+                request = json.loads(line.decode('utf-8'))
+                if not isinstance(request, dict):
+                    raise Exception('Request is not a JSON object')
+                response = self.server.oPool.apply(ServiceAnalyze, (request,))
+            except Exception as e:
+                response = {'error': str(e)}
+            self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+class cServiceServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    daemon_threads = True
+
+# the keywords (pdfid.ini) and the plugins are loaded once, the requests are analyzed by a pool of worker processes
+def ServiceStop(signalNumber, frame):
+    raise KeyboardInterrupt
+
+def PDFiDService(options):
+    if not hasattr(socket, 'AF_UNIX'):
+        print('Error: option --service requires Unix domain sockets')
+        return
+    # a socket left by a previous service is removed, any other file is not overwritten
+    if os.path.lexists(options.service):
+        if not stat.S_ISSOCK(os.lstat(options.service).st_mode):
+            print('Error: %s exists and is not a socket' % options.service)
+            return
+        os.remove(options.service)
+    if options.jobs > 0:
+        jobs = options.jobs
+    else:
+        jobs = multiprocessing.cpu_count()
+    ParseINIFileCached()
+    oPool = multiprocessing.Pool(jobs, ScanWorkerInitialize, (options,))
+    # the socket is only accessible by the user running the service: requests can read files and evaluate select expressions
+    umask = os.umask(0o177)
+    try:
+        oServiceServer = cServiceServer(options.service, cServiceHandler)
+    finally:
+        os.umask(umask)
+    oServiceServer.oPool = oPool
+    # SIGTERM stops the service like CTRL-C: the pool is terminated and the socket is removed (installed after creating the pool, the workers keep the default handler)
+    signal.signal(signal.SIGTERM, ServiceStop)
+    print('PDFiD service listening on %s (%d processes)' % (options.service, jobs))
+    sys.stdout.flush()
+    try:
+        oServiceServer.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        oServiceServer.server_close()
+        oPool.terminate()
+        oPool.join()
+        try:
+            os.remove(options.service)
+        except OSError:
+            pass
+
+# differential test: the classic and the fast engine must produce the same keywords, counts, hexcode counts and extra data (with option -e)
+def VerifyEngines(filenames, options):
+    attributes = ['ErrorOccured', 'IsPDF', 'Header', 'TotalEntropy', 'TotalCount', 'StreamEntropy', 'StreamCount', 'NonStreamEntropy', 'NonStreamCount', 'CountEOF', 'CountCharsAfterLastEOF']
+    for filename in filenames:
+        results = []
+        for engine in ['classic', 'fast']:
+            oPDFiDResult = PDFiDResult(filename, True, options.extra, False, options.force, engine)
+            values = dict(oPDFiDResult.Attributes())
+            result = [(name, values.get(name, '')) for name in attributes]
+            if not oPDFiDResult.errorOccured:
+                result += [tuple(keyword) for keyword in oPDFiDResult.keywords or []]
+                result += [tuple(date) for date in oPDFiDResult.dates or []]
+            results.append(result)
+        if results[0] == results[1]:
+            print('%s: engines produce identical results (%d items)' % (filename, len(results[0])))
+        else:
+            differences = [(classic, fast) for classic, fast in zip(results[0], results[1]) if classic != fast]
+            if len(results[0]) != len(results[1]):
+                differences.append(('%d items' % len(results[0]), '%d items' % len(results[1])))
+            print('%s: engines differ: classic %s fast %s' % (filename, repr(differences[0][0]), repr(differences[0][1])))
+
 #function derived from: http://blog.9bplus.com/pdfidpy-output-to-json
-def PDFiD2JSON(xmlDoc, force):
+def PDFiD2Dict(xmlDoc, force):
+    oPDFiDResult = PDFiDResultOrXMLDoc(xmlDoc)
+    attributes = collections.defaultdict(str, oPDFiDResult.Attributes())
+
     #Get Top Layer Data
-    errorOccured = xmlDoc.documentElement.getAttribute('ErrorOccured')
-    errorMessage = xmlDoc.documentElement.getAttribute('ErrorMessage')
-    filename = xmlDoc.documentElement.getAttribute('Filename')
-    header = xmlDoc.documentElement.getAttribute('Header')
-    isPdf = xmlDoc.documentElement.getAttribute('IsPDF')
-    version = xmlDoc.documentElement.getAttribute('Version')
-    entropy = xmlDoc.documentElement.getAttribute('Entropy')
+    errorOccured = attributes['ErrorOccured']
+    errorMessage = attributes['ErrorMessage']
+    filename = attributes['Filename']
+    header = attributes['Header']
+    isPdf = attributes['IsPDF']
+    version = attributes['Version']
+    entropy = attributes['Entropy']
 
     #extra data
-    countEof = xmlDoc.documentElement.getAttribute('CountEOF')
-    countChatAfterLastEof = xmlDoc.documentElement.getAttribute('CountCharsAfterLastEOF')
-    totalEntropy = xmlDoc.documentElement.getAttribute('TotalEntropy')
-    streamEntropy = xmlDoc.documentElement.getAttribute('StreamEntropy')
-    nonStreamEntropy = xmlDoc.documentElement.getAttribute('NonStreamEntropy')
+    countEof = attributes['CountEOF']
+    countChatAfterLastEof = attributes['CountCharsAfterLastEOF']
+    totalEntropy = attributes['TotalEntropy']
+    streamEntropy = attributes['StreamEntropy']
+    nonStreamEntropy = attributes['NonStreamEntropy']
 
     keywords = []
     dates = []
 
     #grab all keywords
-    for node in xmlDoc.documentElement.getElementsByTagName('Keywords')[0].childNodes:
-        name = node.getAttribute('Name')
-        count = int(node.getAttribute('Count'))
-        if int(node.getAttribute('HexcodeCount')) > 0:
-            hexCount = int(node.getAttribute('HexcodeCount'))
-        else:
-            hexCount = 0
+    for name, count, hexCount in oPDFiDResult.keywords or []:
         keyword = { 'count':count, 'hexcodecount':hexCount, 'name':name }
         keywords.append(keyword)
 
     #grab all date information
-    for node in xmlDoc.documentElement.getElementsByTagName('Dates')[0].childNodes:
-        name = node.getAttribute('Name')
-        value = node.getAttribute('Value')
+    for value, name in oPDFiDResult.dates or []:
         date = { 'name':name, 'value':value }
         dates.append(date)
 
     data = { 'countEof':countEof, 'countChatAfterLastEof':countChatAfterLastEof, 'totalEntropy':totalEntropy, 'streamEntropy':streamEntropy, 'nonStreamEntropy':nonStreamEntropy, 'errorOccured':errorOccured, 'errorMessage':errorMessage, 'filename':filename, 'header':header, 'isPdf':isPdf, 'version':version, 'entropy':entropy, 'keywords': { 'keyword': keywords }, 'dates': { 'date':dates} }
-    complete = [ { 'pdfid' : data} ]
+    return data
+
+def PDFiD2JSON(xmlDoc, force):
+    complete = [ { 'pdfid' : PDFiD2Dict(xmlDoc, force)} ]
     result = json.dumps(complete)
     return result
 
@@ -996,14 +1871,40 @@ def LoadPlugins(plugins, verbose):
 
 def PDFiDMain(filenames, options):
     global plugins
+    global oScanDB
     plugins = []
     LoadPlugins(options.plugins, options.verbose)
 
+    if options.scandb != '':
+        if sqlite3 == None:
+            print('Error: option --scandb requires Python module sqlite3')
+            return
+        oScanDB = cScanDB(options.scandb, options.scandbhash)
+    try:
+        if options.service != '':
+            PDFiDService(options)
+        else:
+            PDFiDFiles(filenames, options)
+    finally:
+        if oScanDB != None:
+            oScanDB.Close()
+
+def PDFiDFiles(filenames, options):
     if options.csv:
         if plugins != []:
             Print(MakeCSVLine((('%s', 'Filename'), ('%s', 'Plugin-name'), ('%s', 'Score'))), options)
         elif options.select != '':
             Print('Filename', options)
+    elif options.format == 'csv' and plugins == []:
+        Print(MakeCSVLine([('%s', field) for field in PDFiD2CSVFields(options.extra)]), options)
+
+    if options.scandbonly:
+        ScanDBOnly(filenames, options, plugins)
+        return
+
+    if options.jobs != 1:
+        ScanParallel(filenames, options)
+        return
 
     for filename in filenames:
         if options.scan:
@@ -1039,6 +1940,16 @@ https://DidierStevens.com'''
     oParser.add_option('--pluginoptions', type=str, default='', help='options for the plugin')
     oParser.add_option('-l', '--literalfilenames', action='store_true', default=False, help='take filenames literally, no wildcard matching')
     oParser.add_option('--recursedir', action='store_true', default=False, help='Recurse directories (wildcards and here files (@...) allowed)')
+    oParser.add_option('--engine', type=str, default='classic', help='scan engine: classic or fast (option -d always uses fast) (default classic)')
+    oParser.add_option('-j', '--jobs', type=int, default=1, help='number of processes to scan files (default 1, 0: number of CPUs)')
+    oParser.add_option('--order', type=str, default='input', help='order of the output with option --jobs: input or completion (default input)')
+    oParser.add_option('--progress', action='store_true', default=False, help='display the number of scanned files and the throughput on stderr with option --jobs')
+    oParser.add_option('--format', type=str, default='text', help='output format: text, xml, json or csv (default text)')
+    oParser.add_option('--scandb', type=str, default='', help='SQLite database with the results of previous scans: unchanged files (same size and modification time) are not scanned again')
+    oParser.add_option('--scandbhash', action='store_true', default=False, help='with option --scandb, the SHA-256 of the file must also be unchanged')
+    oParser.add_option('--scandbonly', action='store_true', default=False, help='with option --scandb, only output (select, plugins) the stored results of the given files or directories (all files without arguments), the files are not accessed; options -a, -e and -f must be the same as for the scan')
+    oParser.add_option('--service', type=str, default='', help='run as a service on the given Unix domain socket (JSON requests, see pdfid-client.py); use option --jobs for the number of processes')
+    oParser.add_option('--verifyengine', action='store_true', default=False, help='verify that the classic and fast scan engines produce identical counts')
     (options, args) = oParser.parse_args()
 
     if len(args) == 0:
@@ -1058,6 +1969,24 @@ https://DidierStevens.com'''
         except Exception as e:
             print(e)
             return
+    if not options.engine in ['classic', 'fast']:
+        print('Error: unknown --engine value %s' % options.engine)
+        return
+    if not options.format in ['text', 'xml', 'json', 'csv']:
+        print('Error: unknown --format value %s' % options.format)
+        return
+    if not options.order in ['input', 'completion']:
+        print('Error: unknown --order value %s' % options.order)
+        return
+    if options.scandbonly and options.scandb == '':
+        print('Error: option --scandbonly requires option --scandb')
+        return
+    if options.jobs != 1 and filenames == [''] and options.service == '':
+        print('Option jobs not supported with stdin')
+        options.jobs = 1
+    if options.verifyengine:
+        VerifyEngines(filenames, options)
+        return
     PDFiDMain(filenames, options)
 
 if __name__ == '__main__':
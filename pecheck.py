@@ -2,8 +2,8 @@
 
 __description__ = 'Tool for displaying PE file info'
 __author__ = 'Didier Stevens'
-__version__ = '0.7.8'
-__date__ = '2019/10/27'
+__version__ = '0.7.9'
+__date__ = '2026/10/17'
 
 """
 
@@ -44,6 +44,7 @@ History:
   2019/09/17: continue; added option -m
   2019/09/28: V0.7.8 added MD5 hash to -l P report
   2019/10/27: introduced environment variable DSS_DEFAULT_HASH_ALGORITHMS
+  2026/10/17: 0.7.9 YARA rules are compiled with module yaracache when available (cache of compiled rules)
 
 Todo:
 """
@@ -81,6 +82,11 @@ try:
 except:
     pass
 
+try:
+    import yaracache
+except:
+    yaracache = None
+
 def PrintManual():
     manual = '''
 Manual:
@@ -210,6 +216,13 @@ def ReadFile(filename):
         data = File2String(filename)
     return data
 
+# with module yaracache, compiled rules are cached and reused as long as the rule files don't change
+def YARACompileRules(**kwargs):
+    if yaracache == None:
+        return yara.compile(**kwargs)
+    else:
+        return yaracache.Compile(**kwargs)
+
 def YARACompile(ruledata):
     if ruledata.startswith('#'):
         if ruledata.startswith('#h#'):
@@ -226,7 +239,7 @@ def YARACompile(ruledata):
             rule = 'rule regex {strings: $a = /%s/ ascii wide nocase condition: $a}' % ruledata[3:]
         else:
             rule = ruledata[1:]
-        return yara.compile(source=rule)
+        return YARACompileRules(source=rule)
     else:
         dFilepaths = {}
         if os.path.isdir(ruledata):
@@ -237,7 +250,7 @@ def YARACompile(ruledata):
         else:
             for filename in ProcessAt(ruledata):
                 dFilepaths[filename] = filename
-        return yara.compile(filepaths=dFilepaths)
+        return YARACompileRules(filepaths=dFilepaths)
 
 def NumberOfBytesHumanRepresentation(value):
     if value <= 1024:
@@ -2,8 +2,8 @@
 
 __description__ = 'P-code dumper plugin for oledump.py'
 __author__ = 'Vesselin Bontchev'
-__version__ = '0.0.1'
-__date__ = '2016/09/05'
+__version__ = '0.0.2'
+__date__ = '2026/10/17'
 
 """
 
@@ -12,6 +12,7 @@ Use at your own risk
 
 History:
   2016/09/10: start
+  2026/10/17: 0.0.2 use the modules of the VBA/dir stream parsed by oledump
 
 Todo:
 """
@@ -109,9 +110,14 @@ class cPcodeDumper(cPluginParent):
         # This example counts the numbers of bytes with value FF in the stream,
         # and produces one line of output if the count is more than 0.
         result = []
+        # oledump parses the VBA/dir stream of the document (global variable vbadir): use it when it lists modules
+        if (('vbadir' in globals()) and (vbadir != None) and (vbadir.dModules != {})):
+            if (vbadir.ModuleInfo(self.streamname) != None):
+                result = dumpPcode(self.stream)
+                self.ran = True
         # The following is WRONG. The proper way to determine what are the code modules
         # is to parse the PROJECT stream. But this is the best I can do with this interface.
-        if (len(self.streamname) > 1):
+        elif (len(self.streamname) > 1):
             parent = self.streamname[len(self.streamname) - 2]
             myName = self.streamname[len(self.streamname) - 1]
             if ((parent.upper() == 'VBA') and
@@ -2,8 +2,8 @@
 
 __description__ = 'Analyze RTF files'
 __author__ = 'Didier Stevens'
-__version__ = '0.0.9'
-__date__ = '2018/12/09'
+__version__ = '0.0.10'
+__date__ = '2026/10/17'
 
 """
 
@@ -35,6 +35,7 @@ History:
   2017/12/24: 0.0.7 made changes level 0 -> remainder
   2018/12/07: 0.0.8 added support for -s a; added selection warning; added option -A; added yara #x# #r#; updated ParseCutTerm; added --jsonoutput
   2018/12/09: 0.0.9 changed extra output for remainder
+  2026/10/17: 0.0.10 YARA rules are compiled with module yaracache when available (cache of compiled rules)
 
 Todo:
 """
@@ -60,6 +61,11 @@ try:
 except:
     pass
 
+try:
+    import yaracache
+except:
+    yaracache = None
+
 dumplinelength = 16
 MALWARE_PASSWORD = 'infected'
 
@@ -825,6 +831,13 @@ def RTFSub(oStringIO, prefix, rules, options):
 
     return returnCode
 
+# with module yaracache, compiled rules are cached and reused as long as the rule files don't change
+def YARACompileRules(**kwargs):
+    if yaracache == None:
+        return yara.compile(**kwargs)
+    else:
+        return yaracache.Compile(**kwargs)
+
 def YARACompile(ruledata):
     if ruledata.startswith('#'):
         if ruledata.startswith('#h#'):
@@ -841,7 +854,7 @@ def YARACompile(ruledata):
             rule = 'rule regex {strings: $a = /%s/ ascii wide nocase condition: $a}' % ruledata[3:]
         else:
             rule = ruledata[1:]
-        return yara.compile(source=rule, externals={'streamname': '', 'VBA': False})
+        return YARACompileRules(source=rule, externals={'streamname': '', 'VBA': False})
     else:
         dFilepaths = {}
         if os.path.isdir(ruledata):
@@ -852,7 +865,7 @@ def YARACompile(ruledata):
         else:
             for filename in ProcessAt(ruledata):
                 dFilepaths[filename] = filename
-        return yara.compile(filepaths=dFilepaths, externals={'streamname': '', 'VBA': False})
+        return YARACompileRules(filepaths=dFilepaths, externals={'streamname': '', 'VBA': False})
 
 def RTFDump(filename, options):
     global plugins
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+
+__description__ = 'Cache for compiled YARA rules'
+__author__ = 'Didier Stevens'
+__version__ = '0.0.1'
+__date__ = '2026/10/17'
+
+"""
+
+Source code put in public domain by Didier Stevens, no Copyright
+https://DidierStevens.com
+Use at your own risk
+
+Use function Compile in stead of yara.compile: compiled rules are saved in the cache directory
+(environment variable YARACACHE) with a filename that is the SHA256 of the YARA version,
+the externals and the content of the rule sources (files and included files). A change to
+any of these gives another filename, and the rules are compiled again.
+When environment variable YARACACHE is not set or empty, there is no cache: Compile is yara.compile.
+
+History:
+  2026/10/17: start
+
+Todo:
+"""
+
+import os
+import re
+import hashlib
+import tempfile
+import yara
+
+# environment variable with the cache directory; without this variable, rules are not cached
+YARACACHE_ENVIRONMENT_VARIABLE = 'YARACACHE'
+YARACACHE_EXTENSION = '.yarc'
+
+oREInclude = re.compile(r'^\s*include\s+"([^"]+)"', re.MULTILINE)
+
+def CacheDirectory():
+    return os.getenv(YARACACHE_ENVIRONMENT_VARIABLE, '')
+
+def ReadBinaryFile(filename):
+    try:
+        f = open(filename, 'rb')
+    except:
+        return None
+    try:
+        return f.read()
+    finally:
+        f.close()
+
+def Encode(string):
+    if isinstance(string, bytes):
+        return string
+    return string.encode('utf-8')
+
+# hashes the rule source and, recursively, the files it includes (include directives are relative to directory)
+def HashSource(oHash, source, directory, dVisited):
+    oHash.update(Encode(source))
+    if isinstance(source, bytes) and not isinstance(source, str):
+        source = source.decode('latin')
+    for include in oREInclude.findall(source):
+        filename = os.path.normpath(os.path.join(directory, include))
+        oHash.update(Encode('\x00include %s\x00' % filename))
+        if filename in dVisited:
+            continue
+        dVisited[filename] = True
+        data = ReadBinaryFile(filename)
+        if data == None:
+            oHash.update(Encode('\x00missing\x00'))
+        else:
+            HashSource(oHash, data, os.path.dirname(filename), dVisited)
+
+# the key is the SHA256 hash of the YARA version, the arguments to yara.compile and the content of every rule file (including included files)
+def CacheKey(source=None, filepaths=None, filepath=None, externals=None):
+    oHash = hashlib.sha256()
+    oHash.update(Encode('yara %s\x00' % getattr(yara, '__version__', getattr(yara, 'YARA_VERSION', ''))))
+    oHash.update(Encode('externals %r\x00' % sorted((externals or {}).items())))
+    dVisited = {}
+    if source != None:
+        oHash.update(Encode('source\x00'))
+        HashSource(oHash, source, os.getcwd(), dVisited)
+    if filepath != None:
+        filepaths = {'default': filepath}
+    if filepaths != None:
+        for namespace, filename in sorted(filepaths.items()):
+            filename = os.path.abspath(filename)
+            oHash.update(Encode('\x00filepath %s %s\x00' % (namespace, filename)))
+            data = ReadBinaryFile(filename)
+            if data == None:
+                return None
+            HashSource(oHash, data, os.path.dirname(filename), dVisited)
+    return oHash.hexdigest()
+
+def Save(rules, directory, filename):
+    temporaryFilename = None
+    try:
+        if not os.path.isdir(directory):
+            # only the user can read and write the compiled rules
+            os.makedirs(directory, 0o700)
+        # write to a temporary file and rename, concurrent runs (parallel workers) never see a partial file
+        fd, temporaryFilename = tempfile.mkstemp(suffix=YARACACHE_EXTENSION, dir=directory)
+        os.close(fd)
+        rules.save(temporaryFilename)
+        try:
+            os.rename(temporaryFilename, filename)
+        except OSError:
+            # on Windows, rename fails when the file exists: another process stored the same rules
+            os.remove(temporaryFilename)
+    except:
+        try:
+            os.remove(temporaryFilename)
+        except:
+            pass
+
+# same arguments as yara.compile (source, filepaths, filepath and externals); without cache directory, this is yara.compile
+def Compile(source=None, filepaths=None, filepath=None, externals=None):
+    arguments = {}
+    if source != None:
+        arguments['source'] = source
+    if filepaths != None:
+        arguments['filepaths'] = filepaths
+    if filepath != None:
+        arguments['filepath'] = filepath
+    if externals != None:
+        arguments['externals'] = externals
+
+    directory = CacheDirectory()
+    if directory == '':
+        return yara.compile(**arguments)
+    key = CacheKey(source, filepaths, filepath, externals)
+    if key == None:
+        return yara.compile(**arguments)
+    filename = os.path.join(directory, key + YARACACHE_EXTENSION)
+    if os.path.isfile(filename):
+        try:
+            return yara.load(filename)
+        except:
+            pass
+    rules = yara.compile(**arguments)
+    Save(rules, directory, filename)
+    return rules
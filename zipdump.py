@@ -2,8 +2,8 @@
 
 __description__ = 'ZIP dump utility'
 __author__ = 'Didier Stevens'
-__version__ = '0.0.15'
-__date__ = '2018/12/15'
+__version__ = '0.0.16'
+__date__ = '2026/10/17'
 
 """
 
@@ -44,6 +44,8 @@ History:
   2018/07/01: 0.0.13: added option --jsonoutput
   2018/07/07: 0.0.14: updated to version 2 of jsonoutput
   2018/12/15: 0.0.15: updated help
+  2026/10/17: 0.0.16: added cByteStatistics: one byte histogram for %ENTROPY%, %HISTOGRAM% and %BYTESTATS%
+  2026/10/17: YARA rules are compiled with module yaracache when available (cache of compiled rules)
 
 Todo:
 """
@@ -70,6 +72,11 @@ try:
     import yara
 except:
     pass
+
+try:
+    import yaracache
+except:
+    yaracache = None
 if sys.version_info[0] >= 3:
     from io import StringIO
 else:
@@ -397,6 +404,13 @@ def ProcessAt(argument):
     else:
         return [argument]
 
+# with module yaracache, compiled rules are cached and reused as long as the rule files don't change
+def YARACompileRules(**kwargs):
+    if yaracache == None:
+        return yara.compile(**kwargs)
+    else:
+        return yaracache.Compile(**kwargs)
+
 def YARACompile(ruledata):
     if ruledata.startswith('#'):
         if ruledata.startswith('#h#'):
@@ -409,7 +423,7 @@ def YARACompile(ruledata):
             rule = ruledata[3:].replace("'", '"')
         else:
             rule = ruledata[1:]
-        return yara.compile(source=rule)
+        return YARACompileRules(source=rule)
     else:
         dFilepaths = {}
         if os.path.isdir(ruledata):
@@ -420,7 +434,7 @@ def YARACompile(ruledata):
         else:
             for filename in ProcessAt(ruledata):
                 dFilepaths[filename] = filename
-        return yara.compile(filepaths=dFilepaths)
+        return YARACompileRules(filepaths=dFilepaths)
 
 class cDump():
     def __init__(self, data, prefix='', offset=0, dumplinelength=16):
@@ -554,14 +568,30 @@ def CalculateByteStatistics(dPrevalence):
             countUniqueBytes += 1
     return sumValues, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes
 
-def CalculateFileMetaData(data):
-    dPrevalence = {}
-    for iter in range(256):
-        dPrevalence[iter] = 0
-    for char in data:
-        dPrevalence[ord(char)] += 1
+# byte histogram of data, calculated once for %ENTROPY%, %HISTOGRAM% and %BYTESTATS%: each byte value present in data is counted with method count
+class cByteStatistics():
+    def __init__(self, data):
+        self.data = data
+        self.histogram = None
+        self.statistics = None
+
+    def Histogram(self):
+        if self.histogram == None:
+            self.histogram = [0] * 0x100
+            for value in set(self.data):
+                if isinstance(value, int):
+                    self.histogram[value] = self.data.count(value)
+                else:
+                    self.histogram[ord(value)] = self.data.count(value)
+        return self.histogram
+
+    def Statistics(self):
+        if self.statistics == None:
+            self.statistics = CalculateByteStatistics(dict(enumerate(self.Histogram())))
+        return self.statistics
 
-    fileSize, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = CalculateByteStatistics(dPrevalence)
+def CalculateFileMetaData(data):
+    fileSize, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = cByteStatistics(data).Statistics()
     magicPrintable, magicHex = Magic(data[0:4])
     return hashlib.md5(data).hexdigest(), magicPrintable, magicHex, fileSize, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes
 
@@ -753,13 +783,12 @@ def ExtraInfoSHA256(data):
         return ''
     return hashlib.sha256(data).hexdigest()
 
-def ExtraInfoENTROPY(data):
+def ExtraInfoENTROPY(data, oByteStatistics=None):
     if data == None:
         return ''
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
-    sumValues, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = CalculateByteStatistics(dPrevalence)
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    sumValues, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = oByteStatistics.Statistics()
     return '%f' % entropy
 
 def ExtraInfoHEADHEX(data):
@@ -782,19 +811,19 @@ def ExtraInfoTAILASCII(data):
         return ''
     return ''.join([IFF(ord(b) >= 32, b, '.') for b in data[-16:]])
 
-def ExtraInfoHISTOGRAM(data):
+def ExtraInfoHISTOGRAM(data, oByteStatistics=None):
     if data == None:
         return ''
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    histogram = oByteStatistics.Histogram()
     result = []
     count = 0
     minimum = None
     maximum = None
     for iter in range(0x100):
-        if dPrevalence[iter] > 0:
-            result.append('0x%02x:%d' % (iter, dPrevalence[iter]))
+        if histogram[iter] > 0:
+            result.append('0x%02x:%d' % (iter, histogram[iter]))
             count += 1
             if minimum == None:
                 minimum = iter
@@ -809,13 +838,12 @@ def ExtraInfoHISTOGRAM(data):
     result.insert(2, IFF(maximum == None, '', '0x%02x' % maximum))
     return ','.join(result)
 
-def ExtraInfoBYTESTATS(data):
+def ExtraInfoBYTESTATS(data, oByteStatistics=None):
     if data == None:
         return ''
-    dPrevalence = {iter: 0 for iter in range(0x100)}
-    for char in data:
-        dPrevalence[ord(char)] += 1
-    sumValues, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = CalculateByteStatistics(dPrevalence)
+    if oByteStatistics == None:
+        oByteStatistics = cByteStatistics(data)
+    sumValues, entropy, countUniqueBytes, countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes = oByteStatistics.Statistics()
     return '%d,%d,%d,%d,%d' % (countNullByte, countControlBytes, countWhitespaceBytes, countPrintableBytes, countHighBytes)
 
 def GenerateExtraInfo(extra, index, zipfilename, filename, encrypted, timestamp, stream):
@@ -823,6 +851,7 @@ def GenerateExtraInfo(extra, index, zipfilename, filename, encrypted, timestamp,
         return ''
     if extra.startswith('!') or extra.startswith('#'):
         extra = extra[1:]
+    oByteStatistics = cByteStatistics(stream)
     dExtras = {'%INDEX%': lambda x: '%d' % index,
                '%ZIPFILENAME%': lambda x: zipfilename,
                '%FILENAME%': lambda x: filename,
@@ -832,13 +861,13 @@ def GenerateExtraInfo(extra, index, zipfilename, filename, encrypted, timestamp,
                '%MD5%': ExtraInfoMD5,
                '%SHA1%': ExtraInfoSHA1,
                '%SHA256%': ExtraInfoSHA256,
-               '%ENTROPY%': ExtraInfoENTROPY,
+               '%ENTROPY%': lambda x: ExtraInfoENTROPY(x, oByteStatistics),
                '%HEADHEX%': ExtraInfoHEADHEX,
                '%HEADASCII%': ExtraInfoHEADASCII,
                '%TAILHEX%': ExtraInfoTAILHEX,
                '%TAILASCII%': ExtraInfoTAILASCII,
-               '%HISTOGRAM%': ExtraInfoHISTOGRAM,
-               '%BYTESTATS%': ExtraInfoBYTESTATS,
+               '%HISTOGRAM%': lambda x: ExtraInfoHISTOGRAM(x, oByteStatistics),
+               '%BYTESTATS%': lambda x: ExtraInfoBYTESTATS(x, oByteStatistics),
               }
     for variable in dExtras:
         if variable in extra: